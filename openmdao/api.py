@@ -43,6 +43,8 @@ from openmdao.recorders.base_recorder import BaseRecorder
 from openmdao.recorders.dump_recorder import DumpRecorder
 from openmdao.recorders.sqlite_recorder import SqliteRecorder
 from openmdao.recorders.inmem_recorder import InMemoryRecorder
+from openmdao.recorders.npy_recorder import NpyRecorder
+from openmdao.recorders.case_reader import CaseReader
 
 #solvers
 from openmdao.solvers.ln_direct import DirectSolver
@@ -60,6 +62,8 @@ except ImportError:
 
 #surrogate models
 from openmdao.surrogate_models.kriging import KrigingSurrogate, FloatKrigingSurrogate
+from openmdao.surrogate_models.local_kriging import LocalKrigingSurrogate, \
+    FloatLocalKrigingSurrogate
 from openmdao.surrogate_models.multifi_cokriging import MultiFiCoKrigingSurrogate, \
     FloatMultiFiCoKrigingSurrogate
 from openmdao.surrogate_models.nearest_neighbor import NearestNeighbor
@@ -117,3 +117,7 @@ class IndepVarComp(Component):
     def solve_nonlinear(self, params, unknowns, resids):
         """ Performs no operation. """
         pass
+
+    def solve_nonlinear_batch(self, params, unknowns, resids):
+        """ Performs no operation. """
+        pass
@@ -2,10 +2,12 @@
 
 import sys
 import numpy as np
+from collections import OrderedDict
 from copy import deepcopy
 
 from openmdao.core.component import Component, _NotSet
-from six import iteritems
+from openmdao.surrogate_models.surrogate_model import SurrogateModel
+from six import iteritems, get_unbound_function
 
 
 class MetaModel(Component):
@@ -333,6 +335,9 @@ class MetaModel(Component):
                             v = np.array(v)
                         new_input[row_idx, idx:idx+sz] = v.flat
 
+        # surrogates to train from scratch, by type
+        to_train = OrderedDict()
+
         # add training data for each output
         for name, shape in self._surrogate_output_names:
             if num_sample > 0:
@@ -361,8 +366,29 @@ class MetaModel(Component):
                         new_output[row_idx, :] = v.flat
 
             surrogate = self._init_unknowns_dict[name].get('surrogate')
-            if surrogate is not None:
-                surrogate.train(self._training_input, self._training_output[name])
+            if surrogate is None:
+                continue
+
+            # without training data, a surrogate that was trained beforehand
+            # (e.g. read by SurrogateModel.load) is used as is
+            if num_sample == 0 and surrogate.trained:
+                continue
+
+            # with a warm restart, surrogates that support it just add the
+            # new points
+            if self.warm_restart and num_sample > 0 and num_old_pts > 0 \
+               and surrogate.trained and _can_update(surrogate):
+                surrogate.update(new_input, new_output)
+            else:
+                to_train.setdefault(type(surrogate), []).append(name)
+
+        # outputs whose surrogates have the same type are trained together,
+        # so they can share the work done on the training inputs
+        for surrogate_type, names in iteritems(to_train):
+            surrogate_type.train_multiple(
+                [self._init_unknowns_dict[name]['surrogate'] for name in names],
+                self._training_input,
+                [self._training_output[name] for name in names])
 
         self.train = False
 
@@ -391,3 +417,9 @@ class MetaModel(Component):
         """
         return [k for k, acc in iteritems(self.unknowns._dat)
                    if not (acc.pbo or k.startswith('train'))]
+
+
+def _can_update(surrogate):
+    """ Returns True if `surrogate` overrides SurrogateModel.update."""
+    impl = get_unbound_function(type(surrogate).update)
+    return impl is not get_unbound_function(SurrogateModel.update)
@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import numpy as np
 import unittest
 
@@ -232,6 +235,62 @@ class TestMetaModel(unittest.TestCase):
         assert_rel_error(self, prob['meta.y1'], 2.0, .00001)
         assert_rel_error(self, prob['meta.y2'], 4.0, .00001)
 
+    def test_warm_start_update(self):
+        meta = MetaModel()
+        meta.add_param('x', 0.)
+        meta.add_output('y', 0.)
+        meta.default_surrogate = FloatKrigingSurrogate()
+        meta.warm_restart = True
+
+        prob = Problem(Group())
+        prob.root.add('meta', meta)
+        prob.setup(check=False)
+
+        x = np.linspace(0, 10, 20)
+        prob['meta.train:x'] = x
+        prob['meta.train:y'] = .5*np.sin(x)
+        prob['meta.x'] = 2.22
+        prob.run()
+
+        surrogate = prob.root.unknowns.metadata('meta.y').get('surrogate')
+        thetas = surrogate.thetas.copy()
+
+        # new points are added to the trained surrogate, which keeps its thetas
+        x = np.array([2.22, 7.3])
+        prob['meta.train:x'] = x
+        prob['meta.train:y'] = .5*np.sin(x)
+        meta.train = True
+        prob.run()
+
+        self.assertEqual(surrogate.n_samples, 22)
+        self.assertEqual(surrogate._num_fit_samples, 20)
+        assert_rel_error(self, surrogate.thetas, thetas, 0.)
+        assert_rel_error(self, prob['meta.y'], .5*np.sin(2.22), 1e-5)
+
+    def test_load_surrogate(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        fname = os.path.join(tmpdir, 'sin.npz')
+
+        x = np.linspace(0, 10, 20)
+        surrogate = FloatKrigingSurrogate()
+        surrogate.train(x[:, np.newaxis], .5*np.sin(x)[:, np.newaxis])
+        surrogate.save(fname)
+
+        # a trained surrogate is used without training data
+        meta = MetaModel()
+        meta.add_param('x', 0.)
+        meta.add_output('y', 0., surrogate=FloatKrigingSurrogate.load(fname))
+
+        prob = Problem(Group())
+        prob.root.add('meta', meta)
+        prob.setup(check=False)
+
+        prob['meta.x'] = 2.22
+        prob.run()
+        assert_rel_error(self, prob['meta.y'], surrogate.predict([2.22]), 1e-10)
+        assert_rel_error(self, prob['meta.y'], .5*np.sin(2.22), 1e-4)
+
     def test_vector_inputs(self):
 
         meta = MetaModel()
@@ -316,6 +375,36 @@ class TestMetaModel(unittest.TestCase):
 
         assert_rel_error(self, prob['meta.y'], np.array([1.0, 7.0]), .00001)
 
+    def test_train_together(self):
+        meta = MetaModel()
+        meta.add_param('x', 0.)
+        meta.add_output('y1', 0.)
+        meta.add_output('y2', 0.)
+        meta.add_output('y3', 0., surrogate=ResponseSurface())
+        meta.default_surrogate = FloatKrigingSurrogate(tied_thetas=True)
+
+        prob = Problem(Group())
+        prob.root.add('meta', meta)
+        prob.setup(check=False)
+
+        x = np.linspace(0, 10, 20)
+        prob['meta.train:x'] = x
+        prob['meta.train:y1'] = .5*np.sin(x)
+        prob['meta.train:y2'] = np.cos(x)
+        prob['meta.train:y3'] = x**2
+        prob['meta.x'] = 2.22
+        prob.run()
+
+        # the Kriging outputs share their factorization
+        s1 = prob.root.unknowns.metadata('meta.y1').get('surrogate')
+        s2 = prob.root.unknowns.metadata('meta.y2').get('surrogate')
+        self.assertTrue(s1.L is s2.L)
+        assert_rel_error(self, s1.thetas, s2.thetas, 0.)
+
+        assert_rel_error(self, prob['meta.y1'], .5*np.sin(2.22), 1e-4)
+        assert_rel_error(self, prob['meta.y2'], np.cos(2.22), 1e-4)
+        assert_rel_error(self, prob['meta.y3'], 2.22**2, 1e-8)
+
     def test_unequal_training_inputs(self):
 
         meta = MetaModel()
@@ -0,0 +1,268 @@
+""" Runs a model for a block of cases at once, using copies of the model's
+vectors that have a leading case axis."""
+
+from six import iteritems, itervalues, get_unbound_function
+
+import numpy as np
+
+from openmdao.core.component import Component
+from openmdao.core.group import Group
+from openmdao.core.mpi_wrap import MPI
+from openmdao.solvers.run_once import RunOnce
+from openmdao.util.record_util import create_local_meta, update_local_meta
+
+
+def _batchable(comp):
+    """ Returns True if `comp` overrides solve_nonlinear_batch and has no
+    pass_by_obj variables.
+    """
+    impl = get_unbound_function(type(comp).solve_nonlinear_batch)
+    if impl is get_unbound_function(Component.solve_nonlinear_batch):
+        return False
+
+    for vec in (comp.params, comp.unknowns):
+        for acc in itervalues(vec._dat):
+            if acc.meta.get('pass_by_obj'):
+                return False
+
+    return True
+
+
+def _shift(idxs, offset):
+    """ Offsets an index array or slice by `offset`. """
+    if isinstance(idxs, slice):
+        return slice(idxs.start + offset, idxs.stop + offset, idxs.step)
+    return idxs + offset
+
+
+def can_batch(root):
+    """
+    Args
+    ----
+    root : `Group`
+        The root `Group` of the model.
+
+    Returns
+    -------
+    bool
+        True if the model can be run by `batch_solve_nonlinear`.
+    """
+    if MPI:
+        return False
+
+    for acc in itervalues(root.unknowns._dat):
+        if acc.pbo or acc.remote:
+            return False
+
+    return True
+
+
+class BatchVectors(object):
+    """
+    The unknowns, resids and params of a model for a block of cases. Each
+    is kept as a 2D array whose first axis is the case and whose second
+    axis matches the flat vector of the model.
+
+    Args
+    ----
+    root : `Group`
+        The root `Group` of the model.
+
+    num_cases : int
+        The number of cases in the block. All cases start out with the
+        current values of the model.
+    """
+
+    def __init__(self, root, num_cases):
+        self.root = root
+        self.num_cases = num_cases
+
+        self.u = np.tile(root.unknowns.vec, (num_cases, 1))
+        self.r = np.tile(root.resids.vec, (num_cases, 1))
+
+        # every Group owns the params it transfers to, in its own vector
+        self._groups = [s for s in root.subsystems(recurse=True, include_self=True)
+                        if isinstance(s, Group)]
+        self.p = {}
+        self._pslices = {}
+        for grp in self._groups:
+            self.p[grp.pathname] = np.tile(grp.params.vec, (num_cases, 1))
+            for acc in itervalues(grp.params._dat):
+                if acc.owned and acc.slice is not None:
+                    self._pslices[acc.meta['pathname']] = (grp.pathname,) + \
+                                                          tuple(acc.slice)
+
+        self._uslices = {}
+        for acc in itervalues(root.unknowns._dat):
+            self._uslices[acc.meta['pathname']] = acc.slice
+
+    def offset(self, vec):
+        """
+        Args
+        ----
+        vec : `VecWrapper`
+            The unknowns or resids of a `System`.
+
+        Returns
+        -------
+        int
+            Offset of the flat vector of `vec` in the flat vector of the root.
+        """
+        for acc in itervalues(vec._dat):
+            if acc.slice is not None:
+                return self._uslices[acc.meta['pathname']][0] - acc.slice[0]
+        return 0
+
+    def param(self, acc):
+        """
+        Args
+        ----
+        acc : `Accessor`
+            Accessor of a connected parameter.
+
+        Returns
+        -------
+        ndarray or None
+            2D view of the parameter for all cases, in the units of its
+            source, or None if the parameter isn't connected.
+        """
+        loc = self._pslices.get(acc.meta['pathname'])
+        if loc is None:
+            return None
+        grp, start, end = loc
+        return self.p[grp][:, start:end]
+
+    def load(self, i):
+        """ Copies the values of case `i` into the vectors of the model. """
+        self.root.unknowns.vec[:] = self.u[i]
+        self.root.resids.vec[:] = self.r[i]
+        for grp in self._groups:
+            grp.params.vec[:] = self.p[grp.pathname][i]
+
+    def store(self, i):
+        """ Copies the vectors of the model into case `i`. """
+        self.u[i] = self.root.unknowns.vec
+        self.r[i] = self.root.resids.vec
+        for grp in self._groups:
+            self.p[grp.pathname][i] = grp.params.vec
+
+
+def batch_solve_nonlinear(root, bvecs, metadata):
+    """
+    Runs the model for every case in `bvecs`. Components that implement
+    solve_nonlinear_batch are run once for all cases. Other components,
+    and Groups whose nonlinear solver iterates or records, are run once
+    per case.
+
+    Args
+    ----
+    root : `Group`
+        The root `Group` of the model.
+
+    bvecs : `BatchVectors`
+        Values of the model for each case. Results are written back here.
+
+    metadata : list of dict
+        Execution metadata (e.g. iteration coordinate) for each case. Passed
+        to Groups that are run once per case.
+    """
+    _solve_system(root, bvecs, metadata)
+
+
+def _solve_system(system, bvecs, metadata):
+    if isinstance(system, Component):
+        if _batchable(system):
+            _solve_comp_batch(system, bvecs)
+        else:
+            _solve_per_case(system, bvecs, metadata)
+
+    elif isinstance(system.nl_solver, RunOnce) and \
+            not list(system.nl_solver.recorders):
+        # same iteration coordinates as RunOnce.solve gives each case
+        solver = system.nl_solver
+        local_metas = []
+        for meta in metadata:
+            solver.iter_count += 1
+            local_meta = create_local_meta(meta, system.name)
+            update_local_meta(local_meta, (solver.iter_count,))
+            local_metas.append(local_meta)
+        system.ln_solver.local_meta = local_metas[-1]
+
+        for sub in itervalues(system._subsystems):
+            _transfer(system, sub.name, bvecs)
+            if sub.is_active():
+                with sub._dircontext:
+                    _solve_system(sub, bvecs, local_metas)
+
+    else:
+        _solve_per_case(system, bvecs, metadata)
+
+
+def _transfer(group, target_sys, bvecs):
+    """ Batched version of Group._transfer_data in the forward direction."""
+    x = group._data_xfer.get((target_sys, 'fwd', None))
+    if x is None:
+        return
+
+    uoff = bvecs.offset(group.unknowns)
+    params = bvecs.p[group.pathname]
+    for isrcs, itgts, _ in x.scatters:
+        params[:, itgts] = bvecs.u[:, _shift(isrcs, uoff)]
+
+
+def _solve_per_case(system, bvecs, metadata):
+    for i in range(bvecs.num_cases):
+        bvecs.load(i)
+        if isinstance(system, Component):
+            system._sys_solve_nonlinear(system.params, system.unknowns,
+                                        system.resids)
+        else:
+            system.solve_nonlinear(system.params, system.unknowns,
+                                   system.resids, metadata[i])
+        bvecs.store(i)
+
+
+def _solve_comp_batch(comp, bvecs):
+    n = bvecs.num_cases
+
+    def shape_of(meta):
+        shape = meta['shape']
+        return (n,) if shape == 1 else (n,) + tuple(np.atleast_1d(shape))
+
+    params = {}
+    for name, acc in iteritems(comp.params._dat):
+        meta = acc.meta
+        raw = bvecs.param(acc)
+        if raw is None:
+            # unconnected, so the same for every case
+            val = np.asarray(comp.params[name])
+            params[name] = np.repeat(val[np.newaxis], n, axis=0)
+            continue
+
+        scale, offset = meta.get('unit_conv', (None, None))
+        if scale:
+            val = (raw + offset)*scale
+        else:
+            val = raw.copy()
+        params[name] = val.reshape(shape_of(meta))
+
+    uoff = bvecs.offset(comp.unknowns)
+    roff = bvecs.offset(comp.resids)
+
+    unknowns = {}
+    resids = {}
+    for vals, vec, arr, off in ((unknowns, comp.unknowns, bvecs.u, uoff),
+                                (resids, comp.resids, bvecs.r, roff)):
+        for name, acc in iteritems(vec._dat):
+            start, end = acc.slice
+            vals[name] = arr[:, off+start:off+end].reshape(shape_of(acc.meta))
+
+    comp.solve_nonlinear_batch(params, unknowns, resids)
+
+    for vals, vec, arr, off in ((unknowns, comp.unknowns, bvecs.u, uoff),
+                                (resids, comp.resids, bvecs.r, roff)):
+        for name, acc in iteritems(vec._dat):
+            start, end = acc.slice
+            val = np.broadcast_to(vals[name], shape_of(acc.meta))
+            arr[:, off+start:off+end] = val.reshape(n, end - start)
+
@@ -629,6 +629,31 @@ class Component(System):
         msg = "Class '%s' does not implement 'solve_nonlinear'"
         raise NotImplementedError(msg  % self.__class__.__name__)
 
+    def solve_nonlinear_batch(self, params, unknowns, resids):
+        """
+        Runs the component for many cases at once. Components that can
+        evaluate a whole block of cases with array operations may override
+        this, and a `PredeterminedRunsDriver` with a 'batch_size' greater
+        than 1 will then call it instead of solve_nonlinear. Components that
+        don't override it are run once per case.
+
+        Args
+        ----
+        params : dict
+            Arrays of parameter values whose first axis is the case, in the
+            units of this component.
+
+        unknowns : dict
+            Arrays of outputs and states whose first axis is the case. The
+            results should be written into them, or the arrays replaced.
+
+        resids : dict
+            Arrays of residuals whose first axis is the case.
+        """
+
+        msg = "Class '%s' does not implement 'solve_nonlinear_batch'"
+        raise NotImplementedError(msg  % self.__class__.__name__)
+
     def linearize(self, params, unknowns, resids):
         """
         Returns Jacobian. Returns None unless component overides this method
@@ -13,9 +13,13 @@ import numpy as np
 
 from openmdao.core.mpi_wrap import MPI
 from openmdao.util.options import OptionsDictionary
-from openmdao.recorders.recording_manager import RecordingManager
+from openmdao.recorders.recording_manager import RecordingManager, \
+                                                  recording_disabled, \
+                                                  _solver_managers
 from openmdao.util.record_util import create_local_meta, update_local_meta
 from openmdao.core.vec_wrapper import _ByObjWrapper
+from openmdao.core.eval_cache import EvalCache
+from openmdao.core.system import AnalysisError
 
 trace = os.environ.get('OPENMDAO_TRACE')
 if trace:
@@ -25,6 +29,17 @@ class Driver(object):
     """ Base class for drivers in OpenMDAO. Drivers can only be placed in a
     Problem, and every problem has a Driver. Driver is the simplest driver that
     runs (solves using solve_nonlinear) a problem once.
+
+    Options
+    -------
+    options['eval_cache_file'] :  str('')
+        Name of a file used to keep the evaluation cache across runs.
+    options['eval_cache_size'] :  int(0)
+        Maximum number of design points whose model evaluations and gradients
+        are cached. 0 turns the cache off.
+    options['eval_cache_tol'] :  float(0.0)
+        If nonzero, scaled design variables within this tolerance of a cached
+        design point reuse its evaluation.
     """
 
     def __init__(self):
@@ -47,6 +62,17 @@ class Driver(object):
 
         # This driver's options
         self.options = OptionsDictionary()
+        self.options.add_option('eval_cache_size', 0, lower=0,
+                                desc='Maximum number of design points whose '
+                                     'model evaluations and gradients are '
+                                     'cached. 0 turns the cache off.')
+        self.options.add_option('eval_cache_tol', 0.0, lower=0.0,
+                                desc='If nonzero, scaled design variables '
+                                     'within this tolerance of a cached design '
+                                     'point reuse its evaluation.')
+        self.options.add_option('eval_cache_file', '',
+                                desc='Name of a file used to keep the '
+                                     'evaluation cache across runs.')
 
         self._desvars = OrderedDict()
         self._objs = OrderedDict()
@@ -62,6 +88,8 @@ class Driver(object):
         self.dv_conversions = {}
         self.fn_conversions = {}
 
+        self._eval_cache = None
+
     def _setup(self):
         """ Updates metadata for params, constraints and objectives, and
         check for errors. Also determines all variables that need to be
@@ -155,6 +183,15 @@ class Driver(object):
 
             self.fn_conversions[name] = scaler
 
+        if self._eval_cache is not None:
+            self._eval_cache.close()
+            self._eval_cache = None
+        # drivers may replace the options with their own
+        if self.options.get('eval_cache_size', 0) > 0:
+            self._eval_cache = EvalCache(self.options['eval_cache_size'],
+                                         tol=self.options['eval_cache_tol'],
+                                         filename=self.options['eval_cache_file'])
+
     def _setup_communicators(self, comm, parent_dir):
         """
         Assign a communicator to the root `System`.
@@ -182,6 +219,8 @@ class Driver(object):
     def cleanup(self):
         """ Clean up resources prior to exit. """
         self.recorders.close()
+        if self._eval_cache is not None:
+            self._eval_cache.close()
 
     def _map_voi_indices(self):
         poi_indices = OrderedDict()
@@ -754,10 +793,44 @@ class Driver(object):
 
         # Solve the system once and record results.
         with system._dircontext:
-            system.solve_nonlinear(metadata=metadata)
+            self._solve_nonlinear(metadata)
 
         self.recorders.record_iteration(system, metadata)
 
+    def _eval_cache_key(self):
+        """ Returns the evaluation cache key of the current design point."""
+        vals = [np.asarray(val, dtype=float).flatten()
+                for val in self.get_desvars().values()]
+        return self._eval_cache.key(np.concatenate(vals) if vals else [])
+
+    def _solve_nonlinear(self, metadata):
+        """ Runs root's solve_nonlinear at the current design point. If the
+        evaluation cache is on and the design point is in it, the results of
+        the earlier evaluation are restored instead.
+
+        Args
+        ----
+        metadata : dict
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+
+        Returns
+        -------
+        bool
+            True if the model was run, False if the results came from the cache.
+        """
+        cache = self._eval_cache
+        if cache is None:
+            self.root.solve_nonlinear(metadata=metadata)
+            return True
+
+        key = self._eval_cache_key()
+        if cache.restore(key, self.root):
+            return False
+
+        self.root.solve_nonlinear(metadata=metadata)
+        cache.save(key, self.root)
+        return True
+
     def calc_gradient(self, indep_list, unknown_list, mode='auto',
                       return_format='array', sparsity=None, inactives=None):
         """ Returns the scaled gradient for the system that is contained in
@@ -798,15 +871,103 @@ class Driver(object):
             Jacobian of unknowns with respect to params.
         """
 
-        J = self._problem.calc_gradient(indep_list, unknown_list, mode=mode,
-                                        return_format=return_format,
-                                        dv_scale=self.dv_conversions,
-                                        cn_scale=self.fn_conversions,
-                                        sparsity=sparsity, inactives=inactives)
+        cache = self._eval_cache
+        J = None
+        if cache is not None:
+            key = self._eval_cache_key()
+            gkey = repr((indep_list, unknown_list, mode, return_format,
+                         sparsity, inactives))
+            J = cache.get_gradient(key, gkey)
+
+        if J is None:
+            J = self._problem.calc_gradient(indep_list, unknown_list, mode=mode,
+                                            return_format=return_format,
+                                            dv_scale=self.dv_conversions,
+                                            cn_scale=self.fn_conversions,
+                                            sparsity=sparsity,
+                                            inactives=inactives)
+            if cache is not None:
+                cache.save_gradient(key, gkey, J)
 
         self.recorders.record_derivatives(J, self.metadata)
         return J
 
+    def _probe_sparsity(self, problem, indep_list, cons, num_probes, tol=0.0):
+        """ Calculates the unscaled Jacobian of the constraints at random
+        design points to find which of its entries are nonzero. The points
+        are drawn within the bounds of the design variables, and no further
+        than 1 + abs(value) from the starting point. The model is left at the
+        starting point afterwards. Nothing is recorded or cached while
+        probing.
+
+        Args
+        ----
+        problem : `Problem`
+            The problem this driver is running.
+
+        indep_list : list
+            Names of the design variables.
+
+        cons : list
+            Names of the constraints.
+
+        num_probes : int
+            Number of random design points.
+
+        tol : float, optional
+            An entry is nonzero if, at any of the points, its magnitude is
+            more than `tol` times the largest magnitude in its block.
+
+        Returns
+        -------
+        dict
+            Boolean array of the nonzero entries of each block of the
+            Jacobian, keyed by constraint name and then design variable name.
+        """
+        root = self.root
+        param_meta = self.get_desvar_metadata()
+        x0 = OrderedDict((name, np.array(val, dtype=float))
+                         for name, val in iteritems(self.get_desvars()))
+        rand = np.random.RandomState(0)
+
+        patterns = {}
+        managers = [self.recorders] + list(_solver_managers(root))
+        with recording_disabled(managers):
+            try:
+                for i in range(num_probes):
+                    for name, val in iteritems(x0):
+                        meta = param_meta[name]
+                        width = 1.0 + np.abs(val)
+                        low = np.maximum(meta['lower'], val - width)
+                        high = np.minimum(meta['upper'], val + width)
+                        self.set_desvar(name, low + (high - low) *
+                                        rand.random_sample(val.shape))
+
+                    try:
+                        with root._dircontext:
+                            root.solve_nonlinear(metadata=self.metadata)
+                        J = problem.calc_gradient(indep_list, cons,
+                                                  return_format='dict')
+                    except AnalysisError:
+                        continue
+
+                    for con in cons:
+                        con_pattern = patterns.setdefault(con, {})
+                        for param in indep_list:
+                            block = np.abs(np.asarray(J[con][param]))
+                            nonzero = block > tol*block.max()
+                            if param in con_pattern:
+                                con_pattern[param] |= nonzero
+                            else:
+                                con_pattern[param] = nonzero
+            finally:
+                for name, val in iteritems(x0):
+                    self.set_desvar(name, val)
+                with root._dircontext:
+                    root.solve_nonlinear(metadata=self.metadata)
+
+        return patterns
+
     def generate_docstring(self):
         """
         Generates a numpy-style docstring for a user-created Driver class.
@@ -0,0 +1,206 @@
+""" Class definition for EvalCache, a cache of model evaluations keyed by
+the design point."""
+
+import copy
+from binascii import hexlify
+from collections import OrderedDict
+
+from six import iteritems
+
+import numpy as np
+
+from openmdao.core.vec_wrapper import _ByObjWrapper
+
+
+class EvalCache(object):
+    """
+    Least recently used cache of model evaluations, keyed by the scaled
+    design vector of a `Driver`.
+
+    Each entry holds copies of the unknowns, params and resids vectors of
+    the root `System` after it was solved at a design point, along with any
+    gradients that were calculated there. Restoring an entry puts the model
+    back in the state it had after the evaluation, so objectives and
+    constraints can be read from it as usual without running it again.
+
+    Args
+    ----
+    maxsize : int
+        Maximum number of design points to keep.
+
+    tol : float, optional
+        If greater than zero, design vectors are rounded to a multiple of
+        `tol` before they are compared, so points closer than `tol` share an
+        entry. By default only identical design vectors match.
+
+    filename : str, optional
+        If given, entries are also kept in a sqlite file with this name, and
+        entries already in the file are loaded, so the cache can be used
+        across runs.
+    """
+
+    def __init__(self, maxsize, tol=0.0, filename=None):
+        self.maxsize = maxsize
+        self.tol = tol
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._db = None
+
+        if filename:
+            from sqlitedict import SqliteDict
+            self._db = SqliteDict(filename=filename, flag='c',
+                                  tablename='eval_cache', autocommit=True)
+            for key, entry in iteritems(self._db):
+                self._entries[key] = entry
+            while len(self._entries) > maxsize:
+                key, _ = self._entries.popitem(last=False)
+                del self._db[key]
+
+    def __getstate__(self):
+        # the backing file stays with the process that opened it
+        state = self.__dict__.copy()
+        state['_db'] = None
+        return state
+
+    def key(self, x):
+        """
+        Args
+        ----
+        x : ndarray
+            Flattened, scaled design vector.
+
+        Returns
+        -------
+        str
+            The key for the design point `x`.
+        """
+        x = np.asarray(x, dtype=float).flatten() + 0.0  # turns -0.0 into 0.0
+        if self.tol > 0.0:
+            x = np.round(x / self.tol).astype(np.int64)
+        return hexlify(x.tobytes()).decode('ascii')
+
+    def _get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._entries[key] = entry
+        return entry
+
+    def _put(self, key, entry):
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        if self._db is not None:
+            self._db[key] = entry
+        while len(self._entries) > self.maxsize:
+            old, _ = self._entries.popitem(last=False)
+            if self._db is not None:
+                del self._db[old]
+
+    def restore(self, key, root):
+        """ Restores the state of `root` after an evaluation at the design
+        point `key`.
+
+        Args
+        ----
+        key : str
+            Key of the design point.
+
+        root : `System`
+            The root `System` of the model.
+
+        Returns
+        -------
+        bool
+            True if the design point was found, False otherwise.
+        """
+        entry = self._get(key)
+        if entry is None or \
+           entry['sizes'] != tuple(v.vec.size for v in _vecs(root)):
+            self.misses += 1
+            return False
+
+        for vec, (flat, pbos) in zip(_vecs(root), entry['vecs']):
+            vec.vec[:] = flat
+            for name, val in iteritems(pbos):
+                vec._dat[name].val.val = copy.deepcopy(val)
+
+        self.hits += 1
+        return True
+
+    def save(self, key, root):
+        """ Saves the state of `root` after it was evaluated at the design
+        point `key`.
+
+        Args
+        ----
+        key : str
+            Key of the design point.
+
+        root : `System`
+            The root `System` of the model.
+        """
+        vecs = []
+        for vec in _vecs(root):
+            pbos = {}
+            for name, acc in iteritems(vec._dat):
+                if isinstance(acc.val, _ByObjWrapper):
+                    pbos[name] = copy.deepcopy(acc.val.val)
+            vecs.append((vec.vec.copy(), pbos))
+
+        self._put(key, {
+            'sizes': tuple(v.vec.size for v in _vecs(root)),
+            'vecs': vecs,
+            'grads': {},
+        })
+
+    def get_gradient(self, key, gkey):
+        """
+        Args
+        ----
+        key : str
+            Key of the design point.
+
+        gkey : str
+            Key describing the requested gradient.
+
+        Returns
+        -------
+        ndarray or dict
+            A copy of the gradient calculated at the design point, or None if
+            it isn't in the cache.
+        """
+        entry = self._get(key)
+        if entry is None or gkey not in entry['grads']:
+            return None
+        return copy.deepcopy(entry['grads'][gkey])
+
+    def save_gradient(self, key, gkey, J):
+        """ Saves a gradient calculated at the design point `key`. Nothing is
+        saved if the design point itself isn't in the cache.
+
+        Args
+        ----
+        key : str
+            Key of the design point.
+
+        gkey : str
+            Key describing the gradient.
+
+        J : ndarray or dict
+            The gradient.
+        """
+        entry = self._get(key)
+        if entry is not None:
+            entry['grads'][gkey] = copy.deepcopy(J)
+            if self._db is not None:
+                self._db[key] = entry
+
+    def close(self):
+        """ Closes the backing file, if any. """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _vecs(root):
+    return (root.unknowns, root.params, root.resids)
@@ -5,6 +5,8 @@ from __future__ import print_function
 import sys
 import os
 import re
+import traceback
+import multiprocessing
 from collections import Counter, OrderedDict
 from six import iteritems, itervalues
 from six.moves import zip_longest
@@ -19,6 +21,8 @@ from openmdao.core.component import Component
 from openmdao.core.mpi_wrap import MPI, debug
 from openmdao.core.system import System
 from openmdao.core.fileref import FileRef
+from openmdao.recorders.recording_manager import recording_disabled, \
+                                                  _solver_managers
 from openmdao.util.string_util import nearest_child, name_relative_to
 from openmdao.util.graph import collapse_nodes, break_strongly_connected
 
@@ -63,11 +67,23 @@ class Group(System):
         in check_partial_derivatives"
     deriv_options['linearize'] : bool(False)
         Set to True if you want linearize to be called even though you are using FD.
+    deriv_options['fd_procs'] : int(1)
+        Number of local processes used to finite difference this group when
+        not running under MPI. This includes total derivatives when the
+        group is the root. Under MPI it is ignored; use a `ParallelFDGroup`
+        to split the finite difference over MPI processes.
     """
 
     def __init__(self):
         super(Group, self).__init__()
 
+        self.deriv_options.add_option('fd_procs', 1, lower=1,
+                       desc="Number of local processes used to finite "
+                       "difference this group when not running under MPI. "
+                       "The processes are forked each time the Jacobian is "
+                       "calculated, and each does a share of the columns. "
+                       "Under MPI, use a ParallelFDGroup instead.")
+
         self._src = OrderedDict()
         self._data_xfer = OrderedDict()
 
@@ -835,6 +851,93 @@ class Group(System):
         for sub in self._local_subsystems:
             sub._sys_linearize(sub.params, sub.unknowns, sub.resids)
 
+    def fd_jacobian(self, params, unknowns, resids, *args, **kwargs):
+        """Finite difference across all unknowns in this system w.r.t. all
+        incoming params. Without MPI, the columns are split among
+        deriv_options['fd_procs'] local processes that are forked from this
+        one, so each holds a copy of the model. Their results are gathered
+        through shared memory. See `System.fd_jacobian` for the arguments.
+
+        Returns
+        -------
+        dict
+            Dictionary whose keys are tuples of the form ('unknown', 'param')
+            and whose values are ndarrays containing the derivative for that
+            tuple pair.
+        """
+        fd_jac = super(Group, self).fd_jacobian
+        nprocs = self.deriv_options['fd_procs']
+        ctx = _fork_context()
+        if MPI or nprocs <= 1 or ctx is None:
+            return fd_jac(params, unknowns, resids, *args, **kwargs)
+
+        self._num_par_fds = nprocs
+        try:
+            # a pass where this process does none of the columns doesn't run
+            # the model, but gives us the layout of the Jacobian
+            self._par_fd_id = -1
+            jac = fd_jac(params, unknowns, resids, *args, **kwargs)
+            layout = []
+            size = 0
+            for key, val in jac.items():
+                layout.append((key, size, val.shape))
+                size += val.size
+
+            shared = ctx.RawArray('d', nprocs * size)
+            cols = np.frombuffer(shared).reshape(nprocs, size)
+
+            def _worker(fd_id):
+                # the solves in this process are not recorded, and it exits
+                # without running any cleanup, so the files and threads of
+                # the recorders it inherited are left to the parent
+                self._par_fd_id = fd_id
+                status = 1
+                try:
+                    with recording_disabled(_solver_managers(self)):
+                        sub_jac = fd_jac(params, unknowns, resids, *args,
+                                         **kwargs)
+                    for key, start, shape in layout:
+                        cols[fd_id, start:start+int(np.prod(shape))] = \
+                            np.broadcast_to(sub_jac[key], shape).flat
+                    status = 0
+                except Exception:
+                    traceback.print_exc()
+                finally:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    os._exit(status)
+
+            procs = [ctx.Process(target=_worker, args=(i,))
+                     for i in range(1, nprocs)]
+            for proc in procs:
+                proc.start()
+
+            # this process does its share of the columns while it waits
+            try:
+                self._par_fd_id = 0
+                jac = fd_jac(params, unknowns, resids, *args, **kwargs)
+            finally:
+                for proc in procs:
+                    proc.join()
+
+            failed = [i+1 for i, proc in enumerate(procs) if proc.exitcode != 0]
+            if failed:
+                raise RuntimeError("'%s': finite difference failed in local "
+                                   "worker process(es) %s." % (self.pathname,
+                                                               failed))
+        finally:
+            self._num_par_fds = 1
+            self._par_fd_id = 0
+
+        # each column was done by exactly one process and is zero in the
+        # others, so the sum over processes is the full Jacobian
+        total = cols[1:].sum(axis=0)
+        for key, start, shape in layout:
+            jac[key] = np.broadcast_to(jac[key], shape) + \
+                       total[start:start+int(np.prod(shape))].reshape(shape)
+
+        return jac
+
     def _sys_apply_linear(self, mode, do_apply, vois=(None,), gs_outputs=None,
                           rel_inputs=None):
         """Calls apply_linear on our children. If our child is a `Component`,
@@ -1769,3 +1872,18 @@ class Group(System):
                     _dump(s, stream)
         else:
             _dump(self, stream)
+
+
+def _fork_context():
+    """Returns the multiprocessing context used to fork local FD workers, or
+    None if processes can't be forked on this platform.
+    """
+    if sys.platform == 'win32':
+        return None
+    try:
+        return multiprocessing.get_context('fork')
+    except AttributeError:
+        # python 2 always forks
+        return multiprocessing
+    except ValueError:
+        return None
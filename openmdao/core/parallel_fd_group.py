@@ -17,6 +17,10 @@ if trace: # pragma: no cover
 class ParallelFDGroup(Group):
     """A Group that can do finite difference in parallel.
 
+    Under MPI, the columns of the finite difference are split among groups
+    of processes. Without MPI, deriv_options['fd_procs'] defaults to
+    `num_par_fds`, so they are split among local worker processes instead.
+
     Args
     ----
     num_par_fds : int(1)
@@ -54,6 +58,10 @@ class ParallelFDGroup(Group):
         in check_partial_derivatives"
     deriv_options['linearize'] : bool(False)
         Set to True if you want linearize to be called even though you are using FD.
+    deriv_options['fd_procs'] : int(num_par_fds)
+        Number of local processes used to finite difference this group when
+        not running under MPI. Under MPI, `num_par_fds` sets how the
+        finite difference is split over MPI processes instead.
     """
     def __init__(self, num_par_fds):
         super(ParallelFDGroup, self).__init__()
@@ -62,6 +70,9 @@ class ParallelFDGroup(Group):
         self._num_par_fds = num_par_fds
         self._par_fd_id = 0
 
+        if num_par_fds > 1:
+            self.deriv_options['fd_procs'] = num_par_fds
+
     def _setup_communicators(self, comm, parent_dir):
         """
         Assign communicator to this `Group` and all of its subsystems.
@@ -45,6 +45,10 @@ class ParallelGroup(Group):
         in check_partial_derivatives"
     deriv_options['linearize'] : bool(False)
         Set to True if you want linearize to be called even though you are using FD.
+    deriv_options['fd_procs'] : int(1)
+        Number of local processes used to finite difference this group when
+        not running under MPI. Under MPI it is ignored; use a `ParallelFDGroup`
+        to split the finite difference over MPI processes.
     """
 
     def apply_nonlinear(self, params, unknowns, resids, metadata=None):
@@ -5,6 +5,8 @@ from __future__ import print_function
 import os
 import sys
 import json
+import hashlib
+import inspect
 import warnings
 import traceback
 from collections import OrderedDict
@@ -16,7 +18,7 @@ import networkx as nx
 import numpy as np
 
 from openmdao.core.system import System
-from openmdao.core.group import Group
+from openmdao.core.group import Group, _fork_context
 from openmdao.core.component import Component
 from openmdao.core.parallel_group import ParallelGroup
 from openmdao.core.parallel_fd_group import ParallelFDGroup
@@ -1813,7 +1815,8 @@ class Problem(object):
 
     def check_partial_derivatives(self, out_stream=sys.stdout, comps=None,
                                   compact_print=False, abs_err_tol=1.0E-6,
-                                  rel_err_tol=1.0E-6, global_options=None):
+                                  rel_err_tol=1.0E-6, global_options=None,
+                                  num_procs=1, cache_file=None):
         """ Checks partial derivatives comprehensively for all components in
         your model.
 
@@ -1848,6 +1851,18 @@ class Problem(object):
             Only 'check_form', 'check_step_size', 'check_step_calc', and 'check_type'
             can be specified in this way.
 
+        num_procs : int
+            Number of local processes to check components in. Components are
+            checked in isolation, so they are split among processes that are
+            forked from this one. Ignored under MPI or where processes can't
+            be forked. Default is 1.
+
+        cache_file : str, optional
+            If given, the results for each component are recorded in a sqlite
+            file with this name. A component whose source file, variable
+            values and check options haven't changed since its results were
+            recorded isn't checked again, and its recorded results are used.
+
         Returns
         -------
         Dict of Dicts of Dicts
@@ -1889,9 +1904,6 @@ class Problem(object):
 
         data = {}
 
-        # Derivatives should just be checked without parallel adjoint for now.
-        voi = None
-
         # Check derivative calculations for all comps at every level of the
         # system hierarchy.
         allcomps = root.components(recurse=True)
@@ -1911,213 +1923,348 @@ class Problem(object):
 
             comps = [root.find_subsystem(c_name) for c_name in comps]
 
+        # IndepVarComps are just clutter.
+        comps = [comp for comp in comps if not isinstance(comp, IndepVarComp)]
+        check_args = (compact_print, abs_err_tol, rel_err_tol, global_options)
+
+        # In incremental mode, results are reused for components whose
+        # source and values haven't changed since they were recorded.
+        results = {}
+        keys = {}
+        db = None
+        if cache_file:
+            from sqlitedict import SqliteDict
+            db = SqliteDict(filename=cache_file, flag='c',
+                            tablename='check_partials', autocommit=True)
+
+        try:
+            todo = []
+            for comp in comps:
+                if db is not None:
+                    key = _check_partials_key(comp, check_args)
+                    entry = db.get(comp.pathname)
+                    if key is not None and entry is not None and \
+                       entry[0] == key:
+                        results[comp.pathname] = entry[1]
+                        continue
+                    keys[comp.pathname] = key
+                todo.append(comp)
+
+            checked = self._check_partials_local(todo, num_procs, *check_args)
+            results.update(checked)
+
+            if db is not None:
+                for cname, result in iteritems(checked):
+                    if keys[cname] is not None:
+                        db[cname] = (keys[cname], result)
+        finally:
+            if db is not None:
+                db.close()
+
         for comp in comps:
+            cdata, text = results[comp.pathname]
+            if out_stream is not None:
+                out_stream.write(text)
+            if cdata is not None:
+                data[comp.pathname] = cdata
 
-            # IndepVarComps are just clutter.
-            if isinstance(comp, IndepVarComp):
-                continue
+        return data
 
-            cname = comp.pathname
-            opt = comp.deriv_options
+    def _check_partials_local(self, comps, num_procs, *args):
+        """ Checks the partial derivatives of `comps`. Components are checked
+        in isolation, so without MPI they are split among `num_procs` local
+        processes that are forked from this one. The results are sent back
+        to this process through pipes.
 
-            ch_step_size = opt['check_step_size']
-            ch_form = opt['check_form']
-            ch_step_calc = opt['check_step_calc']
-            ch_type = opt['check_type']
+        Args
+        ----
+        comps : list of `Component`
+            The components to check.
 
-            # Support for user-override of options in check_partial_derivatives
-            if global_options:
-                ch_step_size = global_options.get('check_step_size', ch_step_size)
-                ch_form = global_options.get('check_form', ch_form)
-                ch_step_calc = global_options.get('check_step_calc', ch_step_calc)
-                ch_type = global_options.get('check_type', ch_type)
+        num_procs : int
+            Number of local processes to use.
 
-            fwd_rev = True
-            f_d_2 = True
-            if opt['type'] == 'cs':
-                fd_desc2 = 'complex step'
-            else:
-                fd_desc2 = opt['type'] + ':' + opt['form']
+        *args :
+            Remaining arguments of `_check_comp_partials`.
 
-            if ch_type== 'cs':
-                fd_desc = 'complex step'
-            else:
-                fd_desc = ch_type + ':' + ch_form
+        Returns
+        -------
+        dict
+            The results of `_check_comp_partials`, keyed by component pathname.
+        """
+        nprocs = min(num_procs, len(comps))
+        ctx = _fork_context()
+        if MPI or nprocs <= 1 or ctx is None:
+            return dict((comp.pathname, self._check_comp_partials(comp, *args))
+                        for comp in comps)
 
-            if out_stream is not None:
+        def _worker(rank, conn):
+            try:
+                result = dict((comp.pathname,
+                               self._check_comp_partials(comp, *args))
+                              for comp in comps[rank::nprocs])
+            except Exception as err:
+                result = err
+            try:
+                conn.send(result)
+            except Exception:
+                # the error can't be pickled, so send the traceback instead
+                conn.send(RuntimeError(traceback.format_exc()))
+            conn.close()
+
+        pipes = []
+        procs = []
+        for rank in range(1, nprocs):
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_worker, args=(rank, child_conn))
+            proc.start()
+            child_conn.close()
+            pipes.append(parent_conn)
+            procs.append(proc)
+
+        # this process checks its share of the components while it waits
+        results = {}
+        received = []
+        try:
+            for comp in comps[0::nprocs]:
+                results[comp.pathname] = self._check_comp_partials(comp, *args)
+        finally:
+            for rank, conn in enumerate(pipes):
+                try:
+                    received.append(conn.recv())
+                except EOFError:
+                    received.append(RuntimeError("Checking partial derivatives "
+                                                 "failed in local worker "
+                                                 "process %d." % (rank+1)))
+                conn.close()
+            for proc in procs:
+                proc.join()
+
+        for result in received:
+            if isinstance(result, Exception):
+                raise result
+            results.update(result)
 
-                if compact_print:
-                    check_desc = "    (Check Type: %s)" % fd_desc
-                else:
-                    check_desc = ""
+        return results
 
-                out_stream.write('-'*(len(cname)+15) + '\n')
-                out_stream.write("Component: '%s'%s\n" % (cname, check_desc))
-                out_stream.write('-'*(len(cname)+15) + '\n')
+    def _check_comp_partials(self, comp, compact_print, abs_err_tol,
+                             rel_err_tol, global_options):
+        """ Checks the partial derivatives of a single component. See
+        `check_partial_derivatives` for the arguments.
 
-            if opt['type'] == 'user':
-                f_d_2 = False
-            else:
-                # If we don't have analytic, then only continue if we are
-                # comparing 2 different fds.
-                if opt['type'] == ch_type and \
-                   opt['form'] == ch_form and \
-                   opt['step_calc'] == ch_step_calc and \
-                   opt['step_size'] == ch_step_size:
-                    if out_stream is not None:
-                        out_stream.write('Skipping because type == check_type.\n')
-                    continue
-                f_d_2 = True
-                fwd_rev = False
-
-            data[cname] = {}
-            jac_fwd = OrderedDict()
-            jac_rev = OrderedDict()
-            jac_fd = OrderedDict()
-            jac_fd2 = OrderedDict()
-
-            params = comp.params
-            unknowns = comp.unknowns
-            resids = comp.resids
-            dparams = comp.dpmat[voi]
-            dunknowns = comp.dumat[voi]
-            dresids = comp.drmat[voi]
-            states = comp.states
-
-            # Skip if all of our inputs are unconnected.
-            if len(dparams) == 0:
-                if out_stream is not None:
-                    out_stream.write('Skipping because component has no connected inputs.')
-                continue
+        Returns
+        -------
+        tuple
+            The derivative data of the component, or None if it was skipped,
+            and the human readable output of the check.
+        """
+        root = self.root
+        out_stream = cStringIO()
 
-            # Work with all params that are not pbo.
-            param_list = [item for item in dparams if not \
-                          dparams.metadata(item).get('pass_by_obj')]
-            param_list.extend(states)
-            unkn_list = [item for item in dunknowns if not \
-                         dunknowns.metadata(item).get('pass_by_obj')]
+        # Derivatives should just be checked without parallel adjoint for now.
+        voi = None
 
-            # Create all our keys and allocate Jacs
-            for p_name in param_list:
+        cname = comp.pathname
+        opt = comp.deriv_options
+
+        ch_step_size = opt['check_step_size']
+        ch_form = opt['check_form']
+        ch_step_calc = opt['check_step_calc']
+        ch_type = opt['check_type']
+
+        # Support for user-override of options in check_partial_derivatives
+        if global_options:
+            ch_step_size = global_options.get('check_step_size', ch_step_size)
+            ch_form = global_options.get('check_form', ch_form)
+            ch_step_calc = global_options.get('check_step_calc', ch_step_calc)
+            ch_type = global_options.get('check_type', ch_type)
+
+        fwd_rev = True
+        f_d_2 = True
+        if opt['type'] == 'cs':
+            fd_desc2 = 'complex step'
+        else:
+            fd_desc2 = opt['type'] + ':' + opt['form']
 
-                # No need to pre-allocate if we are not calculating them
-                if not fwd_rev:
-                    break
+        if ch_type== 'cs':
+            fd_desc = 'complex step'
+        else:
+            fd_desc = ch_type + ':' + ch_form
 
-                dinputs = dunknowns if p_name in states else dparams
-                p_size = np.size(dinputs[p_name])
+        if out_stream is not None:
 
-                # Check dimensions of user-supplied Jacobian
-                for u_name in unkn_list:
+            if compact_print:
+                check_desc = "    (Check Type: %s)" % fd_desc
+            else:
+                check_desc = ""
 
-                    u_size = np.size(dunknowns[u_name])
-                    if comp._jacobian_cache:
+            out_stream.write('-'*(len(cname)+15) + '\n')
+            out_stream.write("Component: '%s'%s\n" % (cname, check_desc))
+            out_stream.write('-'*(len(cname)+15) + '\n')
 
-                        # We can perform some additional helpful checks.
-                        if (u_name, p_name) in comp._jacobian_cache:
+        if opt['type'] == 'user':
+            f_d_2 = False
+        else:
+            # If we don't have analytic, then only continue if we are
+            # comparing 2 different fds.
+            if opt['type'] == ch_type and \
+               opt['form'] == ch_form and \
+               opt['step_calc'] == ch_step_calc and \
+               opt['step_size'] == ch_step_size:
+                if out_stream is not None:
+                    out_stream.write('Skipping because type == check_type.\n')
+                return None, out_stream.getvalue()
+            f_d_2 = True
+            fwd_rev = False
+
+        cdata = {}
+        jac_fwd = OrderedDict()
+        jac_rev = OrderedDict()
+        jac_fd = OrderedDict()
+        jac_fd2 = OrderedDict()
+
+        params = comp.params
+        unknowns = comp.unknowns
+        resids = comp.resids
+        dparams = comp.dpmat[voi]
+        dunknowns = comp.dumat[voi]
+        dresids = comp.drmat[voi]
+        states = comp.states
+
+        # Skip if all of our inputs are unconnected.
+        if len(dparams) == 0:
+            if out_stream is not None:
+                out_stream.write('Skipping because component has no connected inputs.')
+            return cdata, out_stream.getvalue()
 
-                            user = comp._jacobian_cache[(u_name, p_name)].shape
+        # Work with all params that are not pbo.
+        param_list = [item for item in dparams if not \
+                      dparams.metadata(item).get('pass_by_obj')]
+        param_list.extend(states)
+        unkn_list = [item for item in dunknowns if not \
+                     dunknowns.metadata(item).get('pass_by_obj')]
 
-                            # User may use floats for scalar jacobians
-                            if len(user) < 2:
-                                user = (user[0], 1)
+        # Create all our keys and allocate Jacs
+        for p_name in param_list:
+
+            # No need to pre-allocate if we are not calculating them
+            if not fwd_rev:
+                break
 
-                            if user[0] != u_size or user[1] != p_size:
-                                msg = "derivative in component '{}' of '{}' wrt '{}' is the wrong size. " + \
-                                      "It should be {}, but got {}"
-                                msg = msg.format(cname, u_name, p_name, (u_size, p_size), user)
-                                raise ValueError(msg)
+            dinputs = dunknowns if p_name in states else dparams
+            p_size = np.size(dinputs[p_name])
 
-                    jac_fwd[(u_name, p_name)] = np.zeros((u_size, p_size))
-                    jac_rev[(u_name, p_name)] = np.zeros((u_size, p_size))
+            # Check dimensions of user-supplied Jacobian
+            for u_name in unkn_list:
 
-            # Reverse derivatives first
-            if fwd_rev:
-                for u_name in unkn_list:
-                    u_size = np.size(dunknowns[u_name])
+                u_size = np.size(dunknowns[u_name])
+                if comp._jacobian_cache:
 
-                    # Send columns of identity
-                    for idx in range(u_size):
-                        dresids.vec[:] = 0.0
-                        root.clear_dparams()
-                        dunknowns.vec[:] = 0.0
+                    # We can perform some additional helpful checks.
+                    if (u_name, p_name) in comp._jacobian_cache:
 
-                        dresids._dat[u_name].val[idx] = 1.0
-                        dresids._scale_derivatives()
-                        try:
-                            comp.apply_linear(params, unknowns, dparams,
-                                              dunknowns, dresids, 'rev')
-                        finally:
-                            dparams._apply_unit_derivatives()
-                            dunknowns._scale_derivatives()
+                        user = comp._jacobian_cache[(u_name, p_name)].shape
 
-                        for p_name in param_list:
+                        # User may use floats for scalar jacobians
+                        if len(user) < 2:
+                            user = (user[0], 1)
 
-                            dinputs = dunknowns if p_name in states else dparams
-                            jac_rev[(u_name, p_name)][idx, :] = dinputs._dat[p_name].val
+                        if user[0] != u_size or user[1] != p_size:
+                            msg = "derivative in component '{}' of '{}' wrt '{}' is the wrong size. " + \
+                                  "It should be {}, but got {}"
+                            msg = msg.format(cname, u_name, p_name, (u_size, p_size), user)
+                            raise ValueError(msg)
 
-            # Forward derivatives second
-            if fwd_rev:
-                for p_name in param_list:
+                jac_fwd[(u_name, p_name)] = np.zeros((u_size, p_size))
+                jac_rev[(u_name, p_name)] = np.zeros((u_size, p_size))
 
-                    dinputs = dunknowns if p_name in states else dparams
-                    p_size = np.size(dinputs[p_name])
+        # Reverse derivatives first
+        if fwd_rev:
+            for u_name in unkn_list:
+                u_size = np.size(dunknowns[u_name])
 
-                    # Send columns of identity
-                    for idx in range(p_size):
-                        dresids.vec[:] = 0.0
-                        root.clear_dparams()
-                        dunknowns.vec[:] = 0.0
+                # Send columns of identity
+                for idx in range(u_size):
+                    dresids.vec[:] = 0.0
+                    root.clear_dparams()
+                    dunknowns.vec[:] = 0.0
 
-                        dinputs._dat[p_name].val[idx] = 1.0
+                    dresids._dat[u_name].val[idx] = 1.0
+                    dresids._scale_derivatives()
+                    try:
+                        comp.apply_linear(params, unknowns, dparams,
+                                          dunknowns, dresids, 'rev')
+                    finally:
                         dparams._apply_unit_derivatives()
                         dunknowns._scale_derivatives()
-                        comp.apply_linear(params, unknowns, dparams,
-                                          dunknowns, dresids, 'fwd')
-                        dresids._scale_derivatives()
 
-                        for u_name, u_val in dresids.vec_val_iter():
-                            jac_fwd[(u_name, p_name)][:, idx] = u_val
+                    for p_name in param_list:
+
+                        dinputs = dunknowns if p_name in states else dparams
+                        jac_rev[(u_name, p_name)][idx, :] = dinputs._dat[p_name].val
+
+        # Forward derivatives second
+        if fwd_rev:
+            for p_name in param_list:
+
+                dinputs = dunknowns if p_name in states else dparams
+                p_size = np.size(dinputs[p_name])
+
+                # Send columns of identity
+                for idx in range(p_size):
+                    dresids.vec[:] = 0.0
+                    root.clear_dparams()
+                    dunknowns.vec[:] = 0.0
+
+                    dinputs._dat[p_name].val[idx] = 1.0
+                    dparams._apply_unit_derivatives()
+                    dunknowns._scale_derivatives()
+                    comp.apply_linear(params, unknowns, dparams,
+                                      dunknowns, dresids, 'fwd')
+                    dresids._scale_derivatives()
 
-            # Finite Difference goes last
+                    for u_name, u_val in dresids.vec_val_iter():
+                        jac_fwd[(u_name, p_name)][:, idx] = u_val
+
+        # Finite Difference goes last
+        dresids.vec[:] = 0.0
+        root.clear_dparams()
+        dunknowns.vec[:] = 0.0
+
+        # Component can request to use complex step.
+        if ch_type == 'cs':
+            fd_func = comp.complex_step_jacobian
+        else:
+            fd_func = comp.fd_jacobian
+
+        jac_fd = fd_func(params, unknowns, resids, use_check=True,
+                         option_overrides=global_options)
+
+        # Extra Finite Difference if requested. We use the settings in
+        # the component for these.
+        if f_d_2:
             dresids.vec[:] = 0.0
             root.clear_dparams()
             dunknowns.vec[:] = 0.0
 
             # Component can request to use complex step.
-            if ch_type == 'cs':
+            if opt['type'] == 'cs':
                 fd_func = comp.complex_step_jacobian
             else:
                 fd_func = comp.fd_jacobian
 
-            jac_fd = fd_func(params, unknowns, resids, use_check=True,
-                             option_overrides=global_options)
-
-            # Extra Finite Difference if requested. We use the settings in
-            # the component for these.
-            if f_d_2:
-                dresids.vec[:] = 0.0
-                root.clear_dparams()
-                dunknowns.vec[:] = 0.0
-
-                # Component can request to use complex step.
-                if opt['type'] == 'cs':
-                    fd_func = comp.complex_step_jacobian
-                else:
-                    fd_func = comp.fd_jacobian
-
-                jac_fd2 = fd_func(params, unknowns, resids,
-                                  option_overrides=global_options)
+            jac_fd2 = fd_func(params, unknowns, resids,
+                              option_overrides=global_options)
 
-            # Assemble and Return all metrics.
-            _assemble_deriv_data(chain(dparams, states), resids, data[cname],
-                                 jac_fwd, jac_rev, jac_fd, out_stream,
-                                 c_name=cname, jac_fd2=jac_fd2, fd_desc=fd_desc,
-                                 fd_desc2=fd_desc2, compact_print=compact_print,
-                                 abs_err_tol=abs_err_tol,
-                                 rel_err_tol=rel_err_tol)
+        # Assemble and Return all metrics.
+        _assemble_deriv_data(chain(dparams, states), resids, cdata,
+                             jac_fwd, jac_rev, jac_fd, out_stream,
+                             c_name=cname, jac_fd2=jac_fd2, fd_desc=fd_desc,
+                             fd_desc2=fd_desc2, compact_print=compact_print,
+                             abs_err_tol=abs_err_tol,
+                             rel_err_tol=rel_err_tol)
 
-        return data
+        return cdata, out_stream.getvalue()
 
     def check_total_derivatives(self, out_stream=sys.stdout, abs_err_tol=1.0E-6,
                                 rel_err_tol=1.0E-6):
@@ -2701,6 +2848,37 @@ def _assemble_deriv_data(params, resids, cdata, jac_fwd, jac_rev, jac_fd,
                     out_stream.write(str(Jsub_fd2))
                     out_stream.write('\n\n')
 
+def _check_partials_key(comp, check_args):
+    """Returns a key that changes when the source file of `comp`, the values
+    of its variables or the options of its partial derivative check change,
+    or None if the source file can't be found.
+    """
+    try:
+        fname = inspect.getsourcefile(comp.__class__)
+    except TypeError:
+        fname = None
+    if fname is None or not os.path.isfile(fname):
+        return None
+
+    digest = hashlib.sha1()
+    with open(fname, 'rb') as f:
+        digest.update(f.read())
+
+    for vec in (comp.params, comp.unknowns):
+        for name, acc in iteritems(vec._dat):
+            digest.update(name.encode('utf-8'))
+            if acc.pbo:
+                digest.update(repr(acc.val.val).encode('utf-8'))
+            else:
+                digest.update(np.ascontiguousarray(acc.val).tobytes())
+
+    compact_print, abs_err_tol, rel_err_tol, global_options = check_args
+    opts = (sorted(comp.deriv_options.items()), compact_print, abs_err_tol,
+            rel_err_tol, sorted((global_options or {}).items()))
+    digest.update(repr(opts).encode('utf-8'))
+
+    return digest.hexdigest()
+
 def _needs_iteration(comp):
     """Return True if the given component needs an iterative
     solver to converge it.
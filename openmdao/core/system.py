@@ -779,7 +779,9 @@ class System(object):
                     # Restore old residual
                     resultvec.vec[:] = cache1
 
-        if self._num_par_fds > 1:
+        # without MPI, ParallelFDGroup gathers the columns from its
+        # worker processes itself
+        if self._num_par_fds > 1 and MPI:
             if trace:  # pragma: no cover
                 debug("%s: allgathering parallel FD columns" % self.pathname)
             jacinfos = self._full_comm.allgather(fd_cols)
@@ -0,0 +1,203 @@
+""" Tests for running blocks of DOE cases at once."""
+
+import unittest
+
+import numpy as np
+
+from openmdao.api import Problem, Group, IndepVarComp, Component, \
+                         ExecComp, NLGaussSeidel, ScipyGMRES, AnalysisError, \
+                         InMemoryRecorder
+from openmdao.drivers.fullfactorial_driver import FullFactorialDriver
+from openmdao.test.util import assert_rel_error
+
+
+class Scale(Component):
+    """ y = a*x + b for an array x, in meters. Fails if x[0] > 'fail_at'."""
+
+    def __init__(self, size=3, fail_at=None):
+        super(Scale, self).__init__()
+        self.add_param('x', val=np.zeros(size), units='m')
+        self.add_param('a', val=2.0)
+        self.add_param('b', val=1.0)
+        self.add_output('y', val=np.zeros(size), units='m')
+        self.fail_at = fail_at
+        self.num_solves = 0
+        self.num_batches = 0
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        self.num_solves += 1
+        if self.fail_at is not None and params['x'][0] > self.fail_at:
+            raise AnalysisError("x too large")
+        unknowns['y'] = params['a']*params['x'] + params['b']
+
+    def solve_nonlinear_batch(self, params, unknowns, resids):
+        self.num_batches += 1
+        if self.fail_at is not None and np.any(params['x'][:, 0] > self.fail_at):
+            raise AnalysisError("x too large")
+        unknowns['y'] = params['a'][:, np.newaxis]*params['x'] + \
+                        params['b'][:, np.newaxis]
+
+
+class Total(Component):
+    """ Sums its input, in cm. Not batchable. """
+
+    def __init__(self):
+        super(Total, self).__init__()
+        self.add_param('y', val=np.zeros(2), units='cm')
+        self.add_output('total', val=0.0, units='cm')
+        self.num_solves = 0
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        self.num_solves += 1
+        unknowns['total'] = np.sum(params['y'])
+
+
+class Scaled(Component):
+    """ Leaves the residual of a scaled state at x. """
+
+    def __init__(self):
+        super(Scaled, self).__init__()
+        self.add_param('x', val=0.0)
+        self.add_state('z', val=0.0, resid_scaler=10.0)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        resids['z'] = params['x']
+
+    def solve_nonlinear_batch(self, params, unknowns, resids):
+        resids['z'] = params['x']
+
+
+def _model(fail_at=None):
+    prob = Problem()
+    root = prob.root = Group()
+
+    root.add('p', IndepVarComp([('x', np.zeros(3), {'units': 'm'}),
+                                ('a', 2.0)]), promotes=['*'])
+    sub = root.add('sub', Group())
+    sub.add('scale', Scale(fail_at=fail_at))
+    sub.add('total', Total())
+    sub.connect('scale.y', 'total.y', src_indices=[0, 2])
+    root.connect('x', 'sub.scale.x')
+    root.connect('a', 'sub.scale.a')
+
+    # a group with an iterating solver is run once per case
+    cycle = root.add('cycle', Group())
+    cycle.add('c1', ExecComp('y1 = 0.5*y2 + t'))
+    cycle.add('c2', ExecComp('y2 = 0.5*y1'))
+    cycle.connect('c1.y1', 'c2.y1')
+    cycle.connect('c2.y2', 'c1.y2')
+    cycle.nl_solver = NLGaussSeidel()
+    cycle.nl_solver.options['atol'] = 1e-12
+    cycle.ln_solver = ScipyGMRES()
+    root.connect('sub.total.total', 'cycle.c1.t')
+
+    prob.driver = FullFactorialDriver(num_levels=3)
+    prob.driver.add_desvar('x', lower=np.zeros(3), upper=np.array([1.0, 2.0, 3.0]))
+    prob.driver.add_desvar('a', lower=1.0, upper=2.0)
+    prob.driver.add_response(['x', 'a', 'sub.scale.y', 'sub.total.total',
+                              'cycle.c1.y1'])
+
+    return prob
+
+
+# the cycle converges from a different starting point in each mode
+_tols = {'cycle.c1.y1': 1e-6}
+
+
+class TestBatchEval(unittest.TestCase):
+
+    def _run(self, batch_size, fail_at=None):
+        prob = _model(fail_at)
+        prob.driver.options['batch_size'] = batch_size
+        prob.setup(check=False)
+        prob.run()
+
+        responses = []
+        for resp, success, msg in prob.driver.get_responses():
+            responses.append((dict(resp), success))
+        return prob, responses
+
+    def test_batch_matches_serial(self):
+        _, expected = self._run(1)
+        prob, actual = self._run(10)
+
+        self.assertEqual(len(actual), 81)
+        for (exp, exp_success), (act, act_success) in zip(expected, actual):
+            self.assertTrue(act_success)
+            for name, val in exp.items():
+                assert_rel_error(self, act[name], val, _tols.get(name, 1e-12))
+
+        # the batched component ran once per block, the others once per case
+        scale = prob.root.sub.scale
+        self.assertEqual(scale.num_batches, 9)
+        self.assertEqual(scale.num_solves, 0)
+        self.assertEqual(prob.root.sub.total.num_solves, 81)
+
+        # unit conversion from m to cm
+        for act, success in actual:
+            assert_rel_error(self, act['sub.total.total'],
+                             100.0*(act['sub.scale.y'][0] + act['sub.scale.y'][2]),
+                             1e-12)
+            assert_rel_error(self, act['cycle.c1.y1'],
+                             act['sub.total.total']/0.75, 1e-6)
+
+    def test_batch_failure(self):
+        _, expected = self._run(1, fail_at=0.75)
+        prob, actual = self._run(10, fail_at=0.75)
+
+        self.assertEqual([s for _, s in actual], [s for _, s in expected])
+        self.assertEqual(len([s for _, s in actual if not s]), 27)
+
+        # blocks with a failed case were run again one case at a time
+        scale = prob.root.sub.scale
+        self.assertEqual(scale.num_batches, 9)
+        self.assertTrue(scale.num_solves > 0)
+
+        for (exp, exp_success), (act, act_success) in zip(expected, actual):
+            if exp_success:
+                for name, val in exp.items():
+                    assert_rel_error(self, act[name], val, _tols.get(name, 1e-12))
+
+    def test_batch_resid_scaler(self):
+        resids = []
+        for batch_size in (1, 4):
+            prob = Problem()
+            root = prob.root = Group()
+            root.add('p', IndepVarComp('x', 0.0), promotes=['*'])
+            root.add('comp', Scaled(), promotes=['*'])
+            root.ln_solver = ScipyGMRES()
+
+            prob.driver = FullFactorialDriver(num_levels=4)
+            prob.driver.options['batch_size'] = batch_size
+            prob.driver.add_desvar('x', lower=0.0, upper=3.0)
+            rec = InMemoryRecorder()
+            rec.options['record_resids'] = True
+            prob.driver.add_recorder(rec)
+            prob.setup(check=False)
+            prob.run()
+
+            resids.append(np.array([case['resids']['z'] for case in rec.iters]))
+
+        assert_rel_error(self, resids[0], np.array([0.0, 1.0, 2.0, 3.0]), 1e-12)
+        assert_rel_error(self, resids[1], resids[0], 1e-12)
+
+    def test_batch_iteration_coords(self):
+        coords = []
+        for batch_size in (1, 10):
+            prob = _model()
+            prob.driver.options['batch_size'] = batch_size
+            rec = InMemoryRecorder()
+            prob.root.cycle.nl_solver.add_recorder(rec)
+            prob.setup(check=False)
+            prob.run()
+
+            # the number of iterations of the cycle differs, so drop it
+            coords.append(sorted(set(case['iter'].rsplit('|', 1)[0]
+                                     for case in rec.iters)))
+
+        self.assertEqual(len(coords[0]), 81)
+        self.assertEqual(coords[1], coords[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,9 @@
 
 from __future__ import print_function
 
+import os
+import shutil
+import tempfile
 import unittest
 
 import numpy as np
@@ -10,8 +13,10 @@ from numpy.testing import assert_almost_equal
 
 from six import text_type, PY3
 
-from openmdao.api import Problem, Group, IndepVarComp, ExecComp
+from openmdao.api import Problem, Group, IndepVarComp, ExecComp, \
+                         SqliteRecorder, BaseRecorder
 from openmdao.test.simple_comps import RosenSuzuki, FanIn
+from openmdao.test.sellar import SellarDerivatives
 
 
 if PY3:
@@ -22,6 +27,23 @@ else:
         return s
 
 
+class _ParentOnlyRecorder(BaseRecorder):
+    """ Recorder that fails in any process but the one that created it. """
+
+    def __init__(self):
+        super(_ParentOnlyRecorder, self).__init__()
+        self.pid = os.getpid()
+        self.num_cases = 0
+
+    def record_metadata(self, group):
+        pass
+
+    def record_iteration(self, params, unknowns, resids, metadata):
+        if os.getpid() != self.pid:
+            raise RuntimeError("recorded in a worker process")
+        self.num_cases += 1
+
+
 #
 # expected jacobian
 #
@@ -113,6 +135,68 @@ class TestCalcGradient(unittest.TestCase):
         J = prob.calc_gradient(indep_list, unknown_list, mode='fd', return_format='array')
         assert_almost_equal(J, expectedJ_array, decimal=5)
 
+    def test_calc_gradient_fd_procs(self):
+        root = Group()
+        root.add('parm', IndepVarComp('x', np.array([1., 1., 1., 1.])))
+        root.add('comp', RosenSuzuki())
+
+        root.connect('parm.x', 'comp.x')
+
+        prob = Problem(root)
+        prob.driver.add_desvar('parm.x', lower=-10, upper=99)
+        prob.driver.add_objective('comp.f')
+        prob.driver.add_constraint('comp.g', upper=0.)
+        prob.setup(check=False)
+        prob.run()
+
+        indep_list = ['parm.x']
+        unknown_list = ['comp.f', 'comp.g']
+        expected = prob.calc_gradient(indep_list, unknown_list, mode='fd',
+                                      return_format='array')
+        f = prob['comp.f']
+
+        # the perturbed runs are split among 3 local processes
+        root.deriv_options['fd_procs'] = 3
+
+        J = prob.calc_gradient(indep_list, unknown_list, mode='fd', return_format='dict')
+        assert_almost_equal(J['comp.f']['parm.x'], expectedJ['comp.f']['parm.x'], decimal=5)
+        assert_almost_equal(J['comp.g']['parm.x'], expectedJ['comp.g']['parm.x'], decimal=5)
+
+        J = prob.calc_gradient(indep_list, unknown_list, mode='fd', return_format='array')
+        assert_almost_equal(J, expected, decimal=12)
+
+        # the model is left where it was
+        assert_almost_equal(prob['parm.x'], np.ones(4))
+        assert_almost_equal(prob['comp.f'], f)
+
+
+    def test_calc_gradient_fd_procs_recorder(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+
+        def _gradient(fd_procs):
+            prob = Problem(SellarDerivatives())
+            prob.root.deriv_options['type'] = 'fd'
+            prob.root.deriv_options['fd_procs'] = fd_procs
+            filename = os.path.join(tmpdir, 'cases%d.db' % fd_procs)
+            prob.root.nl_solver.add_recorder(SqliteRecorder(filename))
+            recorder = _ParentOnlyRecorder()
+            prob.root.nl_solver.add_recorder(recorder)
+            prob.setup(check=False)
+            prob.run()
+
+            J = prob.calc_gradient(['x', 'z'], ['obj', 'con1'], mode='fd',
+                                   return_format='array')
+            prob.cleanup()
+            return J, recorder.num_cases
+
+        # the worker processes don't record their solves, so they don't use
+        # the recorders they inherited
+        expected, num_cases = _gradient(1)
+        J, num_par_cases = _gradient(3)
+        assert_almost_equal(J, expected, decimal=12)
+        self.assertTrue(num_par_cases < num_cases)
+
     def test_calc_gradient_with_poi_indices(self):
         p_idxs = [0, 1, 2, 4]
 
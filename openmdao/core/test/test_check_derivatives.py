@@ -1,5 +1,8 @@
 """ Testing for Problem.check_partial_derivatives and check_total_derivatives."""
 
+import os
+import shutil
+import tempfile
 import unittest
 from six import iteritems, StringIO, PY3
 from six.moves import cStringIO as StringIO
@@ -8,6 +11,7 @@ import numpy as np
 
 from openmdao.api import Group, Component, IndepVarComp, Problem, ScipyGMRES, \
                           ParallelGroup, LinearGaussSeidel
+from openmdao.core.group import _fork_context
 from openmdao.test.converge_diverge import ConvergeDivergeGroups, ConvergeDivergePar
 from openmdao.test.paraboloid import Paraboloid
 from openmdao.test.simple_comps import SimpleArrayComp, SimpleImplicitComp, \
@@ -16,6 +20,18 @@ from openmdao.test.util import assert_rel_error
 from openmdao.util.options import OptionsDictionary
 
 
+class CountingParaboloid(Paraboloid):
+    """ Paraboloid that counts its executions."""
+
+    def __init__(self):
+        super(CountingParaboloid, self).__init__()
+        self.num_solves = 0
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        self.num_solves += 1
+        super(CountingParaboloid, self).solve_nonlinear(params, unknowns, resids)
+
+
 class TestProblemCheckPartials(unittest.TestCase):
 
     def test_double_diamond_model(self):
@@ -525,6 +541,103 @@ class TestProblemCheckPartials(unittest.TestCase):
         text = mystream.getvalue()
         self.assertTrue('fd:central' not in text)
         self.assertTrue('complex step' in text)
+    @unittest.skipIf(_fork_context() is None, "processes can't be forked")
+    def test_num_procs(self):
+        prob = Problem()
+        prob.root = ConvergeDivergeGroups()
+
+        prob.setup(check=False)
+        prob.run()
+
+        stream = StringIO()
+        expected = prob.check_partial_derivatives(out_stream=stream)
+        expected_text = stream.getvalue()
+
+        stream = StringIO()
+        data = prob.check_partial_derivatives(out_stream=stream, num_procs=3)
+
+        self.assertEqual(stream.getvalue(), expected_text)
+        self.assertEqual(sorted(data.keys()), sorted(expected.keys()))
+        for cname, cdata in iteritems(expected):
+            for key, vals in iteritems(cdata):
+                for name in ('J_fwd', 'J_rev', 'J_fd'):
+                    assert_rel_error(self, data[cname][key][name], vals[name],
+                                     1e-15)
+
+    @unittest.skipIf(_fork_context() is None, "processes can't be forked")
+    def test_num_procs_error(self):
+
+        class BadComp(SimpleArrayComp):
+            def linearize(self, params, unknowns, resids):
+                return {('y', 'x'): np.zeros((3, 3))}
+
+        prob = Problem()
+        prob.root = Group()
+        prob.root.add('p1', IndepVarComp('x', np.ones([2])))
+        prob.root.add('good', SimpleArrayComp())
+        prob.root.add('comp', BadComp())
+        prob.root.connect('p1.x', 'good.x')
+        prob.root.connect('p1.x', 'comp.x')
+
+        prob.setup(check=False)
+        prob.run()
+
+        # the error is raised by a worker process
+        with self.assertRaises(ValueError) as cm:
+            prob.check_partial_derivatives(out_stream=None, num_procs=2)
+
+        self.assertTrue(str(cm.exception).startswith(
+            "derivative in component 'comp' of 'y' wrt 'x' is the wrong size."))
+
+    def test_cache_file(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        fname = os.path.join(tmpdir, 'partials.db')
+
+        prob = Problem()
+        root = prob.root = Group()
+        root.add('p1', IndepVarComp([('x', 3.0), ('y', 5.0)]))
+        root.add('p2', IndepVarComp([('x', 3.0), ('y', 5.0)]))
+        root.add('comp1', CountingParaboloid())
+        root.add('comp2', CountingParaboloid())
+        for i in (1, 2):
+            root.connect('p%d.x' % i, 'comp%d.x' % i)
+            root.connect('p%d.y' % i, 'comp%d.y' % i)
+
+        prob.setup(check=False)
+        prob.run()
+
+        stream = StringIO()
+        expected = prob.check_partial_derivatives(out_stream=stream,
+                                                  cache_file=fname)
+        expected_text = stream.getvalue()
+        counts = [root.comp1.num_solves, root.comp2.num_solves]
+
+        # nothing changed, so nothing is checked again
+        stream = StringIO()
+        data = prob.check_partial_derivatives(out_stream=stream,
+                                              cache_file=fname)
+        self.assertEqual(stream.getvalue(), expected_text)
+        self.assertEqual([root.comp1.num_solves, root.comp2.num_solves], counts)
+        for cname, cdata in iteritems(expected):
+            for key, vals in iteritems(cdata):
+                assert_rel_error(self, data[cname][key]['J_fd'], vals['J_fd'],
+                                 1e-15)
+
+        # a different input or check option means a new check
+        prob['p2.x'] = 4.0
+        prob.run()
+        counts = [root.comp1.num_solves, root.comp2.num_solves]
+        data = prob.check_partial_derivatives(out_stream=None, cache_file=fname)
+        self.assertEqual(root.comp1.num_solves, counts[0])
+        self.assertTrue(root.comp2.num_solves > counts[1])
+        assert_rel_error(self, data['comp2'][('f_xy', 'x')]['J_fwd'][0][0],
+                         2.0*(4.0-3.0) + 5.0, 1e-8)
+
+        data = prob.check_partial_derivatives(out_stream=None, cache_file=fname,
+                                              abs_err_tol=1e-3)
+        self.assertTrue(root.comp1.num_solves > counts[0])
+
 
 class TestProblemFullFD(unittest.TestCase):
 
@@ -6,7 +6,8 @@ import warnings
 
 import numpy as np
 
-from openmdao.api import ExecComp, IndepVarComp, Component, Driver, Group, Problem
+from openmdao.api import ExecComp, IndepVarComp, Component, Driver, Group, \
+                         Problem, InMemoryRecorder
 from openmdao.drivers.scipy_optimizer import ScipyOptimizer
 from openmdao.test.util import assert_rel_error
 from openmdao.test.paraboloid import Paraboloid
@@ -149,6 +150,29 @@ class ScaleAddDriverArray(Driver):
         self.param_low = param_meta['x']['lower']
 
 
+class BandedCon(Component):
+    """ c = A.x + y**2 + eps*z for a banded matrix A. """
+
+    def __init__(self, n, eps=0.0):
+        super(BandedCon, self).__init__()
+        self.add_param('x', val=np.ones(n))
+        self.add_param('y', val=1.0)
+        self.add_param('z', val=1.0)
+        self.add_output('c', val=np.zeros(n))
+        self.A = 2.0*np.eye(n) + np.eye(n, k=1)
+        self.eps = eps
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['c'] = self.A.dot(params['x']) + params['y']**2 + \
+                        self.eps*params['z']
+
+    def linearize(self, params, unknowns, resids):
+        n = len(params['x'])
+        return {('c', 'x'): self.A,
+                ('c', 'y'): 2.0*params['y']*np.ones((n, 1)),
+                ('c', 'z'): self.eps*np.ones((n, 1))}
+
+
 class TestDriver(unittest.TestCase):
 
     def test_mydriver(self):
@@ -615,6 +639,61 @@ class TestDriver(unittest.TestCase):
         self.assertLess(meta['lower'], -1e12)
         self.assertGreater(meta['upper'], 1e12)
 
+    def _banded(self, eps=0.0):
+        prob = Problem(root=Group())
+        prob.root.add('p', IndepVarComp([('x', np.ones(5)), ('y', 1.0),
+                                         ('z', 0.0)]), promotes=['*'])
+        prob.root.add('comp', BandedCon(5, eps), promotes=['*'])
+
+        prob.driver.add_desvar('x', lower=-10.0, upper=10.0)
+        prob.driver.add_desvar('y', lower=-10.0, upper=10.0)
+        prob.driver.add_desvar('z', lower=-10.0, upper=10.0)
+        prob.driver.add_constraint('c', upper=1.0)
+        return prob
+
+    def test_probe_sparsity(self):
+        prob = self._banded()
+        driver_rec = InMemoryRecorder()
+        solver_rec = InMemoryRecorder()
+        prob.driver.add_recorder(driver_rec)
+        prob.root.nl_solver.add_recorder(solver_rec)
+        prob.setup(check=False)
+        prob.run()
+
+        patterns = prob.driver._probe_sparsity(prob, ['x', 'y', 'z'], ['c'], 3)
+
+        A = prob.root.comp.A
+        np.testing.assert_array_equal(patterns['c']['x'], A != 0.0)
+        self.assertTrue(np.all(patterns['c']['y']))
+        self.assertFalse(np.any(patterns['c']['z']))
+
+        # the probes aren't recorded, and the model is back where it was
+        self.assertEqual(len(driver_rec.iters), 1)
+        self.assertEqual(len(solver_rec.iters), 1)
+        assert_rel_error(self, prob['x'], np.ones(5), 1e-15)
+        assert_rel_error(self, prob['c'], A.dot(np.ones(5)) + 1.0, 1e-15)
+
+        # recording is back on afterwards
+        prob.run()
+        self.assertEqual(len(driver_rec.iters), 2)
+        self.assertEqual(len(solver_rec.iters), 2)
+
+    def test_probe_sparsity_tol(self):
+        prob = self._banded(eps=1e-14)
+        prob.setup(check=False)
+        prob.run()
+
+        patterns = prob.driver._probe_sparsity(prob, ['x', 'y', 'z'], ['c'], 2)
+        self.assertTrue(np.all(patterns['c']['z']))
+
+        # entries that are tiny compared to the rest of their block
+        prob.root.comp.A[0, 0] = 1e-14
+        patterns = prob.driver._probe_sparsity(prob, ['x', 'y', 'z'], ['c'], 2,
+                                               tol=1e-10)
+        self.assertTrue(np.all(patterns['c']['z']))
+        self.assertFalse(patterns['c']['x'][0, 0])
+        self.assertTrue(patterns['c']['x'][0, 1])
+
 
 class TestDeprecated(unittest.TestCase):
     def test_deprecated_add_param(self):
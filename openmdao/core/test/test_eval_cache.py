@@ -0,0 +1,186 @@
+""" Tests for the driver evaluation cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from openmdao.api import Problem, Group, IndepVarComp, ScipyOptimizer, \
+                         Component
+from openmdao.drivers.case_driver import CaseDriver
+from openmdao.test.paraboloid import Paraboloid
+from openmdao.test.util import assert_rel_error
+
+
+class CountingParaboloid(Paraboloid):
+    """ Paraboloid that counts its executions and linearizations."""
+
+    def __init__(self):
+        super(CountingParaboloid, self).__init__()
+        self.num_solves = 0
+        self.num_lins = 0
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        self.num_solves += 1
+        super(CountingParaboloid, self).solve_nonlinear(params, unknowns, resids)
+
+    def linearize(self, params, unknowns, resids):
+        self.num_lins += 1
+        return super(CountingParaboloid, self).linearize(params, unknowns, resids)
+
+
+class Constraint(Component):
+    """ c = y - x """
+
+    def __init__(self):
+        super(Constraint, self).__init__()
+        self.add_param('x', val=0.0)
+        self.add_param('y', val=0.0)
+        self.add_output('c', val=0.0)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['c'] = params['y'] - params['x']
+
+    def linearize(self, params, unknowns, resids):
+        return {('c', 'x'): -1.0, ('c', 'y'): 1.0}
+
+
+def _paraboloid(driver):
+    prob = Problem()
+    root = prob.root = Group()
+
+    root.add('p1', IndepVarComp('x', 50.0), promotes=['*'])
+    root.add('p2', IndepVarComp('y', 50.0), promotes=['*'])
+    root.add('comp', CountingParaboloid(), promotes=['*'])
+    root.add('con', Constraint(), promotes=['*'])
+
+    prob.driver = driver
+    driver.add_desvar('x', lower=-50.0, upper=50.0)
+    driver.add_desvar('y', lower=-50.0, upper=50.0, scaler=2.0)
+    driver.add_objective('f_xy')
+
+    return prob
+
+
+class TestEvalCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.dir)
+        except OSError:
+            pass
+
+    def _optimize(self, cache_size):
+        driver = ScipyOptimizer()
+        driver.options['optimizer'] = 'SLSQP'
+        driver.options['disp'] = False
+        driver.options['eval_cache_size'] = cache_size
+        prob = _paraboloid(driver)
+        driver.add_constraint('c', upper=-15.0)
+
+        prob.setup(check=False)
+        prob.run()
+        return prob
+
+    def test_optimizer(self):
+        expected = self._optimize(0)
+        prob = self._optimize(100)
+
+        assert_rel_error(self, prob['x'], expected['x'], 1e-12)
+        assert_rel_error(self, prob['y'], expected['y'], 1e-12)
+        assert_rel_error(self, prob['f_xy'], expected['f_xy'], 1e-12)
+
+        # the first iteration of SLSQP is at the starting point
+        cache = prob.driver._eval_cache
+        self.assertTrue(cache.hits > 0)
+        self.assertEqual(prob.root.comp.num_solves, cache.misses)
+        self.assertEqual(prob.root.comp.num_solves,
+                         expected.root.comp.num_solves - cache.hits)
+
+    def _run_cases(self, cases, **options):
+        driver = CaseDriver(cases)
+        driver.add_response(['x', 'y', 'f_xy'])
+        for name, val in options.items():
+            driver.options[name] = val
+        prob = _paraboloid(driver)
+
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+        return prob
+
+    def test_duplicate_cases(self):
+        cases = [[('x', 1.0), ('y', 4.0)],
+                 [('x', 2.0), ('y', 4.0)],
+                 [('x', 1.0), ('y', 4.0)],
+                 [('x', 1.0), ('y', 4.0 + 1e-3)]]
+
+        prob = self._run_cases(cases, eval_cache_size=10)
+        self.assertEqual(prob.root.comp.num_solves, 3)
+
+        responses = [dict(r[0]) for r in prob.driver.get_responses()]
+        self.assertEqual(len(responses), 4)
+        for res in responses:
+            assert_rel_error(self, res['f_xy'],
+                             (res['x']-3.0)**2 + res['x']*res['y'] +
+                             (res['y']+4.0)**2 - 3.0, 1e-12)
+
+        # close enough to share an evaluation
+        prob = self._run_cases(cases, eval_cache_size=10, eval_cache_tol=0.1)
+        self.assertEqual(prob.root.comp.num_solves, 2)
+
+    def test_lru(self):
+        cases = [[('x', 1.0), ('y', 4.0)],
+                 [('x', 2.0), ('y', 4.0)],
+                 [('x', 1.0), ('y', 4.0)],
+                 [('x', 1.0), ('y', 4.0)]]
+
+        prob = self._run_cases(cases, eval_cache_size=1)
+        self.assertEqual(prob.root.comp.num_solves, 3)
+        self.assertEqual(len(prob.driver._eval_cache._entries), 1)
+
+    def test_file(self):
+        fname = os.path.join(self.dir, 'cache.db')
+        cases = [[('x', 1.0), ('y', 4.0)],
+                 [('x', 2.0), ('y', 4.0)]]
+
+        prob = self._run_cases(cases, eval_cache_size=10, eval_cache_file=fname)
+        self.assertEqual(prob.root.comp.num_solves, 2)
+
+        cases.append([('x', 3.0), ('y', 4.0)])
+        prob = self._run_cases(cases, eval_cache_size=10, eval_cache_file=fname)
+        self.assertEqual(prob.root.comp.num_solves, 1)
+
+        responses = [dict(r[0]) for r in prob.driver.get_responses()]
+        assert_rel_error(self, responses[1]['f_xy'], 38.0, 1e-12)
+
+    def test_gradient(self):
+        driver = ScipyOptimizer()
+        driver.options['eval_cache_size'] = 10
+        prob = _paraboloid(driver)
+        prob.setup(check=False)
+        driver._problem = prob
+
+        prob['x'] = 1.0
+        prob['y'] = 2.0
+        driver.run_once(prob)
+
+        J1 = driver.calc_gradient(['x', 'y'], ['f_xy'])
+        J2 = driver.calc_gradient(['x', 'y'], ['f_xy'])
+        self.assertEqual(prob.root.comp.num_lins, 1)
+        assert_rel_error(self, J2, J1, 1e-15)
+
+        # gradients are scaled by the driver
+        assert_rel_error(self, J1[0, 0], -2.0, 1e-6)
+        assert_rel_error(self, J1[0, 1], 13.0/2.0, 1e-6)
+
+        # a different request is calculated
+        driver.calc_gradient(['x'], ['f_xy'])
+        self.assertEqual(prob.root.comp.num_lins, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
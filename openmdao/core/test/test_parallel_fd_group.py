@@ -0,0 +1,102 @@
+""" Tests for finite difference in local processes with ParallelFDGroup."""
+
+import os
+import unittest
+
+import numpy as np
+
+from openmdao.api import Problem, Group, IndepVarComp, Component, \
+                         ParallelFDGroup
+from openmdao.core.mpi_wrap import MPI
+from openmdao.core.group import _fork_context
+from openmdao.test.util import assert_rel_error
+
+
+class SinComp(Component):
+    """ y = sin(x)*a. Records the pid of every process it runs in, and
+    fails if x[fail_idx] is perturbed."""
+
+    def __init__(self, size, fail_idx=None):
+        super(SinComp, self).__init__()
+        self.add_param('x', val=np.zeros(size))
+        self.add_param('a', val=2.0)
+        self.add_output('y', val=np.zeros(size))
+        self.fail_idx = fail_idx
+        self.fail_val = None
+        self.pids = []
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        self.pids.append(os.getpid())
+        x = params['x']
+        if self.fail_idx is not None:
+            if self.fail_val is None:
+                self.fail_val = x[self.fail_idx]
+            elif x[self.fail_idx] != self.fail_val:
+                raise RuntimeError("perturbed x[%d]" % self.fail_idx)
+        unknowns['y'] = np.sin(x)*params['a']
+
+
+def _model(num_par_fds, fail_idx=None):
+    prob = Problem()
+    root = prob.root = Group()
+
+    root.add('p', IndepVarComp([('x', np.arange(1.0, 7.0)), ('a', 3.0)]),
+             promotes=['*'])
+    par = root.add('par', ParallelFDGroup(num_par_fds))
+    par.add('comp', SinComp(6, fail_idx), promotes=['*'])
+    root.connect('x', 'par.x')
+    root.connect('a', 'par.a')
+
+    prob.setup(check=False)
+    prob.run()
+    return prob
+
+
+@unittest.skipIf(MPI or _fork_context() is None,
+                 "local parallel FD needs fork and no MPI")
+class TestLocalParallelFD(unittest.TestCase):
+
+    def test_matches_serial(self):
+        expected = _model(1)
+        J1 = expected.calc_gradient(['x', 'a'], ['par.y'], mode='fwd',
+                                    return_format='dict')
+
+        prob = _model(3)
+        self.assertEqual(prob.root.par.deriv_options['fd_procs'], 3)
+
+        comp = prob.root.par.comp
+        del comp.pids[:]
+        J2 = prob.calc_gradient(['x', 'a'], ['par.y'], mode='fwd',
+                                return_format='dict')
+
+        for wrt in ('x', 'a'):
+            assert_rel_error(self, J2['par.y'][wrt], J1['par.y'][wrt], 1e-15)
+
+        x = np.arange(1.0, 7.0)
+        assert_rel_error(self, J2['par.y']['x'], np.diag(3.0*np.cos(x)), 1e-5)
+        assert_rel_error(self, J2['par.y']['a'], np.sin(x)[:, np.newaxis], 1e-5)
+
+        # only a third of the 7 columns were done in this process
+        self.assertEqual(set(comp.pids), set([os.getpid()]))
+        self.assertTrue(len(comp.pids) <= 4)
+
+        # the model is left as it was
+        assert_rel_error(self, prob['par.y'], 3.0*np.sin(x), 1e-15)
+
+    def test_worker_failure(self):
+        # perturbing x[1] fails, and that isn't done by this process
+        prob = _model(3, fail_idx=1)
+
+        with self.assertRaises(RuntimeError) as cm:
+            prob.calc_gradient(['x'], ['par.y'], mode='fwd')
+
+        self.assertTrue(str(cm.exception).startswith(
+            "'par': finite difference failed in local worker process(es)"))
+
+        # the parallel FD state is reset so a later run is serial again
+        self.assertEqual(prob.root.par._num_par_fds, 1)
+        self.assertEqual(prob.root.par._par_fd_id, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
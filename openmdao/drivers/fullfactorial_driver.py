@@ -2,11 +2,6 @@
 OpenMDAO design-of-experiments driver implementing the Full Factorial method.
 """
 
-from collections import OrderedDict
-import itertools
-from six import iteritems
-from six.moves import zip
-
 import numpy as np
 
 from openmdao.drivers.predeterminedruns_driver import PredeterminedRunsDriver
@@ -15,6 +10,9 @@ from openmdao.drivers.predeterminedruns_driver import PredeterminedRunsDriver
 class FullFactorialDriver(PredeterminedRunsDriver):
     """Design-of-experiments Driver implementing the Full Factorial method.
 
+    Cases are generated one at a time from their index, so the memory used
+    doesn't depend on the number of cases.
+
     Args
     ----
     num_levels : int, optional
@@ -34,31 +32,40 @@ class FullFactorialDriver(PredeterminedRunsDriver):
         super(FullFactorialDriver, self).__init__(num_par_doe=num_par_doe,
                                                   load_balance=load_balance)
         self.num_levels = num_levels
-
-    def _build_runlist(self):
-        value_arrays = OrderedDict()
-        for name, meta in iteritems(self.get_desvar_metadata()):
-            value_arrays[name] = []
-
-            # Support for array desvars
-            val = self.root.unknowns._dat[name].val
-            nval = meta['size']
-
-            for k in range(nval):
-
-                low = meta['lower']
-                high = meta['upper']
-                if isinstance(low, np.ndarray):
-                    low = low[k]
-                if isinstance(high, np.ndarray):
-                    high = high[k]
-
-                value_arrays[name].append(np.linspace(low, high,
-                                                      num=self.num_levels).tolist())
-
-        keys = list(value_arrays.keys())
-        for name in keys:
-            value_arrays[name] = [np.array(x) for x in itertools.product(*value_arrays[name])]
-
-        for combination in itertools.product(*value_arrays.values()):
-            yield zip(keys, combination)
+        self._names = None
+        self._levels = None
+
+    def _num_cases(self):
+        """Returns the number of combinations of levels of all design
+        variable elements, and computes the levels of each element.
+        """
+        self._names = []
+        levels = []
+        for name, low, high in self._desvar_bounds():
+            self._names.append((name, len(low)))
+            for k in range(len(low)):
+                levels.append(np.linspace(low[k], high[k],
+                                          num=self.num_levels).tolist())
+
+        self._levels = levels
+        return self.num_levels ** len(levels)
+
+    def _get_case(self, case_num):
+        """Returns case number `case_num`. The level of each design variable
+        element is a digit of `case_num` in base num_levels, with the last
+        element varying fastest.
+        """
+        levels = self._levels
+        vals = np.empty(len(levels))
+
+        rem = case_num
+        for k in range(len(levels) - 1, -1, -1):
+            rem, digit = divmod(rem, self.num_levels)
+            vals[k] = levels[k][digit]
+
+        case = []
+        start = 0
+        for name, size in self._names:
+            case.append((name, vals[start:start+size].copy()))
+            start += size
+        return case
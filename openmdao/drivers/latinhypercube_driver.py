@@ -4,6 +4,7 @@ OpenMDAO design-of-experiments Driver implementing the Latin Hypercube and Optim
 
 from collections import OrderedDict
 import os
+import multiprocessing
 from random import shuffle, randint, seed
 
 from six import iteritems, itervalues
@@ -95,10 +96,11 @@ class LatinHypercubeDriver(PredeterminedRunsDriver):
 
     def _distrib_build_runlist(self):
         """
-        Returns an iterator over only those cases meant to execute
-        in the current rank as part of a parallel DOE. A latin hypercube,
-        unlike some other DOE generators, is created in one rank and then
-        the appropriate cases are scattered to the appropriate ranks.
+        Returns an iterator over (case_num, case) tuples for only those
+        cases meant to execute in the current rank as part of a parallel
+        DOE. A latin hypercube, unlike some other DOE generators, is created
+        in one rank and then the appropriate cases are scattered to the
+        appropriate ranks.
         """
         comm = self._full_comm
 
@@ -110,7 +112,8 @@ class LatinHypercubeDriver(PredeterminedRunsDriver):
         if comm.rank == 0:
             if trace:
                 debug('Parallel DOE using %d procs' % self._num_par_doe)
-            run_list = [list(case) for case in self._build_runlist()] # need to run iterator
+            run_list = [(case_num, list(case))
+                        for case_num, case in self._runlist()] # need to run iterator
 
             run_sizes, run_offsets = evenly_distrib_idxs(self._num_par_doe,
                                                          len(run_list))
@@ -142,10 +145,40 @@ class LatinHypercubeDriver(PredeterminedRunsDriver):
 class OptimizedLatinHypercubeDriver(LatinHypercubeDriver):
     """Design-of-experiments Driver implementing the Morris-Mitchell method for
     an Optimized Latin Hypercube.
+
+    Args
+    ----
+    num_samples : int, optional
+        The number of samples to run. Defaults to 1.
+
+    seed : int or None, optional
+        Random seed.  Defaults to None.
+
+    population : int, optional
+        Number of offspring created from the best Latin hypercube in each
+        generation. Defaults to 20.
+
+    generations : int, optional
+        Number of generations of the evolutionary search. Defaults to 2.
+
+    norm_method : int, optional
+        Order of the norm used to measure the distance between points.
+        Defaults to 1.
+
+    num_par_doe : int, optional
+        The number of DOE cases to run concurrently.  Defaults to 1.
+
+    load_balance : bool, Optional
+        If True, use rank 0 as master and load balance cases among all of the
+        other ranks. Defaults to False.
+
+    num_procs : int, optional
+        Number of processes used to evaluate the offspring of each
+        generation. Defaults to 1, which evaluates them in this process.
     """
 
     def __init__(self, num_samples=1, seed=None, population=20, generations=2,
-                norm_method=1, num_par_doe=1, load_balance=False):
+                norm_method=1, num_par_doe=1, load_balance=False, num_procs=1):
         super(OptimizedLatinHypercubeDriver, self).__init__(num_par_doe=num_par_doe,
                                                             load_balance=load_balance)
         self.qs = [1, 2, 5, 10, 20, 50, 100]  # List of qs to try for Phi_q optimization
@@ -154,6 +187,7 @@ class OptimizedLatinHypercubeDriver(LatinHypercubeDriver):
         self.population = population
         self.generations = generations
         self.norm_method = norm_method
+        self.num_procs = num_procs
 
     def _get_lhc(self):
         """Generate an Optimized Latin Hypercube
@@ -161,59 +195,68 @@ class OptimizedLatinHypercubeDriver(LatinHypercubeDriver):
 
         rand_lhc = _rand_latin_hypercube(self.num_samples, self.num_design_vars)
 
-        # Optimize our LHC before returning it
-        best_lhc = _LHC_Individual(rand_lhc, q=1, p=self.norm_method)
-        for q in self.qs:
-            lhc_start = _LHC_Individual(rand_lhc, q, self.norm_method)
-            lhc_opt = _mmlhs(lhc_start, self.population, self.generations)
-            if lhc_opt.mmphi() < best_lhc.mmphi():
-                best_lhc = lhc_opt
+        pool = None
+        if self.num_procs > 1:
+            pool = multiprocessing.Pool(self.num_procs)
+
+        try:
+            # the distances between points don't depend on q, so compute
+            # them once for all of the starting hypercubes
+            dists = _pairwise_dists(rand_lhc, self.norm_method)
+
+            # Optimize our LHC before returning it
+            best_lhc = _LHC_Individual(rand_lhc, q=1, p=self.norm_method,
+                                       dists=dists)
+            for q in self.qs:
+                lhc_start = _LHC_Individual(rand_lhc, q, self.norm_method,
+                                            dists=dists)
+                lhc_opt = _mmlhs(lhc_start, self.population, self.generations,
+                                 pool=pool, num_procs=self.num_procs)
+                if lhc_opt.mmphi() < best_lhc.mmphi():
+                    best_lhc = lhc_opt
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
         return best_lhc._get_doe().astype(int)
 
 
 class _LHC_Individual(object):
-    def __init__(self, doe, q=2, p=1):
+    def __init__(self, doe, q=2, p=1, dists=None, phisum=None):
         self.q = q
         self.p = p
         self.doe = doe
         self.phi = None  # Morris-Mitchell sampling criterion
 
+        # matrix of the distances between each pair of points, and the sum
+        # of those distances raised to the power -q
+        self._dists = dists
+        self._phisum = phisum
+
     @property
     def shape(self):
         """Size of the LatinHypercube DOE (rows,cols)."""
 
         return self.doe.shape
 
+    def _get_dists(self):
+        if self._dists is None:
+            self._dists = _pairwise_dists(self.doe, self.p)
+        return self._dists
+
+    def _get_phisum(self):
+        if self._phisum is None:
+            self._phisum = _phisum(self._get_dists(), self.q)
+        return self._phisum
+
     def mmphi(self):
         """Returns the Morris-Mitchell sampling criterion for this Latin
         hypercube.
         """
 
         if self.phi is None:
-            distdict = {}
-
-            # Calculate the norm between each pair of points in the DOE
-            arr = self.doe
-            n, m = arr.shape
-            for i in range(1, n):
-                nrm = np.linalg.norm(arr[i] - arr[:i], ord=self.p, axis=1)
-                for j in range(0, i):
-                    nrmj = nrm[j]
-                    if nrmj in distdict:
-                        distdict[nrmj] += 1
-                    else:
-                        distdict[nrmj] = 1
-
-            size = len(distdict)
-
-            distinct_d = np.fromiter(distdict, dtype=float, count=size)
-
-            # Mutltiplicity array with a count of how many pairs of points
-            # have a given distance
-            J = np.fromiter(itervalues(distdict), dtype=int, count=size)
-
-            self.phi = sum(J * (distinct_d ** (-self.q))) ** (1.0 / self.q)
+            self.phi = self._get_phisum() ** (1.0 / self.q)
 
         return self.phi
 
@@ -223,21 +266,16 @@ class _LHC_Individual(object):
         be a Latin hypercube.
         """
 
-        new_doe = self.doe.copy()
-        n, k = self.doe.shape
-        for count in range(mutation_count):
-            col = randint(0, k - 1)
+        return self._apply(_random_swaps(self.doe.shape, mutation_count))
 
-            # Choosing two distinct random points
-            el1 = randint(0, n - 1)
-            el2 = randint(0, n - 1)
-            while el1 == el2:
-                el2 = randint(0, n - 1)
-
-            new_doe[el1, col] = self.doe[el2, col]
-            new_doe[el2, col] = self.doe[el1, col]
-
-        return _LHC_Individual(new_doe, self.q, self.p)
+    def _apply(self, swaps):
+        """ Returns a new individual with the given swaps applied. Only the
+        distances to the points that moved are recomputed.
+        """
+        new_doe, dists, phisum = _perturbed(self.doe, self._get_dists(),
+                                            self.q, self.p, swaps)
+        return _LHC_Individual(new_doe, self.q, self.p, dists=dists,
+                               phisum=phisum)
 
     def __iter__(self):
         return self._get_rows()
@@ -259,6 +297,91 @@ class _LHC_Individual(object):
         return self.doe
 
 
+def _pairwise_dists(arr, p):
+    """Returns the matrix of the p-norm distances between each pair of rows
+    of `arr`.
+    """
+    n, k = arr.shape
+    dists = np.empty((n, n))
+
+    # limit the size of the temporary array of differences
+    step = max(1, 2**20 // max(1, n*k))
+    for start in range(0, n, step):
+        end = min(n, start + step)
+        dists[start:end] = np.linalg.norm(arr[start:end, np.newaxis, :] -
+                                          arr[np.newaxis, :, :],
+                                          ord=p, axis=-1)
+    return dists
+
+
+def _random_swaps(shape, mutation_count):
+    """Returns a list of (column, row1, row2) tuples of elements to
+    interchange.
+    """
+    n, k = shape
+    swaps = []
+    for count in range(mutation_count):
+        col = randint(0, k - 1)
+
+        # Choosing two distinct random points
+        el1 = randint(0, n - 1)
+        el2 = randint(0, n - 1)
+        while el1 == el2:
+            el2 = randint(0, n - 1)
+
+        swaps.append((col, el1, el2))
+    return swaps
+
+
+def _phisum(dists, q):
+    """Sum of the distances between each pair of points raised to the
+    power -q.
+    """
+    return np.sum(dists[np.triu_indices(dists.shape[0], 1)] ** (-float(q)))
+
+
+def _perturbed(doe, dists, q, p, swaps):
+    """Applies `swaps` to a copy of `doe` and updates the distances between
+    points for the rows that changed. The sum of the distances is computed
+    again from all of them, since updating it by the terms that changed
+    cancels catastrophically for large q.
+
+    Returns
+    -------
+    tuple
+        The new DOE, distance matrix and sum of distances to the power -q.
+    """
+    new_doe = doe.copy()
+    for col, el1, el2 in swaps:
+        new_doe[el1, col] = doe[el2, col]
+        new_doe[el2, col] = doe[el1, col]
+
+    if not swaps:
+        return new_doe, dists.copy(), _phisum(dists, q)
+
+    rows = np.unique([el for _, el1, el2 in swaps for el in (el1, el2)])
+
+    new_dists = dists.copy()
+    changed = np.linalg.norm(new_doe[rows][:, np.newaxis, :] -
+                             new_doe[np.newaxis, :, :], ord=p, axis=-1)
+    new_dists[rows] = changed
+    new_dists[:, rows] = changed.T
+
+    return new_doe, new_dists, _phisum(new_dists, q)
+
+
+def _eval_offspring(args):
+    """Returns the Morris-Mitchell criterion of each offspring, given as a
+    list of swaps to apply to the parent. This runs in a worker process
+    when a pool is used.
+    """
+    doe, dists, q, p, offspring = args
+    phis = []
+    for swaps in offspring:
+        phis.append(_perturbed(doe, dists, q, p, swaps)[2] ** (1.0 / q))
+    return phis
+
+
 def _rand_latin_hypercube(n, k):
     # Calculates a random Latin hypercube set of n points in k dimensions
     # within [0,n-1]^k hypercube.
@@ -284,9 +407,11 @@ def _is_latin_hypercube(lh):
     return True
 
 
-def _mmlhs(x_start, population, generations):
+def _mmlhs(x_start, population, generations, pool=None, num_procs=1):
     """Evolutionary search for most space filling Latin-Hypercube.
     Returns a new LatinHypercube instance with an optimized set of points.
+    If a multiprocessing `pool` is given, the offspring of each generation
+    are split among `num_procs` of its workers.
     """
 
     x_best = x_start
@@ -300,19 +425,29 @@ def _mmlhs(x_start, population, generations):
         else:
             mutations = 1
 
-        x_improved = x_best
-        phi_improved = phi_best
+        offspring = [_random_swaps(x_best.shape, mutations)
+                     for i in range(population)]
 
-        for offspring in range(population):
-            x_try = x_best.perturb(mutations)
-            phi_try = x_try.mmphi()
+        args = (x_best.doe, x_best._get_dists(), x_best.q, x_best.p)
+        if pool is None:
+            phis = _eval_offspring(args + (offspring,))
+        else:
+            sizes, offsets = evenly_distrib_idxs(num_procs, population)
+            chunks = [args + (offspring[o:o+s],) for s, o in zip(sizes, offsets)
+                      if s > 0]
+            phis = [phi for chunk in pool.map(_eval_offspring, chunks)
+                    for phi in chunk]
+
+        x_improved = None
+        phi_improved = phi_best
 
+        for swaps, phi_try in zip(offspring, phis):
             if phi_try < phi_improved:
-                x_improved = x_try
+                x_improved = swaps
                 phi_improved = phi_try
 
-        if phi_improved < phi_best:
+        if x_improved is not None:
             phi_best = phi_improved
-            x_best = x_improved
+            x_best = x_best._apply(x_improved)
 
     return x_best
@@ -6,10 +6,11 @@ from __future__ import print_function
 
 import sys
 import os
+import re
 import traceback
 import logging
-from itertools import chain
-from six.moves import zip
+from itertools import chain, islice
+from six.moves import zip, range
 from six import next, PY3, iteritems, string_types
 
 import multiprocessing
@@ -22,13 +23,18 @@ from openmdao.util.record_util import create_local_meta, update_local_meta
 from openmdao.util.array_util import evenly_distrib_idxs
 from openmdao.core.mpi_wrap import MPI, debug, any_proc_is_true
 from openmdao.core.system import AnalysisError
+from openmdao.core.batch_eval import BatchVectors, batch_solve_nonlinear, \
+                                     can_batch
 from openmdao.recorders.inmem_recorder import InMemoryRecorder
+from openmdao.recorders.case_reader import CaseReader
 
 trace = os.environ.get('OPENMDAO_TRACE')
 
-def worker(problem, response_vars, case_queue, response_queue, worker_id): # pragma: no cover
-    """This is used to run parallel DOEs using multprocessing. It takes a case
-    off of the case_queue, runs it, then puts responses on the response_queue.
+def worker(problem, exchange, case_queue, response_queue, worker_id): # pragma: no cover
+    """This is used to run parallel DOEs using multprocessing. It takes a chunk
+    of cases off of the case_queue, runs them, then puts a status record for
+    each case on the response_queue. Design variable and response values are
+    passed through the shared arrays of `exchange`.
     """
     # set env var so comps/recorders know they're running in a worker proc
     os.environ['OPENMDAO_WORKER_ID'] = str(worker_id)
@@ -44,39 +50,200 @@ def worker(problem, response_vars, case_queue, response_queue, worker_id): # pra
         root = driver.root
 
         terminate = 0
-        for case_id, case in iter(case_queue.get, 'STOP'):
-            #logging.info("worker %d, case id %d, case %s" % (worker_id, case_id, case))
+        for chunk in iter(case_queue.get, 'STOP'):
+            results = []
+            for case_id, slot, case in chunk:
+                #logging.info("worker %d, case id %d, case %s" % (worker_id, case_id, case))
 
-            if terminate:
-                continue
+                if terminate:
+                    # skipped, but the master still needs to hear about it
+                    results.append((case_id, slot, None))
+                    continue
 
-            metadata = driver._prep_case(case, case_id)
+                if case is None:
+                    case = exchange.get_case(slot)
 
-            try:
-                terminate, exc = driver._try_case(root, metadata)
-                if terminate:
-                    complete_case = (metadata, [])
-                else:
-                    complete_case = (metadata,
-                             [_get_root_var(root, n) for n in response_vars])
-            except:
-                # we generally shouldn't get here, but just in case,
-                # handle it so that the main process doesn't hang at the
-                # end when it tries to join all of the concurrent processes.
-                if metadata.get('msg'):
-                    metadata['msg'] += "\n\n%s" % traceback.format_exc()
-                else:
-                    metadata['msg'] = traceback.format_exc()
-                metadata['success'] = 0
-                metadata['terminate'] = 1
-                complete_case = (metadata, [])
+                metadata = driver._prep_case(case, case_id)
 
-            metadata['id'] = case_id
-            response_queue.put(complete_case)
+                try:
+                    terminate, exc = driver._try_case(root, metadata)
+                    if terminate:
+                        objs = None
+                    else:
+                        objs = exchange.set_responses(slot, root)
+                except:
+                    # we generally shouldn't get here, but just in case,
+                    # handle it so that the main process doesn't hang at the
+                    # end when it tries to join all of the concurrent processes.
+                    if metadata.get('msg'):
+                        metadata['msg'] += "\n\n%s" % traceback.format_exc()
+                    else:
+                        metadata['msg'] = traceback.format_exc()
+                    metadata['success'] = 0
+                    metadata['terminate'] = 1
+                    objs = None
+
+                results.append((case_id, slot, (metadata['success'],
+                                                metadata['msg'],
+                                                metadata['terminate'], objs)))
+
+            response_queue.put(results)
     except:
         logging.error(traceback.format_exc())
         raise
 
+
+def _is_float_val(val):
+    """Returns True if `val` can be stored in a float array."""
+    return isinstance(val, (float, numpy.floating, numpy.ndarray)) and \
+           numpy.asarray(val).dtype.kind == 'f'
+
+
+class _CaseExchange(object):
+    """
+    Shared-memory arrays used to pass design variable values to, and response
+    values back from, the worker processes of a multiprocessing DOE. Each
+    case in flight owns one row (slot) of each array.
+
+    Args
+    ----
+    root : `System`
+        The root system, used to find the sizes and shapes of the variables.
+
+    desvars : OrderedDict
+        Design variable metadata of the driver.
+
+    response_vars : list of str
+        Names of the response variables.
+
+    nslots : int
+        Number of cases that can be in flight at once.
+    """
+
+    def __init__(self, root, desvars, response_vars, nslots):
+        self.nslots = nslots
+
+        # (name, start, end, shape) for each design variable
+        self.dv_layout = []
+        size = 0
+        for name, meta in iteritems(desvars):
+            if meta.get('indices') is None:
+                shape = numpy.shape(_get_root_var(root, name))
+            else:
+                shape = (meta['size'],)
+            self.dv_layout.append((name, size, size + meta['size'], shape))
+            size += meta['size']
+        self.dv_size = size
+        self._dv_names = set(desvars)
+
+        # (name, start, end, shape) for each response. Variables that can't
+        # be stored in a float array have a start of None and are sent back
+        # through the response queue.
+        self.resp_layout = []
+        size = 0
+        for name in response_vars:
+            val = _get_root_var(root, name)
+            if _is_float_val(val):
+                end = size + numpy.size(val)
+                self.resp_layout.append((name, size, end, numpy.shape(val)))
+                size = end
+            else:
+                self.resp_layout.append((name, None, None, None))
+        self.resp_size = size
+
+        self._dv_raw = multiprocessing.RawArray('d', max(1, nslots*self.dv_size))
+        self._resp_raw = multiprocessing.RawArray('d', max(1, nslots*self.resp_size))
+        self._arrays = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_arrays'] = None
+        return state
+
+    def _views(self):
+        """Returns numpy views of the shared design variable and response
+        arrays, one row per slot.
+        """
+        if self._arrays is None:
+            dvs = numpy.frombuffer(self._dv_raw, dtype=float)
+            resps = numpy.frombuffer(self._resp_raw, dtype=float)
+            self._arrays = (dvs[:self.nslots*self.dv_size].reshape(self.nslots, self.dv_size),
+                            resps[:self.nslots*self.resp_size].reshape(self.nslots,
+                                                                       self.resp_size))
+        return self._arrays
+
+    def put_case(self, slot, case):
+        """Copies the design variable values of `case` into `slot`.
+
+        Returns
+        -------
+        bool
+            False if the case can't be stored in the shared array, in which
+            case it must be sent to the worker as is.
+        """
+        case = list(case)
+        if set(name for name, val in case) != self._dv_names or \
+                len(case) != len(self.dv_layout):
+            return False
+
+        vals = dict(case)
+        row = self._views()[0][slot]
+        for name, start, end, shape in self.dv_layout:
+            val = vals[name]
+            if numpy.size(val) != end - start or \
+                    numpy.asarray(val).dtype.kind not in 'biuf':
+                return False
+            row[start:end] = numpy.ravel(val)
+        return True
+
+    def get_case(self, slot):
+        """Returns the case stored in `slot` as a list of (name, value)."""
+        row = self._views()[0][slot]
+        case = []
+        for name, start, end, shape in self.dv_layout:
+            if shape:
+                case.append((name, row[start:end].reshape(shape)))
+            else:
+                case.append((name, row[start]))
+        return case
+
+    def set_responses(self, slot, root):
+        """Copies the response values of `root` into `slot`.
+
+        Returns
+        -------
+        dict or None
+            Values of the responses that aren't stored in the shared array.
+        """
+        row = self._views()[1][slot]
+        objs = None
+        for name, start, end, shape in self.resp_layout:
+            val = _get_root_var(root, name)
+            if start is None or not _is_float_val(val) or \
+                    numpy.size(val) != end - start:
+                if objs is None:
+                    objs = {}
+                objs[name] = val
+            else:
+                row[start:end] = numpy.ravel(val)
+        return objs
+
+    def get_responses(self, slot, objs):
+        """Returns copies of the response values in `slot`, in the order of
+        the response variables.
+        """
+        row = self._views()[1][slot]
+        values = []
+        for name, start, end, shape in self.resp_layout:
+            if objs and name in objs:
+                values.append(objs[name])
+            elif shape:
+                values.append(row[start:end].reshape(shape).copy())
+            else:
+                values.append(row[start])
+        return values
+
+
 class PredeterminedRunsDriver(Driver):
     """
     Baseclass for design-of-experiments Drivers that have pre-determined
@@ -102,12 +269,27 @@ class PredeterminedRunsDriver(Driver):
         self.options.add_option('auto_add_response', False,
                        desc="If True, all design vars, objectives and "
                             "constraints are automatically added as responses.")
+        self.options.add_option('mp_chunk_size', 1, lower=1,
+                       desc="Number of cases sent to a worker process at a "
+                            "time when running cases concurrently using "
+                            "multiprocessing.")
+        self.options.add_option('batch_size', 1, lower=1,
+                       desc="Number of cases run at once when running cases "
+                            "in serial. Components that implement "
+                            "solve_nonlinear_batch are run once for the whole "
+                            "block, and all others once per case.")
+        self.options.add_option('resume_from', '',
+                       desc="Name of a file written by a SqliteRecorder, "
+                            "HDF5Recorder or NpyRecorder attached to a "
+                            "previous run of this driver. Cases that were "
+                            "recorded there successfully are not run again.")
 
         self._num_par_doe = int(num_par_doe)
         self._par_doe_id = 0
         self._load_balance = load_balance
         self._respvars = []
         self._resp_recorder = None
+        self._done_cases = None
 
     def _setup_communicators(self, comm, parent_dir):
         """
@@ -413,6 +595,10 @@ class PredeterminedRunsDriver(Driver):
         if self._resp_recorder is not None:
             self._resp_recorder.reset()
 
+        self._done_cases = None
+        if self.options['resume_from']:
+            self._done_cases = self._read_done_cases(self.options['resume_from'])
+
         with problem.root._dircontext:
             if self._num_par_doe > 1:
                 if MPI:
@@ -425,6 +611,134 @@ class PredeterminedRunsDriver(Driver):
             else:
                 self._run_serial()
 
+        # make sure any asynchronously recorded responses are available
+        self.recorders.flush()
+
+    def _case_key(self, case):
+        """Returns a hashable key for the design variable values of a
+        case, rounded so that values that went through scaling and a
+        recorder still match.
+        """
+        return tuple((name, tuple('%.12g' % v for v in
+                                  numpy.asarray(val, dtype=float).flat))
+                     for name, val in sorted(case, key=lambda c: c[0]))
+
+    def _read_done_cases(self, fname):
+        """Reads the cases that were run successfully by a previous run of
+        this driver from the file written by one of its recorders.
+
+        Returns
+        -------
+        dict
+            Number of successful cases for each case key.
+        """
+        reader = CaseReader(fname)
+        driver_iter = re.compile(r'^rank\d+:Driver\|\d+$')
+
+        done = {}
+        try:
+            for coord in reader.list_cases():
+                if not driver_iter.match(coord):
+                    continue
+
+                data = reader.get_case(coord)
+                if not data['success']:
+                    continue
+
+                unknowns = data.get('Unknowns', {})
+                case = []
+                for name, meta in iteritems(self._desvars):
+                    if name not in unknowns:
+                        raise RuntimeError("Can't resume from '%s' because "
+                                           "design variable '%s' was not "
+                                           "recorded." % (fname, name))
+                    val = numpy.asarray(unknowns[name])
+                    idx = meta.get('indices')
+                    if idx is not None:
+                        val = val[idx]
+                    case.append((name, (val + meta['adder'])*meta['scaler']))
+
+                key = self._case_key(case)
+                done[key] = done.get(key, 0) + 1
+        finally:
+            reader.close()
+
+        return done
+
+    def _num_cases(self):
+        """Returns the number of cases in the DOE if the driver can generate
+        any case directly from its index with _get_case, or None if cases
+        can only be generated in order by _build_runlist. This is called
+        before any case is requested, so drivers can prepare whatever
+        _get_case needs here.
+        """
+        return None
+
+    def _get_case(self, case_num):
+        """Returns case number `case_num` of the DOE as a list of
+        (name, value) tuples. Only needed if _num_cases is overridden.
+        """
+        raise NotImplementedError()
+
+    def _build_runlist(self):
+        """Yields all of the cases of the DOE, generated one at a time
+        by _get_case.
+        """
+        for case_num in range(self._num_cases()):
+            yield self._get_case(case_num)
+
+    def _desvar_bounds(self):
+        """Returns a list of (name, lower, upper) tuples for the design
+        variables, where lower and upper are flat arrays with one entry per
+        element of the design variable.
+        """
+        bounds = []
+        for name, meta in iteritems(self.get_desvar_metadata()):
+            size = meta['size']
+            low = numpy.empty(size)
+            high = numpy.empty(size)
+            low[:] = numpy.asarray(meta['lower'], dtype=float).flatten()
+            high[:] = numpy.asarray(meta['upper'], dtype=float).flatten()
+            bounds.append((name, low, high))
+        return bounds
+
+    def _runlist(self, start=0, step=1):
+        """Returns an iterator over tuples of the form (case_num, case) for
+        the cases of _build_runlist that still have to be run. case_num is
+        the position of the case in the full runlist, so resumed cases get
+        the same iteration coordinate they would have had in the original
+        run.
+
+        If `start` and `step` are given, only every `step`th remaining case
+        is returned, beginning with case `start`. When the driver can
+        generate cases by index (see _num_cases), the other cases are never
+        generated, so memory use doesn't grow with the size of the DOE.
+        """
+        done = self._done_cases
+        num_cases = self._num_cases()
+
+        if num_cases is not None:
+            if not done:
+                for case_num in range(start, num_cases, step):
+                    yield case_num, self._get_case(case_num)
+                return
+            cases = (self._get_case(i) for i in range(num_cases))
+        else:
+            cases = self._build_runlist()
+
+        i = 0
+        for case_num, case in enumerate(cases):
+            if done:
+                # case is a generator, so must make a list to look at it
+                case = list(case)
+                key = self._case_key(case)
+                if done.get(key):
+                    done[key] -= 1
+                    continue
+            if i % step == start:
+                yield case_num, case
+            i += 1
+
     def _save_case(self, case, meta=None):
         if self._num_par_doe > 1:
             if self._load_balance:
@@ -455,7 +769,7 @@ class PredeterminedRunsDriver(Driver):
         metadata['terminate'] = 0
 
         try:
-            root.solve_nonlinear(metadata=metadata)
+            self._solve_nonlinear(metadata)
         except AnalysisError:
             metadata['msg'] = traceback.format_exc()
             metadata['success'] = 0
@@ -474,22 +788,68 @@ class PredeterminedRunsDriver(Driver):
     def _run_serial(self):
         """This runs a DOE in serial on a single process."""
 
-        root = self.root
+        batch_size = self.options['batch_size']
+        if batch_size > 1 and self._eval_cache is None and can_batch(self.root):
+            runiter = self._runlist()
+            while True:
+                block = list(islice(runiter, batch_size))
+                if not block:
+                    break
+                self._run_block(block)
+        else:
+            for case_num, case in self._runlist():
+                self._run_case(case_num, case)
 
-        for case in self._build_runlist():
-            metadata = self._prep_case(case, self.iter_count)
+    def _run_case(self, case_num, case):
+        """Runs and records a single case in serial."""
+        metadata = self._prep_case(case, case_num)
 
-            terminate, exc = self._try_case(root, metadata)
+        terminate, exc = self._try_case(self.root, metadata)
 
-            if exc is not None:
-                if PY3:
-                    raise exc[0].with_traceback(exc[1], exc[2])
-                else:
-                    # exec needed here since otherwise python3 will
-                    # barf with a syntax error  :(
-                    exec('raise exc[0], exc[1], exc[2]')
+        if exc is not None:
+            if PY3:
+                raise exc[0].with_traceback(exc[1], exc[2])
+            else:
+                # exec needed here since otherwise python3 will
+                # barf with a syntax error  :(
+                exec('raise exc[0], exc[1], exc[2]')
+
+        self._save_case(case, metadata)
+        self.iter_count += 1
+
+    def _run_block(self, block):
+        """Runs a block of (case_num, case) tuples at once using
+        batch_solve_nonlinear, then records each case. If any case fails
+        with an AnalysisError, the block is run again one case at a time so
+        that the failure is recorded for the right case.
+        """
+        root = self.root
+        bvecs = BatchVectors(root, len(block))
+
+        for i, (case_num, case) in enumerate(block):
+            # case is a generator, so must make a list to use it twice
+            case = list(case)
+            block[i] = (case_num, case)
+            for dv_name, dv_val in case:
+                self.set_desvar(dv_name, dv_val)
+            bvecs.u[i] = root.unknowns.vec
+
+        metas = []
+        for case_num, case in block:
+            metadata = create_local_meta(None, 'Driver')
+            update_local_meta(metadata, (case_num,))
+            metas.append(metadata)
 
-            self._save_case(case, metadata)
+        try:
+            batch_solve_nonlinear(root, bvecs, metas)
+        except AnalysisError:
+            for case_num, case in block:
+                self._run_case(case_num, case)
+            return
+
+        for i, (case_num, case) in enumerate(block):
+            bvecs.load(i)
+            self._save_case(case, metas[i])
             self.iter_count += 1
 
     def _run_par_doe(self, root):
@@ -504,7 +864,8 @@ class PredeterminedRunsDriver(Driver):
                 metadata = None
 
             else:  # case is not a dummy case
-                metadata = self._prep_case(case, self.iter_count)
+                case_num, case = case
+                metadata = self._prep_case(case, case_num)
 
                 terminate, exc = self._try_case(root, metadata)
 
@@ -536,7 +897,8 @@ class PredeterminedRunsDriver(Driver):
                 # we're the master rank and case is a completed case
                 self._save_case(case)
             else:  # we're a worker
-                metadata = self._prep_case(case, self.iter_count)
+                case_num, case = case
+                metadata = self._prep_case(case, case_num)
 
                 self._try_case(root, metadata)
 
@@ -565,8 +927,11 @@ class PredeterminedRunsDriver(Driver):
 
     def _run_lb_multiproc(self, problem):
         """This runs the DOE in parallel with load balancing via
-        multiprocessing.  A new case is distributed to a worker process as
-        soon as it finishes its previous case.
+        multiprocessing.  Cases are sent to the worker processes in chunks of
+        `options['mp_chunk_size']`, and a new chunk is handed out as soon as
+        one is finished.  Design variable and response values are passed
+        through shared memory, so only small status records go through the
+        queues.
         """
         root = problem.root
 
@@ -575,7 +940,16 @@ class PredeterminedRunsDriver(Driver):
         response_vars = uvars + pvars
         numuvars = len(uvars)
 
-        runiter = self._build_runlist()
+        chunk_size = self.options['mp_chunk_size']
+
+        # keep two chunks per worker in flight so workers don't sit idle
+        # while the master records results
+        max_active = 2 * self._num_par_doe
+        exchange = _CaseExchange(root, self._desvars, response_vars,
+                                 max_active * chunk_size)
+        free_slots = list(range(exchange.nslots))
+
+        runiter = self._runlist()
 
         # Create queues
         if sys.platform == 'win32':
@@ -587,64 +961,76 @@ class PredeterminedRunsDriver(Driver):
             done_queue = multiprocessing.Queue()
 
         procs = []
-        terminating = False
 
         # Start worker processes
         for i in range(self._num_par_doe):
             procs.append(multiprocessing.Process(target=worker,
-                                                 args=(problem, response_vars,
+                                                 args=(problem, exchange,
                                                  task_queue, done_queue, i)))
 
         for proc in procs:
             proc.start()
 
-        iter_count = 0
         num_active = 0
-        empty = {}
-        try:
-            for proc in procs:
-                # case is a generator, so must make a list to send
-                case = list(next(runiter))
-                task_queue.put((iter_count, case))
-                iter_count += 1
-                num_active += 1
-        except StopIteration:
-            pass
-        else:
-            try:
-                while num_active > 0:
-                    meta, values = done_queue.get()
-                    #logging.info("RECEIVED: %d, %s" % (meta['id'], values[2]))
+        exhausted = False
+        terminating = False
+
+        while True:
+            # hand out chunks until enough are in flight
+            while not (exhausted or terminating) and num_active < max_active:
+                chunk = []
+                for slot in free_slots[:chunk_size]:
+                    try:
+                        case_num, case = next(runiter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if exchange.put_case(slot, case):
+                        chunk.append((case_num, slot, None))
+                    else:
+                        # case is a generator, so must make a list to send
+                        chunk.append((case_num, slot, list(case)))
+
+                if chunk:
+                    del free_slots[:len(chunk)]
+                    task_queue.put(chunk)
+                    num_active += 1
+
+            if num_active == 0:
+                break
+
+            results = done_queue.get()
+            num_active -= 1
+
+            for case_id, slot, status in results:
+                if status is not None:
+                    success, msg, terminate, objs = status
+                    meta = create_local_meta(None, 'Driver')
+                    update_local_meta(meta, (case_id,))
+                    meta['success'] = success
+                    meta['msg'] = msg
+                    meta['terminate'] = terminate
+                    meta['id'] = case_id
+
+                    if terminate:
+                        values = []
+                    else:
+                        values = exchange.get_responses(slot, objs)
+
                     complete_case = self._build_case(meta, uvars, pvars,
                                                      numuvars, values)
-                    num_active -= 1
                     if complete_case is None:
                         # there was a fatal error, don't run more cases
-                        break
+                        terminating = True
+                    else:
+                        self.recorders.record_completed_case(root, complete_case)
 
-                    self.recorders.record_completed_case(root, complete_case)
-                    case = list(next(runiter))
-                    task_queue.put((iter_count, case))
-                    iter_count += 1
-                    num_active += 1
-            except StopIteration:
-                pass
+                free_slots.append(slot)
 
         # tell all workers we're done
         for proc in procs:
             task_queue.put('STOP')
 
-        for i in range(num_active):
-            meta, values = done_queue.get()
-            #logging.info("RECEIVED: %d, %s" % (meta['id'], values[0]))
-            complete_case = self._build_case(meta, uvars, pvars,
-                                             numuvars, values)
-            if complete_case is None:
-                # had a fatal error, don't record
-                continue
-
-            self.recorders.record_completed_case(root, complete_case)
-
         for proc in procs:
             proc.join()
 
@@ -679,16 +1065,16 @@ class PredeterminedRunsDriver(Driver):
 
     def _distrib_build_runlist(self):
         """
-        Returns an iterator over only those cases meant to execute
-        in the current rank as part of a parallel DOE. _build_runlist
-        will be called on all ranks, but only those cases targeted to
+        Returns an iterator over (case_num, case) tuples for only those
+        cases meant to execute in the current rank as part of a parallel
+        DOE. Drivers that generate cases by index only generate the
+        cases targeted to this rank. Otherwise _build_runlist will be
+        called on all ranks, but only those cases targeted to
         this rank will run. Override this method
         (see LatinHypercubeDriver) if your DOE generator needs to
         create all cases on one rank and scatter them to other ranks.
         """
-        for i, case in enumerate(self._build_runlist()):
-            if (i % self._num_par_doe) == self._par_doe_id:
-                yield case
+        return self._runlist(self._par_doe_id, self._num_par_doe)
 
     def _distrib_lb_build_runlist(self):
         """
@@ -699,7 +1085,7 @@ class PredeterminedRunsDriver(Driver):
         comm = self._full_comm
 
         if self._full_comm.rank == 0:  # master rank
-            runiter = self._build_runlist()
+            runiter = self._runlist()
             received = 0
             sent = 0
 
@@ -721,7 +1107,8 @@ class PredeterminedRunsDriver(Driver):
             for i in range(1, self._num_par_doe):
                 try:
                     # case is a generator, so must make a list to send
-                    case = list(next(runiter))
+                    case_num, case = next(runiter)
+                    case = (case_num, list(case))
                 except StopIteration:
                     break
                 size, offset = self._id_map[i]
@@ -784,7 +1171,8 @@ class PredeterminedRunsDriver(Driver):
 
                             if more_cases:
                                 try:
-                                    case = list(next(runiter))
+                                    case_num, case = next(runiter)
+                                    case = (case_num, list(case))
                                 except StopIteration:
                                     more_cases = False
                                 else:
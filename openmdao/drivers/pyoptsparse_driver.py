@@ -8,6 +8,7 @@ additional MPI capability.
 from __future__ import print_function
 
 import traceback
+import warnings
 from six import iteritems
 from six.moves import range
 
@@ -64,12 +65,28 @@ class pyOptSparseDriver(Driver):
 
     Options
     -------
+    options['eval_cache_file'] :  str('')
+        Name of a file used to keep the evaluation cache across runs.
+    options['eval_cache_size'] :  int(0)
+        Maximum number of design points whose model evaluations and gradients
+        are cached. 0 turns the cache off.
+    options['eval_cache_tol'] :  float(0.0)
+        If nonzero, scaled design variables within this tolerance of a cached
+        design point reuse its evaluation.
     options['exit_flag'] :  int(0)
         0 for fail, 1 for ok
     options['optimizer'] :  str('SLSQP')
         Name of optimizers to use
     options['print_results'] :  bool(True)
         Print pyOpt results if True
+    options['sparsity_probes'] :  int(0)
+        Number of random design points at which the full Jacobian is
+        calculated before optimizing, to find which entries of each
+        constraint Jacobian block are nonzero. 0 turns the probe off.
+    options['sparsity_tol'] :  float(0.0)
+        Entries of a constraint Jacobian block that are no larger than
+        sparsity_tol times the largest entry of the block at every probe are
+        treated as zero.
     options['gradient method'] :  str('openmdao', 'pyopt_fd', 'snopt_fd')
         Finite difference implementation to use ('snopt_fd' may only be used with SNOPT)
     options['title'] :  str('Optimization using pyOpt_sparse')
@@ -102,6 +119,17 @@ class pyOptSparseDriver(Driver):
         self.options.add_option('gradient method', 'openmdao',
                                 values={'openmdao', 'pyopt_fd', 'snopt_fd'},
                                 desc='Finite difference implementation to use')
+        self.options.add_option('sparsity_probes', 0, lower=0,
+                                desc='Number of random design points at which '
+                                'the full Jacobian is calculated before '
+                                'optimizing, to find which entries of each '
+                                'constraint Jacobian block are nonzero. 0 '
+                                'turns the probe off.')
+        self.options.add_option('sparsity_tol', 0.0, lower=0.0,
+                                desc='Entries of a constraint Jacobian block '
+                                'that are no larger than sparsity_tol times '
+                                'the largest entry of the block at every '
+                                'probe are treated as zero.')
 
         # The user places optimizer-specific settings in here.
         self.opt_settings = {}
@@ -109,6 +137,10 @@ class pyOptSparseDriver(Driver):
         # The user can set a file name here to store history
         self.hist_file = None
 
+        # The user can declare the nonzero entries of constraint Jacobian
+        # blocks here, as declared_sparsity[con][desvar] = (rows, cols).
+        self.declared_sparsity = OrderedDict()
+
         self.pyopt_solution = None
 
         self.lin_jacs = OrderedDict()
@@ -118,6 +150,7 @@ class pyOptSparseDriver(Driver):
         self._problem = None
         self.sparsity = OrderedDict()
         self.sub_sparsity = OrderedDict()
+        self.sub_jac = OrderedDict()
         self.active_tols = {}
 
     def _setup(self):
@@ -151,7 +184,7 @@ class pyOptSparseDriver(Driver):
 
         # Initial Run
         with problem.root._dircontext:
-            problem.root.solve_nonlinear(metadata=self.metadata)
+            self._solve_nonlinear(self.metadata)
 
         opt_prob = Optimization(self.options['title'], self._objfunc)
 
@@ -201,6 +234,7 @@ class pyOptSparseDriver(Driver):
         self.quantities = list(objs)
         self.sparsity = OrderedDict()
         self.sub_sparsity = OrderedDict()
+        self.sub_jac = OrderedDict()
         for name in objs:
             opt_prob.addObj(name)
             self.sparsity[name] = self.indep_list
@@ -213,6 +247,15 @@ class pyOptSparseDriver(Driver):
             #print("Linear Gradient")
             #print(self.lin_jacs)
 
+        # Find the nonzero entries of the nonlinear constraint Jacobians
+        nlcons = list(self.get_constraints(lintype='nonlinear'))
+        if self.options['sparsity_probes'] > 0 and nlcons:
+            patterns = self._probe_sparsity(problem, indep_list, nlcons,
+                                            self.options['sparsity_probes'],
+                                            self.options['sparsity_tol'])
+        else:
+            patterns = {}
+
         # Add all equality constraints
         econs = self.get_constraints(ctype='eq', lintype='nonlinear')
         con_meta = self.get_constraint_metadata()
@@ -236,7 +279,8 @@ class pyOptSparseDriver(Driver):
             else:
 
                 jac = self._build_sparse(name, wrt, size, param_vals,
-                                         sub_param_conns, full_param_conns, rels)
+                                         sub_param_conns, full_param_conns, rels,
+                                         patterns.get(name))
                 opt_prob.addConGroup(name, size, lower=lower, upper=upper,
                                      wrt=wrt, jac=jac)
 
@@ -268,7 +312,8 @@ class pyOptSparseDriver(Driver):
             else:
 
                 jac = self._build_sparse(name, wrt, size, param_vals,
-                                         sub_param_conns, full_param_conns, rels)
+                                         sub_param_conns, full_param_conns, rels,
+                                         patterns.get(name))
                 opt_prob.addConGroup(name, size, upper=upper, lower=lower,
                                      wrt=wrt, jac=jac)
 
@@ -329,7 +374,7 @@ class pyOptSparseDriver(Driver):
             self.set_desvar(name, val)
 
         with self.root._dircontext:
-            self.root.solve_nonlinear(metadata=self.metadata)
+            self._solve_nonlinear(self.metadata)
 
         # Save the most recent solution.
         self.pyopt_solution = sol
@@ -342,7 +387,7 @@ class pyOptSparseDriver(Driver):
             self.exit_flag = 0
 
     def _build_sparse(self, name, wrt, consize, param_vals, sub_param_conns,
-                      full_param_conns, rels):
+                      full_param_conns, rels, pattern=None):
         """ Build up the data structures that define a sparse Jacobian
         matrix. Called separately on each nonlinear constraint.
 
@@ -362,6 +407,10 @@ class pyOptSparseDriver(Driver):
             Parameter full connection info.
         rels : set
             Set of relevant nodes for this connstraint.
+        pattern : dict, optional
+            Boolean arrays of the nonzero entries found by the sparsity
+            probe, keyed by param name. Params whose block is all zero are
+            removed from `wrt`.
 
         Returns
         -------
@@ -369,6 +418,7 @@ class pyOptSparseDriver(Driver):
         """
 
         jac = None
+        masks = {}
 
         # Additional sparsity for index connections
         for param in wrt:
@@ -391,32 +441,62 @@ class pyOptSparseDriver(Driver):
                 if target in rels:
                     rel_idx.update(idx)
 
-            nrel = len(rel_idx)
-            if nrel > 0:
-
-                if jac is None:
-                    jac = {}
-
-                if param not in jac:
-                    # A coo matrix for the Jacobian
-                    # mat = {'coo':[row, col, data],
-                    #        'shape':[nrow, ncols]}
-                    coo = {}
-                    coo['shape'] = [consize, len(param_vals[param])]
-                    jac[param] = coo
-
-                row = []
-                col = []
-                for i in range(consize):
-                    row.extend([i]*nrel)
-                    col.extend(rel_idx)
-                data = np.ones((len(row), ))
-
-                jac[param]['coo'] = [np.array(row), np.array(col), data]
+            if len(rel_idx) > 0:
+                rel_idx = np.array(sorted(rel_idx), dtype=int)
+                mask = np.zeros((consize, len(param_vals[param])), dtype=bool)
+                mask[:, rel_idx] = True
+                masks[param] = mask
 
                 if name not in self.sub_sparsity:
                     self.sub_sparsity[name] = {}
-                self.sub_sparsity[name][param] = np.array(list(rel_idx))
+                self.sub_sparsity[name][param] = rel_idx
+
+        # Sparsity within each block, from the probe or declared by the user
+        declared = self.declared_sparsity.get(name, {})
+        for param in wrt:
+            if param in declared:
+                rows, cols = declared[param]
+                mask = np.zeros((consize, len(param_vals[param])), dtype=bool)
+                mask[rows, cols] = True
+            elif pattern is not None and param in pattern:
+                mask = pattern[param]
+            else:
+                continue
+
+            if param in masks:
+                mask = mask & masks[param]
+            masks[param] = mask
+
+        for param, mask in iteritems(masks):
+            if not mask.any():
+                # No need to pass a block of zeros to the optimizer, but
+                # the constraint must depend on at least one desvar.
+                if len(wrt) > 1:
+                    wrt.discard(param)
+                    if param not in declared:
+                        warnings.warn("The sparsity probe found no nonzero "
+                                      "entries in the Jacobian of '%s' with "
+                                      "respect to '%s', so it isn't passed "
+                                      "to the optimizer. If that's wrong, "
+                                      "declare its nonzero entries in "
+                                      "declared_sparsity." % (name, param))
+                    continue
+                mask = mask.copy()
+                mask[0, 0] = True
+
+            if jac is None:
+                jac = {}
+
+            # A coo matrix for the Jacobian
+            # mat = {'coo':[row, col, data],
+            #        'shape':[nrow, ncols]}
+            rows, cols = np.nonzero(mask)
+            jac[param] = {'coo': [rows, cols, np.ones(len(rows))],
+                          'shape': list(mask.shape)}
+
+            if name not in self.sub_jac:
+                self.sub_jac[name] = OrderedDict()
+            self.sub_jac[name][param] = (rows, cols)
 
         return jac
 
@@ -457,7 +537,7 @@ class pyOptSparseDriver(Driver):
 
             try:
                 with self.root._dircontext:
-                    system.solve_nonlinear(metadata=metadata)
+                    self._solve_nonlinear(metadata)
 
             # Let the optimizer try to handle the error
             except AnalysisError:
@@ -557,25 +637,14 @@ class pyOptSparseDriver(Driver):
                         isize = len(ival)
                         sens_dict[okey][ikey] = np.zeros((osize, isize))
 
-            # Support for sub-index sparsity by returning the Jacobian in a
-            # pyopt sparse format.
-            for con, val1 in iteritems(self.sub_sparsity):
-                for desvar, rel_idx in iteritems(val1):
+            # Support for sub-block sparsity by returning only the nonzero
+            # entries of the Jacobian in a pyopt sparse format.
+            for con, val1 in iteritems(self.sub_jac):
+                for desvar, (rows, cols) in iteritems(val1):
+                    jac = np.asarray(sens_dict[con][desvar])
                     coo = {}
-                    jac = sens_dict[con][desvar]
-                    nrow, ncol = jac.shape
-                    coo['shape'] = [nrow, ncol]
-
-                    row = []
-                    col = []
-                    data = []
-                    ncol = len(rel_idx)
-                    for i in range(nrow):
-                        row.extend([i]*ncol)
-                        col.extend(rel_idx)
-                        data.extend(jac[i][rel_idx])
-
-                    coo['coo'] = [np.array(row), np.array(col), np.array(data)]
+                    coo['shape'] = list(jac.shape)
+                    coo['coo'] = [rows, cols, jac[rows, cols]]
                     sens_dict[con][desvar] = coo
 
         except Exception as msg:
@@ -42,6 +42,14 @@ class ScipyOptimizer(Driver):
     -------
     options['disp'] :  bool(True)
         Set to False to prevent printing of Scipy convergence messages
+    options['eval_cache_file'] :  str('')
+        Name of a file used to keep the evaluation cache across runs.
+    options['eval_cache_size'] :  int(0)
+        Maximum number of design points whose model evaluations and gradients
+        are cached. 0 turns the cache off.
+    options['eval_cache_tol'] :  float(0.0)
+        If nonzero, scaled design variables within this tolerance of a cached
+        design point reuse its evaluation.
     options['maxiter'] : int(200)
         Maximum number of iterations.
     options['optimizer'] : str('SLSQP')
@@ -84,6 +92,7 @@ class ScipyOptimizer(Driver):
         self.grad_cache = None
         self.con_cache = None
         self.con_idx = OrderedDict()
+        self._con_rows = OrderedDict()
         self.cons = None
         self.objs = None
 
@@ -108,7 +117,7 @@ class ScipyOptimizer(Driver):
 
         # Initial Run
         with problem.root._dircontext:
-            problem.root.solve_nonlinear(metadata=self.metadata)
+            self._solve_nonlinear(self.metadata)
 
         pmeta = self.get_desvar_metadata()
         self.params = list(pmeta)
@@ -157,38 +166,52 @@ class ScipyOptimizer(Driver):
 
                     bounds.append((p_low, p_high))
 
-        # Constraints
+        # Constraints are given to scipy as one vector valued function for
+        # each type of constraint, rather than one function per element.
         constraints = []
+        self._con_rows = OrderedDict()
         i = 0
         if opt in _constraint_optimizers:
+            rows = OrderedDict([('eq', []), ('ineq', [])])
             for name, meta in con_meta.items():
                 size = meta['size']
                 dblcon = meta['upper'] is not None and meta['lower'] is not None
-                for j in range(0, size):
-                    con_dict = OrderedDict()
-                    if meta['equals'] is not None:
-                        con_dict['type'] = 'eq'
-                    else:
-                        con_dict['type'] = 'ineq'
-                    con_dict['fun'] = self._confunc
-                    if opt in _constraint_grad_optimizers:
-                        con_dict['jac'] = self._congradfunc
-                    con_dict['args'] = [name, j]
-                    constraints.append(con_dict)
-                self.con_idx[name] = i
-                i += size
+                idx = np.arange(i, i + size)
+
+                # Note, scipy defines constraints to be satisfied when
+                # positive, which is the opposite of OpenMDAO.
+                if meta['equals'] is not None:
+                    rows['eq'].append((idx, -1.0, meta['equals']))
+                elif meta['lower'] is None:
+                    rows['ineq'].append((idx, -1.0, meta['upper']))
+                else:
+                    rows['ineq'].append((idx, 1.0, -meta['lower']))
 
                 # Add extra constraint if double-sided
                 if dblcon:
-                    name = '2bl-' + name
-                    for j in range(0, size):
-                        con_dict = OrderedDict()
-                        con_dict['type'] = 'ineq'
-                        con_dict['fun'] = self._confunc
-                        if opt in _constraint_grad_optimizers:
-                            con_dict['jac'] = self._congradfunc
-                        con_dict['args'] = [name, j]
-                        constraints.append(con_dict)
+                    rows['ineq'].append((idx, -1.0, meta['upper']))
+
+                self.con_idx[name] = i
+                i += size
+
+            for ctype, blocks in iteritems(rows):
+                if not blocks:
+                    continue
+
+                idx = np.concatenate([b[0] for b in blocks])
+                sign = np.concatenate([np.full(len(b[0]), b[1]) for b in blocks])
+                offset = np.concatenate([np.zeros(len(b[0])) +
+                                         np.asarray(b[2], dtype=float).flatten()
+                                         for b in blocks])
+                self._con_rows[ctype] = (idx, sign, offset)
+
+                con_dict = OrderedDict()
+                con_dict['type'] = ctype
+                con_dict['fun'] = self._confunc
+                if opt in _constraint_grad_optimizers:
+                    con_dict['jac'] = self._congradfunc
+                con_dict['args'] = [ctype]
+                constraints.append(con_dict)
 
         # Provide gradients for optimizers that support it
         if opt in _gradient_optimizers:
@@ -247,7 +270,7 @@ class ScipyOptimizer(Driver):
         update_local_meta(metadata, (self.iter_count,))
 
         with system._dircontext:
-            system.solve_nonlinear(metadata=metadata)
+            self._solve_nonlinear(metadata)
 
         # Get the objective function evaluations
         for name, obj in self.get_objectives().items():
@@ -266,54 +289,29 @@ class ScipyOptimizer(Driver):
 
         return f_new
 
-    def _confunc(self, x_new, name, idx):
-        """ Function that returns the value of the constraint function
-        requested in args. Note that this function is called for each
-        constraint, so the model is only run when the objective is evaluated.
+    def _confunc(self, x_new, ctype):
+        """ Function that returns the values of all constraints of the
+        requested type. Note that the model is only run when the objective
+        is evaluated, so the values come from the constraint cache.
 
         Args
         ----
         x_new : ndarray
             Array containing parameter values at new design point.
-        name : string
-            Name of the constraint to be evaluated.
-        idx : float
-            Contains index into the constraint array.
+        ctype : string
+            Type of the constraints, 'eq' or 'ineq'.
 
         Returns
         -------
-        float
-            Value of the constraint function.
+        ndarray
+            Values of the constraint functions.
         """
 
-        if name.startswith('2bl-'):
-            name = name[4:]
-            dbl_side = True
-        else:
-            dbl_side = False
-
+        idx, sign, offset = self._con_rows[ctype]
         cons = self.con_cache
-        meta = self._cons[name]
-
-        # Equality constraints
-        bound = meta['equals']
-        if bound is not None:
-            if isinstance(bound, np.ndarray):
-                bound = bound[idx]
-            return bound - cons[name][idx]
-
-        # Note, scipy defines constraints to be satisfied when positive,
-        # which is the opposite of OpenMDAO.
-        upper = meta['upper']
-        lower = meta['lower']
-        if lower is None or dbl_side:
-            if isinstance(upper, np.ndarray):
-                upper = upper[idx]
-            return upper - cons[name][idx]
-        else:
-            if isinstance(lower, np.ndarray):
-                lower = lower[idx]
-            return cons[name][idx] - lower
+        vals = np.concatenate([np.asarray(cons[name], dtype=float).flatten()
+                               for name in self.cons])
+        return sign*vals[idx] + offset
 
     def _gradfunc(self, x_new):
         """ Function that evaluates and returns the objective function.
@@ -340,47 +338,25 @@ class ScipyOptimizer(Driver):
 
         return grad[0, :]
 
-    def _congradfunc(self, x_new, name, idx):
-        """ Function that returns the cached gradient of the constraint
-        function. Note, scipy calls the constraints one at a time, so the
-        gradient is cached when the objective gradient is called.
+    def _congradfunc(self, x_new, ctype):
+        """ Function that returns the cached gradient of all constraints of
+        the requested type. The gradient is cached when the objective
+        gradient is calculated.
 
         Args
         ----
         x_new : ndarray
             Array containing parameter values at new design point.
-        name : string
-            Name of the constraint to be evaluated.
-        idx : float
-            Contains index into the constraint array.
+        ctype : string
+            Type of the constraints, 'eq' or 'ineq'.
 
         Returns
         -------
-        float
-            Gradient of the constraint function wrt all params.
+        ndarray
+            Gradient of the constraint functions wrt all params.
         """
 
-        if name.startswith('2bl-'):
-            name = name[4:]
-            dbl_side = True
-        else:
-            dbl_side = False
+        idx, sign, offset = self._con_rows[ctype]
 
-        grad = self.grad_cache
-        meta = self._cons[name]
-        grad_idx = self.con_idx[name] + idx + 1
-
-        #print("Constraint Gradient returned")
-        #print(x_new)
-        #print(name, idx, grad[grad_idx, :])
-
-        # Equality constraints
-        if meta['equals'] is not None:
-            return -grad[grad_idx, :]
-
-        # Note, scipy defines constraints to be satisfied when positive,
-        # which is the opposite of OpenMDAO.
-        if meta['lower'] is None or dbl_side:
-            return -grad[grad_idx, :]
-        else:
-            return grad[grad_idx, :]
+        # the first row of the cached gradient is the objective
+        return sign[:, np.newaxis]*self.grad_cache[idx + 1, :]
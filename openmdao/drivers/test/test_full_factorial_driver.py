@@ -1,13 +1,20 @@
 """Testing FullFactorialDriver"""
 
+import itertools
+import os
+import shutil
+import tempfile
 import unittest
 from pprint import pformat
 from types import GeneratorType
 
 import numpy as np
 
-from openmdao.api import IndepVarComp, Group, Problem
+from openmdao.api import IndepVarComp, Group, Problem, SqliteRecorder, \
+                         InMemoryRecorder
 from openmdao.test.paraboloid import Paraboloid
+from openmdao.test.exec_comp_for_test import ExecComp4Test
+from openmdao.test.util import assert_rel_error
 
 from openmdao.drivers.fullfactorial_driver import FullFactorialDriver
 
@@ -53,6 +60,132 @@ class TestFullFactorial(unittest.TestCase):
         self.assertTrue((np.array([0.0]), np.array([1.0])) in inputs,
                         "Incorrect inputs generated.")
 
+    def test_cases_by_index(self):
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p1', IndepVarComp('x', np.zeros(3)), promotes=['*'])
+        root.add('p2', IndepVarComp('y', 0.0), promotes=['*'])
+
+        prob.driver = FullFactorialDriver(num_levels=3)
+        prob.driver.add_desvar('x', lower=np.array([0.0, 1.0, 2.0]), upper=3.0)
+        prob.driver.add_desvar('y', lower=-1.0, upper=1.0)
+        prob.setup(check=False)
+
+        driver = prob.driver
+        levels = [np.linspace(low, 3.0, 3) for low in (0.0, 1.0, 2.0)]
+        levels.append(np.linspace(-1.0, 1.0, 3))
+        expected = list(itertools.product(*levels))
+
+        cases = list(driver._build_runlist())
+        self.assertEqual(len(cases), 81)
+        for case, exp in zip(cases, expected):
+            case = dict(case)
+            assert_rel_error(self, case['x'], np.array(exp[:3]), 1e-15)
+            assert_rel_error(self, case['y'], np.array(exp[3:]), 1e-15)
+
+        # each rank of a parallel DOE only generates its own cases
+        cases = list(driver._runlist(2, 5))
+        self.assertEqual([n for n, _ in cases], list(range(2, 81, 5)))
+        for case_num, case in cases:
+            assert_rel_error(self, dict(case)['x'],
+                             np.array(expected[case_num][:3]), 1e-15)
+
+    def test_huge_doe(self):
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p1', IndepVarComp('x', np.zeros(9)), promotes=['*'])
+
+        prob.driver = FullFactorialDriver(num_levels=10)
+        prob.driver.add_desvar('x', lower=0.0, upper=9.0)
+        prob.setup(check=False)
+
+        driver = prob.driver
+        self.assertEqual(driver._num_cases(), 10**9)
+
+        # the levels of the elements are the digits of the case number
+        case_num, case = next(driver._runlist(123456789, 10**8))
+        self.assertEqual(case_num, 123456789)
+        assert_rel_error(self, dict(case)['x'], np.arange(1.0, 10.0), 1e-15)
+
+
+
+class TestResumeDOE(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, "doe.db")
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.dir)
+        except OSError:
+            pass
+
+    def _run(self, rec, fails=(), resume_from=''):
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p1', IndepVarComp('x', 0.0), promotes=['*'])
+        root.add('p2', IndepVarComp('y', 0.0), promotes=['*'])
+        root.add('comp', ExecComp4Test('f_xy = x*y', nl_delay=0.0,
+                                       fails=fails), promotes=['*'])
+
+        prob.driver = FullFactorialDriver(3)
+        prob.driver.options['resume_from'] = resume_from
+        prob.driver.add_desvar('x', lower=0.0, upper=2.0, scaler=2.0)
+        prob.driver.add_desvar('y', lower=0.0, upper=2.0)
+        prob.driver.add_objective('f_xy')
+        prob.driver.add_recorder(rec)
+
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+
+        return prob
+
+    def test_resume(self):
+        rec = SqliteRecorder(self.filename)
+        self._run(rec, fails=[2, 5])
+
+        rec = InMemoryRecorder()
+        prob = self._run(rec, resume_from=self.filename)
+
+        # only the cases that failed were run again, and they kept their
+        # iteration coordinates
+        self.assertEqual(prob.root.comp.num_nl_solves, 2)
+        self.assertEqual([c['iter'] for c in rec.iters],
+                         ['rank0:Driver|2', 'rank0:Driver|5'])
+        for case in rec.iters:
+            self.assertTrue(case['success'])
+            assert_rel_error(self, case['unknowns']['f_xy'],
+                             case['unknowns']['x']*case['unknowns']['y'],
+                             1e-12)
+
+    def test_resume_all_done(self):
+        rec = SqliteRecorder(self.filename)
+        self._run(rec)
+
+        rec = InMemoryRecorder()
+        prob = self._run(rec, resume_from=self.filename)
+
+        self.assertEqual(prob.root.comp.num_nl_solves, 0)
+        self.assertEqual(len(rec.iters), 0)
+
+    def test_resume_desvar_not_recorded(self):
+        rec = SqliteRecorder(self.filename)
+        rec.options['excludes'] = ['y']
+        self._run(rec)
+
+        with self.assertRaises(RuntimeError) as cm:
+            self._run(InMemoryRecorder(), resume_from=self.filename)
+
+        self.assertEqual(str(cm.exception),
+                         "Can't resume from '%s' because design variable "
+                         "'y' was not recorded." % self.filename)
+
+
 if __name__ == "__main__":
     unittest.main()
 
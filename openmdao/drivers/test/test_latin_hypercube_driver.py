@@ -54,6 +54,64 @@ class TestLatinHypercubeDriver(unittest.TestCase):
         for n, k in self.hypercube_sizes:
             self._test_mmlhs_latin(n, k)
 
+    def _mmphi(self, doe, q, p):
+        n = doe.shape[0]
+        total = 0.0
+        for i in range(n):
+            for j in range(i+1, n):
+                total += np.linalg.norm(doe[i] - doe[j], ord=p) ** (-q)
+        return total ** (1.0 / q)
+
+    def test_mmphi(self):
+        test_lhc = _rand_latin_hypercube(20, 8)
+        for q in (1, 2, 5):
+            for p in (1, 2):
+                lhc = _LHC_Individual(test_lhc, q, p)
+                assert_rel_error(self, lhc.mmphi(),
+                                 self._mmphi(test_lhc, q, p), 1e-12)
+
+                # distances are only updated for the rows that change
+                for i in range(20):
+                    lhc = lhc.perturb(3)
+                    assert_rel_error(self, lhc.mmphi(),
+                                     self._mmphi(lhc.doe, q, p), 1e-10)
+
+    def test_mmphi_large_q(self):
+        test_lhc = _rand_latin_hypercube(20, 8)
+        for q in (50, 100):
+            lhc = _LHC_Individual(test_lhc, q, 1)
+            for i in range(50):
+                lhc = lhc.perturb(3)
+                fresh = _LHC_Individual(lhc.doe, q, 1)
+                assert_rel_error(self, lhc._get_phisum(), fresh._get_phisum(),
+                                 1e-12)
+
+            lhc_opt = _mmlhs(_LHC_Individual(test_lhc, q, 1), 20, 30)
+            fresh = _LHC_Individual(lhc_opt.doe, q, 1)
+            assert_rel_error(self, lhc_opt._get_phisum(), fresh._get_phisum(),
+                             1e-12)
+            self.assertTrue(np.isfinite(lhc_opt.mmphi()))
+
+    def test_mmlhs_pool(self):
+        import multiprocessing
+
+        test_lhc = _rand_latin_hypercube(20, 4)
+
+        seed(2)
+        serial = _mmlhs(_LHC_Individual(test_lhc, 2, 1), 10, 4)
+
+        seed(2)
+        pool = multiprocessing.Pool(2)
+        try:
+            par = _mmlhs(_LHC_Individual(test_lhc, 2, 1), 10, 4, pool=pool,
+                         num_procs=2)
+        finally:
+            pool.close()
+            pool.join()
+
+        self.assertTrue(np.array_equal(serial.doe, par.doe))
+        assert_rel_error(self, par.mmphi(), serial.mmphi(), 1e-15)
+
     def test_algorithm_coverage_lhc(self):
 
         prob = Problem()
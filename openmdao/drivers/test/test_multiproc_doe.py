@@ -1,9 +1,16 @@
 
+import os
+import shutil
+import tempfile
 import unittest
 
+import numpy as np
+
 from openmdao.api import IndepVarComp, Component, Group, Problem, \
-                         FullFactorialDriver, AnalysisError
+                         FullFactorialDriver, AnalysisError, ExecComp, \
+                         SqliteRecorder, InMemoryRecorder, CaseReader
 from openmdao.test.exec_comp_for_test import ExecComp4Test
+from openmdao.test.util import assert_rel_error
 
 class LBParallelDOETestCase6(unittest.TestCase):
 
@@ -141,6 +148,99 @@ class LBParallelDOETestCase6(unittest.TestCase):
             self.assertEqual(nfails[fail_rank], 1)
         else:
             self.assertEqual(nfails[fail_rank], 0)
+    def test_multiproc_doe_chunked(self):
+
+        problem = Problem()
+        root = problem.root = Group()
+        root.add('indep_var', IndepVarComp('x', val=1.0))
+        root.add('arr', IndepVarComp('z', val=np.zeros(2)))
+        root.add('mult', ExecComp4Test("y=2.0*x", nl_delay=0.0))
+        root.add('vec', ExecComp("w=3.0*z", z=np.zeros(2), w=np.zeros(2)))
+
+        root.connect('indep_var.x', 'mult.x')
+        root.connect('arr.z', 'vec.z')
+
+        num_levels = 5
+        problem.driver = FullFactorialDriver(num_levels=num_levels,
+                                             num_par_doe=3,
+                                             load_balance=True)
+        problem.driver.options['mp_chunk_size'] = 4
+        problem.driver.add_desvar('indep_var.x',
+                                  lower=1.0, upper=float(num_levels))
+        problem.driver.add_desvar('arr.z', lower=np.zeros(2),
+                                  upper=np.array([1.0, 2.0]))
+        problem.driver.add_response(['indep_var.x', 'arr.z', 'mult.y',
+                                     'vec.w', 'mult.case_rank'])
+
+        problem.setup(check=False)
+        problem.run()
+
+        cases = set()
+        ranks = set()
+        for responses, success, msg in problem.driver.get_responses():
+            responses = dict(responses)
+            self.assertTrue(success)
+            assert_rel_error(self, responses['mult.y'],
+                             responses['indep_var.x']*2.0, 1e-12)
+            self.assertEqual(responses['vec.w'].shape, (2,))
+            assert_rel_error(self, responses['vec.w'],
+                             responses['arr.z']*3.0, 1e-12)
+            cases.add((float(responses['indep_var.x']),) +
+                      tuple(responses['arr.z']))
+            ranks.add(responses['mult.case_rank'])
+
+        # every case ran exactly once
+        self.assertEqual(len(cases), num_levels**3)
+        self.assertTrue(ranks.issubset(set([0, 1, 2])))
+
+    def test_multiproc_doe_resume(self):
+        tempdir = tempfile.mkdtemp()
+        filename = os.path.join(tempdir, 'doe.db')
+
+        def run(rec, fails, resume_from=''):
+            problem = Problem()
+            root = problem.root = Group()
+            root.add('indep_var', IndepVarComp('x', val=1.0))
+            root.add('mult', ExecComp4Test("y=2.0*x", nl_delay=0.0,
+                                           fail_rank=(0, 1, 2), fails=fails))
+            root.connect('indep_var.x', 'mult.x')
+
+            problem.driver = FullFactorialDriver(num_levels=12, num_par_doe=3,
+                                                 load_balance=True)
+            problem.driver.options['mp_chunk_size'] = 2
+            problem.driver.options['resume_from'] = resume_from
+            problem.driver.add_desvar('indep_var.x', lower=0.0, upper=11.0)
+            problem.driver.add_objective('mult.y')
+            problem.driver.add_recorder(rec)
+
+            problem.setup(check=False)
+            problem.run()
+            problem.cleanup()
+
+        try:
+            rec = SqliteRecorder(filename)
+            rec.options['record_metadata'] = False
+            run(rec, fails=[1])
+
+            reader = CaseReader(filename)
+            failed = sorted(c for c in reader.list_cases()
+                            if not reader.get_case(c)['success'])
+            self.assertEqual(len(reader.list_cases()), 12)
+            self.assertTrue(len(failed) > 0)
+            reader.close()
+
+            rec = InMemoryRecorder()
+            run(rec, fails=[], resume_from=filename)
+
+            # only the failed cases ran again, with their original coordinates
+            self.assertEqual(sorted(case['iter'] for case in rec.iters), failed)
+            for case in rec.iters:
+                self.assertTrue(case['success'])
+                assert_rel_error(self, case['unknowns']['mult.y'],
+                                 case['unknowns']['indep_var.x']*2.0, 1e-12)
+        finally:
+            shutil.rmtree(tempdir)
+
 
 if __name__ == '__main__':
     unittest.main()
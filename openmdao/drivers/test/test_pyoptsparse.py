@@ -2,12 +2,14 @@
 
 import os
 import unittest
+import warnings
 
 from six.moves import cStringIO
 
 import numpy as np
 
-from openmdao.api import IndepVarComp, Group, Problem, ExecComp, Component
+from openmdao.api import IndepVarComp, Group, Problem, ExecComp, Component, \
+                         InMemoryRecorder
 from openmdao.core.system import AnalysisError
 from openmdao.test.paraboloid import Paraboloid
 from openmdao.test.simple_comps import SimpleArrayComp, ArrayComp2D
@@ -87,6 +89,34 @@ class ParaboloidAE(Component):
         return J
 
 
+class BandedCon(Component):
+    """ c = A.x + y**2 for a banded matrix A, and an objective
+    f = sum((x - 3)**2) + (y - 1)**2 + (z - 1)**2. c doesn't depend on z."""
+
+    def __init__(self, n):
+        super(BandedCon, self).__init__()
+        self.add_param('x', val=np.ones(n))
+        self.add_param('y', val=1.0)
+        self.add_param('z', val=1.0)
+        self.add_output('c', val=np.zeros(n))
+        self.add_output('f', val=0.0)
+        self.A = 2.0*np.eye(n) + np.eye(n, k=1)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['c'] = self.A.dot(params['x']) + params['y']**2
+        unknowns['f'] = np.sum((params['x'] - 3.0)**2) + \
+                        (params['y'] - 1.0)**2 + (params['z'] - 1.0)**2
+
+    def linearize(self, params, unknowns, resids):
+        n = len(params['x'])
+        return {('c', 'x'): self.A,
+                ('c', 'y'): 2.0*params['y']*np.ones((n, 1)),
+                ('c', 'z'): np.zeros((n, 1)),
+                ('f', 'x'): 2.0*(params['x'] - 3.0)[np.newaxis, :],
+                ('f', 'y'): 2.0*(params['y'] - 1.0),
+                ('f', 'z'): 2.0*(params['z'] - 1.0)}
+
+
 class TestPyoptSparse(unittest.TestCase, ConcurrentTestCaseMixin):
 
     def setUp(self):
@@ -1237,6 +1267,81 @@ class TestPyoptSparse(unittest.TestCase, ConcurrentTestCaseMixin):
         sub_sparsity = prob.driver.sub_sparsity
         self.assertEquals(len(sub_sparsity['seg0.r_i']['y_i']), 9)
 
+    def _banded(self, probes=0, declared=None, recorders=None):
+        n = 20
+        prob = Problem(root=Group())
+        prob.root.add('p', IndepVarComp([('x', np.ones(n)), ('y', 1.0),
+                                         ('z', 0.0)]), promotes=['*'])
+        prob.root.add('comp', BandedCon(n), promotes=['*'])
+
+        prob.driver = pyOptSparseDriver()
+        prob.driver.options['optimizer'] = OPTIMIZER
+        prob.driver.options['print_results'] = False
+        prob.driver.options['sparsity_probes'] = probes
+        if declared:
+            prob.driver.declared_sparsity['c'] = declared
+        prob.driver.add_desvar('x', lower=-10.0, upper=10.0)
+        prob.driver.add_desvar('y', lower=-10.0, upper=10.0)
+        prob.driver.add_desvar('z', lower=-10.0, upper=10.0)
+        prob.driver.add_objective('f')
+        prob.driver.add_constraint('c', upper=1.0)
+
+        if recorders:
+            driver_rec, solver_rec = recorders
+            driver_rec.options['record_derivatives'] = True
+            prob.driver.add_recorder(driver_rec)
+            prob.root.nl_solver.add_recorder(solver_rec)
+
+        prob.setup(check=False)
+        prob.run()
+        return prob
+
+    def test_sparsity_probe(self):
+        expected = self._banded()
+        self.assertEqual(expected.driver.sub_jac, {})
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            prob = self._banded(probes=2)
+        assert_rel_error(self, prob['x'], expected['x'], 1e-6)
+        assert_rel_error(self, prob['y'], expected['y'], 1e-6)
+        assert_rel_error(self, prob['z'], 1.0, 1e-6)
+
+        msgs = [str(warning.message) for warning in w]
+        self.assertTrue("The sparsity probe found no nonzero entries in the "
+                        "Jacobian of 'c' with respect to 'z'" in ' '.join(msgs))
+
+        # only the two diagonals of the x block are passed to the optimizer,
+        # and the block of zeros for z is dropped
+        rows, cols = prob.driver.sub_jac['c']['x']
+        self.assertEqual(len(rows), 39)
+        self.assertTrue(np.all((cols == rows) | (cols == rows + 1)))
+        self.assertEqual(len(prob.driver.sub_jac['c']['y'][0]), 20)
+        self.assertEqual(set(prob.driver.sparsity['c']), set(['x', 'y']))
+
+    def test_sparsity_probe_not_recorded(self):
+        driver_rec = InMemoryRecorder()
+        solver_rec = InMemoryRecorder()
+        self._banded(probes=2, recorders=(driver_rec, solver_rec))
+
+        # the random probe points come before the optimization, so they would
+        # be the first cases
+        assert_rel_error(self, driver_rec.iters[0]['unknowns']['x'],
+                         np.ones(20), 1e-15)
+        assert_rel_error(self, solver_rec.iters[0]['unknowns']['x'],
+                         np.ones(20), 1e-15)
+
+    def test_declared_sparsity(self):
+        expected = self._banded()
+
+        A = BandedCon(20).A
+        prob = self._banded(declared={'x': np.nonzero(A)})
+        assert_rel_error(self, prob['x'], expected['x'], 1e-6)
+
+        rows, cols = prob.driver.sub_jac['c']['x']
+        self.assertEqual(len(rows), 39)
+        self.assertTrue('y' not in prob.driver.sub_jac['c'])
+
     def test_analysis_error_objfunc(self):
 
         # Component raises an analysis error during some runs, and pyopt
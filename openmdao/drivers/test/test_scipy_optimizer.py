@@ -5,13 +5,38 @@ import unittest
 
 import numpy as np
 
-from openmdao.api import IndepVarComp, Group, Problem, ScipyOptimizer, ExecComp
+from openmdao.api import IndepVarComp, Group, Problem, ScipyOptimizer, \
+                         ExecComp, Component
 from openmdao.test.paraboloid import Paraboloid
 from openmdao.test.sellar import SellarDerivatives, SellarStateConnection
 from openmdao.test.simple_comps import SimpleArrayComp, ArrayComp2D
 from openmdao.test.util import assert_rel_error
 
 
+class VecQuadratic(Component):
+    """ f = sum((x - c)**2), g = x, h = sum(x) for an array x."""
+
+    def __init__(self, size, c):
+        super(VecQuadratic, self).__init__()
+        self.add_param('x', val=np.zeros(size))
+        self.add_output('f', val=0.0)
+        self.add_output('g', val=np.zeros(size))
+        self.add_output('h', val=0.0)
+        self.c = c
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        x = params['x']
+        unknowns['f'] = np.sum((x - self.c)**2)
+        unknowns['g'] = x
+        unknowns['h'] = np.sum(x)
+
+    def linearize(self, params, unknowns, resids):
+        x = params['x']
+        return {('f', 'x'): 2.0*(x - self.c)[np.newaxis, :],
+                ('g', 'x'): np.eye(len(x)),
+                ('h', 'x'): np.ones((1, len(x)))}
+
+
 class TestScipyOptimize(unittest.TestCase):
 
     def test_simple_paraboloid_unconstrained_TNC(self):
@@ -658,5 +683,56 @@ class TestScipyOptimize(unittest.TestCase):
         # Minimum should be at (7.166667, -7.833334)
         assert_rel_error(self, prob['x'] - prob['y'], 11.0, 1e-6)
 
+    def _vec_problem(self, optimizer, size, c):
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p', IndepVarComp('x', np.zeros(size)), promotes=['*'])
+        root.add('comp', VecQuadratic(size, c), promotes=['*'])
+
+        prob.driver = ScipyOptimizer()
+        prob.driver.options['optimizer'] = optimizer
+        prob.driver.options['tol'] = 1.0e-9
+        prob.driver.options['disp'] = False
+        prob.driver.add_desvar('x', lower=-10.0, upper=10.0)
+        prob.driver.add_objective('f')
+        return prob
+
+    def test_vector_constraints_SLSQP(self):
+        upper = np.linspace(0.0, 2.0, 30)
+
+        prob = self._vec_problem('SLSQP', 30, 3.0)
+        prob.driver.add_constraint('g', lower=-1.0, upper=upper)
+        prob.setup(check=False)
+        prob.run()
+
+        assert_rel_error(self, prob['x'], upper, 1e-6)
+
+        # one vector valued function for all 60 sides of the constraints
+        idx, sign, offset = prob.driver._con_rows['ineq']
+        self.assertEqual(list(prob.driver._con_rows), ['ineq'])
+        self.assertEqual(len(idx), 60)
+
+        prob = self._vec_problem('SLSQP', 30, 3.0)
+        prob.driver.add_constraint('h', equals=15.0)
+        prob.driver.add_constraint('g', upper=upper, scaler=2.0)
+        prob.setup(check=False)
+        prob.run()
+
+        # the equality keeps sum(x) at 15, below the unconstrained 90
+        assert_rel_error(self, prob['h'], 15.0, 1e-6)
+        self.assertTrue(np.all(prob['x'] <= upper + 1e-6))
+        self.assertEqual(list(prob.driver._con_rows), ['eq', 'ineq'])
+
+    def test_vector_constraints_COBYLA(self):
+        upper = np.array([1.0, 1.5, 2.0])
+
+        prob = self._vec_problem('COBYLA', 3, 3.0)
+        prob.driver.add_constraint('g', lower=-1.0, upper=upper)
+        prob.setup(check=False)
+        prob.run()
+
+        assert_rel_error(self, prob['x'], upper, 1e-5)
+
 if __name__ == "__main__":
     unittest.main()
@@ -8,6 +8,7 @@ import numpy as np
 
 from openmdao.api import IndepVarComp, Group, Problem
 from openmdao.test.paraboloid import Paraboloid
+from openmdao.test.util import assert_rel_error
 
 from openmdao.drivers.uniform_driver import UniformDriver
 
@@ -49,5 +50,43 @@ class TestUniformDriver(unittest.TestCase):
 
         self.assertTrue(inRange,"Not in range.")
 
+    def test_cases_by_index(self):
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p1', IndepVarComp('x', np.zeros(2)), promotes=['*'])
+
+        # enough samples for more than one block of random numbers
+        prob.driver = UniformDriver(2500, seed=3)
+        prob.driver.add_desvar('x', lower=np.array([-10.0, 0.0]), upper=10.0)
+        prob.setup(check=False)
+
+        driver = prob.driver
+
+        # each block of 1024 samples comes from its own seeded stream
+        expected = []
+        for seed in (3, [3, 1], [3, 2]):
+            rand = np.random.RandomState(seed)
+            sample = rand.uniform(size=(1024, 2))
+            expected.extend(np.array([-10.0, 0.0]) +
+                            np.array([20.0, 10.0])*sample)
+
+        cases = list(driver._build_runlist())
+        self.assertEqual(len(cases), 2500)
+        for case, exp in zip(cases, expected):
+            assert_rel_error(self, dict(case)['x'], exp, 1e-12)
+
+        # each rank of a parallel DOE only generates its own cases
+        cases = list(driver._runlist(1, 3))
+        self.assertEqual([n for n, _ in cases], list(range(1, 2500, 3)))
+        for case_num, case in cases:
+            assert_rel_error(self, dict(case)['x'], expected[case_num], 1e-12)
+
+        # cases can also be generated out of order
+        driver._num_cases()
+        for case_num in (2400, 5, 1024, 1023):
+            assert_rel_error(self, dict(driver._get_case(case_num))['x'],
+                             expected[case_num], 1e-12)
+
 if __name__ == "__main__":
     unittest.main()
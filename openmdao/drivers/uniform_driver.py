@@ -3,13 +3,21 @@ OpenMDAO design-of-experiments driver implementing the Uniform method.
 """
 
 from openmdao.drivers.predeterminedruns_driver import PredeterminedRunsDriver
-from six import moves, iteritems
 import numpy as np
 
+# number of samples drawn from the random stream at a time
+_BLOCK_SIZE = 1024
+
 
 class UniformDriver(PredeterminedRunsDriver):
     """Design-of-experiments Driver implementing the Uniform method.
 
+    Samples are drawn in blocks of 1024, each from its own random stream,
+    and each case is built from its own block when it's needed. So the
+    memory used doesn't depend on the number of samples, and any case can
+    be generated without the blocks before it. The first block is seeded
+    by `seed` and the others by `seed` and the number of the block.
+
     Args
     ----
     num_samples : int, optional
@@ -32,28 +40,41 @@ class UniformDriver(PredeterminedRunsDriver):
                                             load_balance=load_balance)
         self.num_samples = num_samples
         self.seed = seed
+        self._bounds = None
+        self._rand_seed = None
+        self._block = (-1, None)
 
-    def _build_runlist(self):
-        """Build a runlist based on a uniform distribution."""
-
+    def _num_cases(self):
+        """Returns the number of samples. Unless a seed was given, each call
+        starts a new set of samples.
+        """
         if self.seed is not None:
-            np.random.seed(self.seed)
-
-        for i in moves.range(self.num_samples):
-            sample = []
-            for key, meta in iteritems(self.get_desvar_metadata()):
-                nval = meta['size']
-                values = []
-                for k in range(nval):
-
-                    low = meta['lower']
-                    high = meta['upper']
-                    if isinstance(low, np.ndarray):
-                        low = low[k]
-                    if isinstance(high, np.ndarray):
-                        high = high[k]
-
-                    values.append(np.random.uniform(low, high))
-                sample.append([key, np.array(values)])
-
-            yield sample
+            self._rand_seed = self.seed
+        else:
+            self._rand_seed = np.random.randint(0, 2**31 - 1)
+
+        self._bounds = self._desvar_bounds()
+        self._block = (-1, None)
+        return self.num_samples
+
+    def _get_case(self, case_num):
+        """Returns sample number `case_num`."""
+        block_num, i = divmod(case_num, _BLOCK_SIZE)
+
+        if self._block[0] != block_num:
+            size = sum(len(low) for _, low, _ in self._bounds)
+            if block_num == 0:
+                rand = np.random.RandomState(self._rand_seed)
+            else:
+                rand = np.random.RandomState([self._rand_seed, block_num])
+            self._block = (block_num, rand.uniform(size=(_BLOCK_SIZE, size)))
+
+        sample = self._block[1][i]
+
+        case = []
+        start = 0
+        for name, low, high in self._bounds:
+            end = start + len(low)
+            case.append([name, low + (high - low)*sample[start:end]])
+            start = end
+        return case
@@ -1,11 +1,23 @@
 """ Class definition for BaseRecorder, the base class for all recorders."""
 
 from fnmatch import fnmatchcase
+from copy import deepcopy
+from collections import OrderedDict
 import sys
 
-from six import StringIO
+from six import StringIO, iteritems
+
+import numpy as np
 
 from openmdao.util.options import OptionsDictionary
+from openmdao.util.record_util import format_iteration_coordinate
+
+# For each vector: the key used by BaseRecorder, the label used for it in
+# recorded files, the key used in case dicts, and the option that turns its
+# recording on or off.
+_vec_labels = (('p', 'Parameters', 'params', 'record_params'),
+               ('u', 'Unknowns', 'unknowns', 'record_unknowns'),
+               ('r', 'Residuals', 'resids', 'record_resids'))
 
 class BaseRecorder(object):
     """ This is a base class for all case recorders and is not a functioning
@@ -27,6 +39,18 @@ class BaseRecorder(object):
         Patterns for variables to include in recording.
     options['excludes'] :  list of strings
         Patterns for variables to exclude in recording (processed after includes).
+    options['record_delta'] :  bool(False)
+        If True, only the variables whose values differ from the last full
+        snapshot of the same system are recorded, along with the iteration
+        coordinate of that snapshot.
+    options['delta_full_interval'] :  int(100)
+        When recording deltas, a full snapshot is recorded every
+        `delta_full_interval` cases of each system.
+    options['record_vectors'] :  bool(False)
+        If True, the recorded values of each vector are copied out of the
+        flat vector in one operation and recorded as a single array, along
+        with a map of where each variable is stored in it. Only supported by
+        recorders that set `_supports_vectors`.
     """
 
     def __init__(self):
@@ -42,6 +66,15 @@ class BaseRecorder(object):
         self.options.add_option('excludes', [],
                                 desc='Patterns for variables to exclude from recording '
                                 '(processed after includes)')
+        self.options.add_option('record_delta', False,
+                                desc='Set to True to only record variables that '
+                                'changed since the last full snapshot')
+        self.options.add_option('delta_full_interval', 100, lower=1,
+                                desc='Number of cases of a system between full '
+                                'snapshots when recording deltas')
+        self.options.add_option('record_vectors', False,
+                                desc='Set to True to record each vector as one '
+                                'flat array')
         self.out = None
 
         # This is for drivers to determine if a recorder supports
@@ -54,7 +87,18 @@ class BaseRecorder(object):
         # unnecessary gathering.
         self._parallel = False
 
+        # Set to True by recorders that can store the flat arrays recorded
+        # when the 'record_vectors' option is set.
+        self._supports_vectors = False
+
         self._filtered = {}
+
+        # _VectorMap for each vector of each system, keyed on pathname then
+        # vector key, when the 'record_vectors' option is set
+        self._vectors = {}
+
+        # state of delta recording, keyed on system pathname
+        self._delta = {}
         # TODO: System specific includes/excludes
 
     def startup(self, group):
@@ -88,6 +132,24 @@ class BaseRecorder(object):
             'r': myresids
         }
 
+        self._delta.pop(group.pathname, None)
+        self._vectors.pop(group.pathname, None)
+
+        if self.options['record_vectors']:
+            if not self._supports_vectors:
+                raise RuntimeError("%s does not support the 'record_vectors' "
+                                   "option." % self.__class__.__name__)
+            if self.options['record_delta']:
+                raise RuntimeError("The 'record_delta' and 'record_vectors' "
+                                   "options can't be used together.")
+
+            filtered = self._filtered[group.pathname]
+            self._vectors[group.pathname] = {
+                'p': _VectorMap(group.params, filtered['p']),
+                'u': _VectorMap(group.unknowns, filtered['u']),
+                'r': _VectorMap(group.resids, filtered['r']),
+            }
+
     def _check_path(self, path, includes, excludes):
         """ Return True if `path` should be recorded. """
 
@@ -119,7 +181,92 @@ class BaseRecorder(object):
             return vecwrapper
 
         pathname = self._get_pathname(iteration_coordinate)
-        return {n:vecwrapper[n] for n in self._filtered[pathname][key]}
+        if pathname in self._vectors:
+            # only what can't be recorded as part of the flat array
+            names = self._vectors[pathname][key].others
+        else:
+            names = self._filtered[pathname][key]
+        filtered = {n:vecwrapper[n] for n in names}
+
+        if self.options['record_delta'] and pathname in self._delta:
+            filtered = self._delta_filter(self._delta[pathname], key, filtered)
+
+        return filtered
+
+    def _flat_vector(self, vecwrapper, key, iteration_coordinate):
+        """ Copies the recorded values of the given vector into one flat
+        array ('record_vectors' mode). Variables that can't be part of the
+        array are returned by `_filter_vector` instead.
+
+        Args
+        ----
+        vecwrapper : `VecWrapper` or dict
+            The vector to record.
+
+        key : str
+            'p', 'u' or 'r'.
+
+        iteration_coordinate : list
+            The iteration coordinate of the case.
+
+        Returns
+        -------
+        tuple
+            (pathname, flat array, `_VectorMap`), or None if none of the
+            variables in the vector are recorded this way.
+        """
+        pathname = self._get_pathname(iteration_coordinate)
+        vmap = self._vectors[pathname][key]
+        if not vmap.map:
+            return None
+        return pathname, vmap.flatten(vecwrapper), vmap
+
+    def _start_delta(self, metadata):
+        """ Decides whether the case described by `metadata` is recorded as
+        a full snapshot or as a delta from the last snapshot of the same
+        system.
+
+        Args
+        ----
+        metadata : dict
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+
+        Returns
+        -------
+        dict
+            `metadata` for a full snapshot, otherwise a copy of it with the
+            formatted iteration coordinate of the snapshot under 'delta_ref'.
+        """
+        coord = metadata['coord']
+        pathname = self._get_pathname(coord)
+        state = self._delta.get(pathname)
+
+        if state is None or state['count'] >= self.options['delta_full_interval']:
+            self._delta[pathname] = {
+                'ref': format_iteration_coordinate(coord),
+                'count': 1,
+                'full': True,
+                'p': {}, 'u': {}, 'r': {},
+            }
+            return metadata
+
+        state['count'] += 1
+        state['full'] = False
+        meta = metadata.copy()
+        meta['delta_ref'] = state['ref']
+        return meta
+
+    def _delta_filter(self, state, key, filtered):
+        """ Saves the values of a full snapshot, or drops the values that
+        haven't changed since the snapshot.
+        """
+        if state['full']:
+            state[key] = {n: deepcopy(v) for n, v in iteritems(filtered)}
+            return filtered
+
+        ref = state[key]
+        return {n: v for n, v in iteritems(filtered)
+                if n not in ref or not _same(v, ref[n])}
 
     def record_metadata(self, group):
         """Writes the metadata of the given group
@@ -174,3 +321,96 @@ class BaseRecorder(object):
             if not isinstance(self.out, StringIO):
                 self.out.close()
             self.out = None
+
+
+def _same(val, ref):
+    """ Returns True if `val` is equal to the snapshot value `ref`. """
+    try:
+        return bool(np.array_equal(val, ref))
+    except Exception:
+        # pass_by_obj values that can't be compared are always recorded
+        return False
+
+
+class _VectorMap(object):
+    """ Describes where the recorded variables of a vector are stored in the
+    flat array that is recorded for it in 'record_vectors' mode.
+
+    Args
+    ----
+    vecwrapper : `VecWrapper`
+        The vector the flat array is copied from.
+
+    names : list of str
+        Names of the recorded variables.
+    """
+
+    def __init__(self, vecwrapper, names):
+        self._dat = vecwrapper._dat
+
+        # names of variables that aren't stored in the vector's array
+        # (pass_by_obj, remote, or owned by a parent system)
+        self.others = []
+
+        slices = []
+        for name in names:
+            acc = vecwrapper._dat[name]
+            if acc.slice is None:
+                self.others.append(name)
+            else:
+                slices.append((acc.slice, name, np.shape(vecwrapper[name]),
+                               acc.meta.get('unit_conv')))
+
+        # keep the vector order so contiguous variables stay contiguous
+        slices.sort(key=lambda s: s[0][0])
+
+        # name -> (start, end, shape) in the flat array
+        self.map = OrderedDict()
+        self._conv = []
+        idxs = []
+        size = 0
+        for (start, end), name, shape, conv in slices:
+            self.map[name] = (size, size + end - start, shape)
+            if conv is not None:
+                self._conv.append((size, size + end - start, conv[0], conv[1]))
+            idxs.append((start, end))
+            size += end - start
+        self.size = size
+
+        if idxs and all(idxs[i][1] == idxs[i+1][0] for i in range(len(idxs)-1)):
+            self._index = slice(idxs[0][0], idxs[-1][1])
+        else:
+            self._index = np.concatenate([np.arange(start, end, dtype=int)
+                                          for start, end in idxs] or
+                                         [np.empty(0, dtype=int)])
+
+    def flatten(self, vecwrapper):
+        """
+        Args
+        ----
+        vecwrapper : `VecWrapper` or dict
+            The vector this map was built for, or a dict containing the
+            values of the mapped variables.
+
+        Returns
+        -------
+        ndarray
+            A new flat array holding the values of the mapped variables.
+        """
+        if getattr(vecwrapper, '_dat', None) is not self._dat:
+            # values that were already copied out of the vector (e.g.,
+            # gathered from other processes)
+            if not self.map:
+                return np.empty(0)
+            return np.concatenate([np.ravel(vecwrapper[n]) for n in self.map])
+
+        if isinstance(self._index, slice):
+            flat = vecwrapper.vec[self._index].copy()
+        else:
+            flat = vecwrapper.vec[self._index]
+
+        for start, end, scale, offset in self._conv:
+            flat[start:end] += offset
+            flat[start:end] *= scale
+
+        return flat
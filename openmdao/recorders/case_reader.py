@@ -0,0 +1,691 @@
+"""
+Class definition for CaseReader, which provides read access to the cases
+saved by SqliteRecorder, HDF5Recorder and NpyRecorder.
+"""
+
+import os
+import json
+import pickle
+import sqlite3
+from collections import OrderedDict
+
+from six import iteritems, string_types
+
+import numpy as np
+
+from openmdao.util.record_util import is_valid_sqlite3_db
+
+_labels = ('Parameters', 'Unknowns', 'Residuals')
+
+
+class _LRUCache(object):
+    """ A dict-like cache that holds at most `maxsize` entries, discarding
+    the least recently used entry when full.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key):
+        try:
+            val = self._data.pop(key)
+        except KeyError:
+            return None
+        self._data[key] = val
+        return val
+
+    def put(self, key, val):
+        if self.maxsize <= 0:
+            return
+        self._data.pop(key, None)
+        self._data[key] = val
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+def _stack(vals, shape):
+    """ Stacks the values of a variable from many cases into one array with
+    the case index as the first axis, filling missing values with NaN.
+    """
+    arr = np.empty((len(vals),) + tuple(shape))
+    for i, val in enumerate(vals):
+        arr[i] = np.nan if val is None else val
+    return arr
+
+
+def _h5_to_dict(grp):
+    """ Converts an HDF5 group into nested dicts of values. """
+    dct = {}
+    for name, item in iteritems(grp):
+        if hasattr(item, 'shape'):
+            dct[name] = item[()]
+        else:
+            dct[name] = _h5_to_dict(item)
+    return dct
+
+
+def _merge_delta(snapshot, delta):
+    """ Returns the full case for a delta case, taking the values that
+    didn't change from the snapshot it refers to.
+    """
+    case = dict(delta)
+    for label in _labels:
+        if label in snapshot:
+            vals = dict(snapshot[label])
+            vals.update(delta.get(label, {}))
+            case[label] = vals
+    return case
+
+
+def _unflatten(flat, shape):
+    """ Returns the value of a variable taken from a flat array. """
+    if shape:
+        return flat.reshape(shape)
+    return flat[0]
+
+
+def _to_str(val):
+    if isinstance(val, bytes):
+        return val.decode('utf-8')
+    return val
+
+
+class _SqliteDictBackend(object):
+    """ Reads files written by SqliteRecorder using the 'dict' layout. """
+
+    def __init__(self, filename):
+        from sqlitedict import SqliteDict
+        self._db = SqliteDict(filename, 'iterations', flag='r')
+        self._meta = SqliteDict(filename, 'metadata', flag='r')
+
+    def coords(self):
+        return list(self._db.keys())
+
+    def case(self, i, coord):
+        data = self._db[coord]
+        case = {'coord': coord}
+        for key, val in iteritems(data):
+            case[key] = val
+        return case
+
+    def var(self, label, name, idxs, coords, get_case):
+        vals = [get_case(i).get(label, {}).get(name) for i in idxs]
+        shapes = [np.shape(v) for v in vals if v is not None]
+        return _stack(vals, shapes[0] if shapes else ())
+
+    def delta_refs(self):
+        # var() reads whole cases, which are already reconstructed
+        return None
+
+    def vectors(self):
+        return []
+
+    def metadata(self):
+        return dict(self._meta.items())
+
+    def close(self):
+        self._db.close()
+        self._meta.close()
+
+
+class _SqliteColumnarBackend(object):
+    """ Reads files written by SqliteRecorder using the 'columnar' layout. """
+
+    def __init__(self, filename):
+        self._conn = sqlite3.connect(filename)
+        self._vars = {}  # (label, name) -> (col, shape, dtype)
+        self._cols = {}  # col -> (label, name, shape, dtype)
+        for col, label, name, shape, dtype in self._conn.execute(
+                "SELECT col, vector, name, shape, dtype FROM variables"):
+            shape = json.loads(shape)
+            self._vars[(label, name)] = (col, shape, dtype)
+            self._cols[col] = (label, name, shape, dtype)
+
+        row = self._conn.execute("SELECT value FROM metadata WHERE "
+                                 "key = 'vector_maps'").fetchone()
+        self._vector_maps = {} if row is None else pickle.loads(row[0])
+
+    def coords(self):
+        rows = self._conn.execute("SELECT id, coord FROM cases ORDER BY id").fetchall()
+        self._ids = [row[0] for row in rows]
+        return [row[1] for row in rows]
+
+    def _decode(self, blob, shape, dtype):
+        if dtype == 'float64':
+            val = np.frombuffer(blob, dtype=float)
+            if shape:
+                return val.reshape(shape)
+            return val[0]
+        return pickle.loads(blob)
+
+    def case(self, i, coord):
+        cur = self._conn.execute("SELECT * FROM cases WHERE id = ?",
+                                 (self._ids[i],))
+        row = cur.fetchone()
+        case = {}
+        for desc, val in zip(cur.description, row):
+            col = desc[0]
+            if col == 'id' or col in self._vector_maps:
+                continue
+            if col in self._cols:
+                if val is None:
+                    continue
+                label, name, shape, dtype = self._cols[col]
+                case.setdefault(label, {})[name] = self._decode(val, shape, dtype)
+            elif val is not None or col != 'delta_ref':
+                case[col] = val
+        return case
+
+    def delta_refs(self):
+        return [row[0] for row in self._conn.execute(
+                    "SELECT delta_ref FROM cases ORDER BY id")]
+
+    def vectors(self):
+        return [(col, info['vector'], info['map'])
+                for col, info in sorted(iteritems(self._vector_maps))]
+
+    def vector_rows(self, col, idxs, size):
+        if len(idxs) == 1:
+            blobs = [self._conn.execute("SELECT %s FROM cases WHERE id = ?" % col,
+                                        (self._ids[idxs[0]],)).fetchone()[0]]
+        else:
+            blobs = [row[0] for row in self._conn.execute(
+                        "SELECT %s FROM cases ORDER BY id" % col)]
+            blobs = [blobs[i] for i in idxs]
+
+        rows = np.full((len(idxs), size), np.nan)
+        for k, blob in enumerate(blobs):
+            if blob is not None:
+                rows[k] = np.frombuffer(blob, dtype=float)
+        return rows
+
+    def var(self, label, name, idxs, coords, get_case):
+        try:
+            col, shape, dtype = self._vars[(label, name)]
+        except KeyError:
+            return _stack([None]*len(idxs), ())
+
+        blobs = [row[0] for row in self._conn.execute(
+                    "SELECT %s FROM cases ORDER BY id" % col)]
+        blobs = [blobs[i] for i in idxs]
+
+        if dtype == 'float64' and None not in blobs:
+            # one decode for the whole column
+            arr = np.frombuffer(b''.join(blobs), dtype=float)
+            return arr.reshape((len(blobs),) + tuple(shape))
+
+        return _stack([None if b is None else self._decode(b, shape, dtype)
+                       for b in blobs], shape)
+
+    def metadata(self):
+        return {key: pickle.loads(val) for key, val in
+                self._conn.execute("SELECT key, value FROM metadata")}
+
+    def close(self):
+        self._conn.close()
+
+
+class _HDF5GroupBackend(object):
+    """ Reads files written by HDF5Recorder using the 'group' layout. """
+
+    def __init__(self, hdf):
+        self._hdf = hdf
+        self._coords = None
+
+    def coords(self):
+        if self._coords is None:
+            groups = [(grp.attrs['timestamp'], name) for name, grp in
+                      iteritems(self._hdf) if name != 'metadata']
+            self._coords = [name for _, name in sorted(groups)]
+        return self._coords
+
+    def case(self, i, coord):
+        grp = self._hdf[coord]
+        case = {'coord': coord}
+        for key in ('timestamp', 'success', 'msg'):
+            case[key] = _to_str(grp.attrs[key])
+        if 'delta_ref' in grp.attrs:
+            case['delta_ref'] = _to_str(grp.attrs['delta_ref'])
+        for label in _labels:
+            if label in grp:
+                case[label] = {n: d[()] for n, d in iteritems(grp[label])}
+        return case
+
+    def var(self, label, name, idxs, coords, get_case):
+        vals = []
+        for i in idxs:
+            path = '/'.join((coords[i], label, name))
+            vals.append(self._hdf[path][()] if path in self._hdf else None)
+        shapes = [np.shape(v) for v in vals if v is not None]
+        return _stack(vals, shapes[0] if shapes else ())
+
+    def delta_refs(self):
+        return [_to_str(self._hdf[c].attrs.get('delta_ref', '')) or None
+                for c in self.coords()]
+
+    def vectors(self):
+        return []
+
+    def metadata(self):
+        return _h5_to_dict(self._hdf['metadata'])
+
+    def close(self):
+        self._hdf.close()
+
+
+class _HDF5ChunkedBackend(_HDF5GroupBackend):
+    """ Reads files written by HDF5Recorder using the 'chunked' layout. """
+
+    def coords(self):
+        if self._coords is None:
+            self._coords = [_to_str(c) for c in self._hdf['cases/coord'][:]]
+        return self._coords
+
+    def case(self, i, coord):
+        cases = self._hdf['cases']
+        case = {'coord': coord}
+        for key in ('timestamp', 'success', 'msg'):
+            case[key] = _to_str(cases[key][i])
+        if 'delta_ref' in cases and cases['delta_ref'][i]:
+            case['delta_ref'] = _to_str(cases['delta_ref'][i])
+        for label in _labels:
+            if label in cases:
+                vals = {}
+                for name, dset in iteritems(cases[label]):
+                    val = dset[i]
+                    if not np.all(np.isnan(val)):
+                        vals[name] = val
+                case[label] = vals
+        return case
+
+    def var(self, label, name, idxs, coords, get_case):
+        path = '/'.join(('cases', label, name))
+        if path not in self._hdf:
+            return _stack([None]*len(idxs), ())
+        dset = self._hdf[path]
+        if len(idxs) == dset.shape[0]:
+            return dset[:]
+        if not idxs:
+            return np.empty((0,) + dset.shape[1:])
+        return dset[idxs]
+
+    def delta_refs(self):
+        if 'delta_ref' not in self._hdf['cases']:
+            return None
+        return [_to_str(r) or None for r in self._hdf['cases/delta_ref'][:]]
+
+    def vectors(self):
+        if 'vectors' not in self._hdf['cases']:
+            return []
+        return [(name, _to_str(dset.attrs['vector']),
+                 json.loads(_to_str(dset.attrs['map'])))
+                for name, dset in iteritems(self._hdf['cases/vectors'])]
+
+    def vector_rows(self, col, idxs, size):
+        dset = self._hdf['cases/vectors'][col]
+        if len(idxs) == dset.shape[0]:
+            return dset[:]
+        if not idxs:
+            return np.empty((0, size))
+        return dset[idxs]
+
+
+class _NpyBackend(object):
+    """ Reads directories written by NpyRecorder. """
+
+    def __init__(self, dirname):
+        self._dir = dirname
+        with open(os.path.join(dirname, 'index.json')) as f:
+            self._index = json.load(f)
+        self._cols = {}
+        self._coords = None
+        self._delta_refs = None
+
+    def _load(self, fname):
+        col = self._cols.get(fname)
+        if col is None:
+            col = np.load(os.path.join(self._dir, fname), mmap_mode='r')
+            self._cols[fname] = col
+        return col
+
+    def coords(self):
+        if self._coords is None:
+            with open(os.path.join(self._dir, 'coord.txt')) as f:
+                coords = f.read().splitlines()
+            self._coords = coords[:self._index['num_cases']]
+        return self._coords
+
+    def case(self, i, coord):
+        case = {
+            'coord': coord,
+            'timestamp': float(self._load('timestamp.npy')[i]),
+            'success': int(self._load('success.npy')[i]),
+            'msg': self._index['msgs'].get(str(i), ''),
+        }
+        ref = self.delta_refs()[i]
+        if ref is not None:
+            case['delta_ref'] = ref
+        for label in _labels:
+            vals = {}
+            for name, info in iteritems(self._index['variables'][label]):
+                val = np.array(self._load(info['file'])[i])
+                if not np.all(np.isnan(val)):
+                    vals[name] = val if val.shape else val[()]
+            if vals:
+                case[label] = vals
+        return case
+
+    def var(self, label, name, idxs, coords, get_case):
+        info = self._index['variables'][label].get(name)
+        if info is None:
+            return _stack([None]*len(idxs), ())
+        col = self._load(info['file'])
+        if len(idxs) == col.shape[0]:
+            return np.array(col)
+        return col[idxs]
+
+    def delta_refs(self):
+        if self._delta_refs is None:
+            coords = self.coords()
+            refs = self._load(self._index['cases']['delta_ref'])[:len(coords)]
+            self._delta_refs = [coords[r] if r >= 0 else None for r in refs]
+        return self._delta_refs
+
+    def vectors(self):
+        return [(info['file'], label, info['map'])
+                for label, vecs in iteritems(self._index.get('vectors', {}))
+                for info in vecs.values()]
+
+    def vector_rows(self, col, idxs, size):
+        rows = self._load(col)
+        if len(idxs) == rows.shape[0]:
+            return np.array(rows)
+        return rows[idxs]
+
+    def metadata(self):
+        fname = os.path.join(self._dir, 'metadata.pkl')
+        if not os.path.isfile(fname):
+            return {}
+        with open(fname, 'rb') as f:
+            return pickle.load(f)
+
+    def close(self):
+        self._cols = {}
+
+
+class CaseReader(object):
+    """
+    Provides lazy, read-only access to the cases saved by `SqliteRecorder`,
+    `HDF5Recorder` or `NpyRecorder`. The file format is detected
+    automatically, and the file isn't opened until data is requested.
+
+    Cases are returned as dicts with 'coord', 'timestamp', 'success' and
+    'msg' entries, plus 'Parameters', 'Unknowns' and 'Residuals' dicts for
+    whichever vectors were recorded. Decoded cases are kept in a least
+    recently used cache.
+
+    Vectors recorded as flat arrays with the 'record_vectors' recorder
+    option are split back into variables.  Cases recorded with the
+    'record_delta' recorder option are filled in
+    from the full snapshot they refer to, so they look the same as cases
+    recorded in full. Their 'delta_ref' entry holds the coordinate of the
+    snapshot.
+
+    Args
+    ----
+    filename : str
+        The file written by a `SqliteRecorder` or `HDF5Recorder`, or the
+        directory written by an `NpyRecorder`.
+
+    cache_size : int, optional
+        Maximum number of decoded cases to keep in memory. Defaults to 128.
+    """
+
+    def __init__(self, filename, cache_size=128):
+        self.filename = filename
+        self._backend = None
+        self._coords = None
+        self._coord_idx = None
+        self._refs = None
+        self._vecs = None
+        self._cache = _LRUCache(cache_size)
+
+    def _open(self):
+        """ Picks a backend based on the file format and opens the file. """
+        if self._backend is not None:
+            return self._backend
+
+        fname = self.filename
+        if os.path.isdir(fname):
+            self._backend = _NpyBackend(fname)
+
+        elif is_valid_sqlite3_db(fname):
+            conn = sqlite3.connect(fname)
+            tables = set(row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"))
+            conn.close()
+            if 'cases' in tables:
+                self._backend = _SqliteColumnarBackend(fname)
+            else:
+                self._backend = _SqliteDictBackend(fname)
+
+        elif os.path.isfile(fname):
+            try:
+                from h5py import File, is_hdf5
+            except ImportError:
+                raise RuntimeError("Can't read '%s'. It isn't a SQLite "
+                                   "database and h5py is not installed." % fname)
+            if not is_hdf5(fname):
+                raise IOError("'%s' is not a recognized case recording." % fname)
+            hdf = File(fname, 'r')
+            if 'cases' in hdf:
+                self._backend = _HDF5ChunkedBackend(hdf)
+            else:
+                self._backend = _HDF5GroupBackend(hdf)
+
+        else:
+            raise IOError("'%s' does not exist." % fname)
+
+        return self._backend
+
+    def _all_coords(self):
+        if self._coords is None:
+            self._coords = self._open().coords()
+        return self._coords
+
+    def _index_of(self, coord):
+        if self._coord_idx is None:
+            self._coord_idx = {c: i for i, c in enumerate(self._all_coords())}
+        try:
+            return self._coord_idx[coord]
+        except KeyError:
+            raise KeyError("Case '%s' was not found in '%s'." %
+                           (coord, self.filename))
+
+    def _delta_refs(self):
+        """ Returns the index of the snapshot each case refers to (None for
+        cases recorded in full), or None if no case was recorded as a delta.
+        """
+        if self._refs is None:
+            refs = self._open().delta_refs()
+            if refs and any(refs):
+                self._refs = [None if r is None else self._index_of(r)
+                              for r in refs]
+            else:
+                self._refs = False
+        return self._refs or None
+
+    def _vectors(self):
+        """ Returns (column, vector label, map, size) for each array
+        recorded with the 'record_vectors' option.
+        """
+        if self._vecs is None:
+            self._vecs = [(col, label, vmap, max(v[1] for v in vmap.values()))
+                          for col, label, vmap in self._open().vectors()]
+        return self._vecs
+
+    def _indices(self, prefix):
+        """ Returns indices of all cases whose coordinate starts with `prefix`."""
+        coords = self._all_coords()
+        if not prefix:
+            return list(range(len(coords)))
+        return [i for i, c in enumerate(coords) if c.startswith(prefix)]
+
+    def list_cases(self, prefix=None):
+        """
+        Args
+        ----
+        prefix : str, optional
+            If given, only cases whose formatted iteration coordinate starts
+            with `prefix` are listed, e.g., 'rank0:Driver|1|root' lists all
+            iterations of the root solver during the first driver iteration.
+
+        Returns
+        -------
+        list of str
+            Formatted iteration coordinates in the order they were recorded.
+        """
+        coords = self._all_coords()
+        return [coords[i] for i in self._indices(prefix)]
+
+    def num_cases(self):
+        """
+        Returns
+        -------
+        int
+            The number of recorded cases.
+        """
+        return len(self._all_coords())
+
+    def _get_case(self, i):
+        case = self._cache.get(i)
+        if case is None:
+            case = self._open().case(i, self._all_coords()[i])
+            case['coord'] = self._all_coords()[i]
+            for col, label, vmap, size in self._vectors():
+                row = self._open().vector_rows(col, [i], size)[0]
+                if not np.all(np.isnan(row)):
+                    vals = case.setdefault(label, {})
+                    for name, (start, end, shape) in iteritems(vmap):
+                        vals[name] = _unflatten(row[start:end], shape)
+            if case.get('delta_ref'):
+                case = _merge_delta(self._get_case(self._index_of(case['delta_ref'])),
+                                    case)
+            self._cache.put(i, case)
+        return case
+
+    def get_case(self, case_id):
+        """
+        Args
+        ----
+        case_id : str or int
+            The formatted iteration coordinate of the case, or its index in
+            the order the cases were recorded. Negative indices count from
+            the last case.
+
+        Returns
+        -------
+        dict
+            The recorded data for the case.
+        """
+        coords = self._all_coords()
+        if isinstance(case_id, string_types):
+            i = self._index_of(case_id)
+        else:
+            i = case_id
+            if i < 0:
+                i += len(coords)
+            if not 0 <= i < len(coords):
+                raise IndexError("Case index %d is out of range." % case_id)
+        return self._get_case(i)
+
+    def get_var(self, name, vector='Unknowns', prefix=None):
+        """ Reads the value of one variable from many cases at once.
+
+        Args
+        ----
+        name : str
+            Name of the variable.
+
+        vector : str, optional
+            One of 'Unknowns' (the default), 'Parameters' or 'Residuals'.
+
+        prefix : str, optional
+            If given, only cases whose formatted iteration coordinate starts
+            with `prefix` are read.
+
+        Returns
+        -------
+        ndarray
+            Array whose first axis is the case index and whose remaining
+            axes have the shape of the variable. Cases where the variable
+            wasn't recorded are NaN.
+        """
+        if vector not in _labels:
+            raise ValueError("vector must be one of %s, not '%s'." %
+                             (_labels, vector))
+        idxs = self._indices(prefix)
+
+        refs = self._delta_refs()
+        if refs is None:
+            return self._read_var(vector, name, idxs)
+
+        # read the snapshots along with the deltas, then fill in the values
+        # that the deltas left out
+        ridxs = [refs[i] for i in idxs]
+        need = sorted(set(idxs).union(r for r in ridxs if r is not None))
+        arr = self._read_var(vector, name, need)
+        pos = dict((j, k) for k, j in enumerate(need))
+        vals = arr[[pos[i] for i in idxs]]
+        for k, r in enumerate(ridxs):
+            if r is not None and np.all(np.isnan(vals[k])):
+                vals[k] = arr[pos[r]]
+        return vals
+
+    def _read_var(self, vector, name, idxs):
+        """ Reads one variable from the given cases, looking in both its
+        own column and the arrays recorded with 'record_vectors'.
+        """
+        backend = self._open()
+        arr = backend.var(vector, name, idxs, self._all_coords(), self._get_case)
+
+        for col, label, vmap, size in self._vectors():
+            if label != vector or name not in vmap:
+                continue
+            start, end, shape = vmap[name]
+            vals = backend.vector_rows(col, idxs, size)[:, start:end]
+            vals = vals.reshape((len(idxs),) + tuple(shape))
+            if arr.shape != vals.shape:
+                # the variable was only recorded in flat arrays
+                arr = np.full(vals.shape, np.nan)
+            missing = np.all(np.isnan(arr.reshape(len(idxs), -1)), axis=1) \
+                        if arr.size else np.zeros(len(idxs), dtype=bool)
+            arr[missing] = vals[missing]
+
+        return arr
+
+    def get_metadata(self):
+        """
+        Returns
+        -------
+        dict
+            The recorded metadata.
+        """
+        return self._open().metadata()
+
+    def close(self):
+        """ Closes the underlying file. It will be reopened if more data is
+        requested.
+        """
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+        self._coords = None
+        self._coord_idx = None
+        self._refs = None
+        self._vecs = None
+        self._cache.clear()
@@ -73,6 +73,13 @@ class CsvRecorder(BaseRecorder):
             self.out = out
         self.writer = csv.writer(out)
 
+    def startup(self, group):
+        if self.options['record_delta']:
+            raise RuntimeError("CsvRecorder does not support the 'record_delta' "
+                               "option because every row must hold a value "
+                               "for every column.")
+        super(CsvRecorder, self).startup(group)
+
     def record_metadata(self, group):
         """Currently not supported for csv files. Do nothing.
 
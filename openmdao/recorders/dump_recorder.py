@@ -132,6 +132,9 @@ class DumpRecorder(BaseRecorder):
 
         self._write_success_info(metadata)
 
+        if 'delta_ref' in metadata:
+            write("Changed since: {0:s}\n".format(metadata['delta_ref']))
+
         if self.options['record_params']:
             write("Params:\n")
             for param, val in sorted(iteritems(self._filter_vector(params,
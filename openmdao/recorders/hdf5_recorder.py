@@ -1,5 +1,6 @@
 """ Class definition for HDF5Recorder, which uses the HDF5 format."""
 
+import json
 from collections import OrderedDict
 from numbers import Number
 
@@ -8,25 +9,53 @@ from six import iteritems
 import numpy as np
 import pickle
 
-from h5py import File
+from h5py import File, special_dtype
 
-from openmdao.recorders.base_recorder import BaseRecorder
+from openmdao.recorders.base_recorder import BaseRecorder, _vec_labels
 from openmdao.util.record_util import format_iteration_coordinate
 
 from openmdao.devtools.partition_tree_n2 import get_model_viewer_data
 
 format_version = 4
 
+_str_dtype = special_dtype(vlen=str)
+
 class HDF5Recorder(BaseRecorder):
     """
     A recorder that stores data using HDF5. This format naturally handles
     hierarchical data and is a standard for handling large datasets.
 
+    With the default 'group' layout, each case is stored in its own HDF5
+    group named by its iteration coordinate. With the 'chunked' layout, all
+    cases are appended to the 'cases' group, which holds one resizable,
+    chunked dataset per recorded variable (e.g. 'cases/Unknowns/comp1.y1')
+    whose first axis is the case index, plus 'coord', 'timestamp', 'success',
+    'msg' and 'delta_ref' datasets along the same axis.  A variable that wasn't recorded
+    for a given case is filled with NaN. Derivatives are stored in the
+    'derivs' group under the iteration coordinate.
+
+    The 'chunked' layout also supports the 'record_vectors' option, which
+    stores each recorded vector as one 2D dataset in the 'cases/vectors'
+    group. Its 'vector', 'pathname' and 'map' attributes give the vector it
+    was copied from and the JSON encoded start, end and shape of each
+    variable along its second axis.
+
     Args
     ----
     out : str
         String containing the filename for the HDF5 file.
 
+    layout : str, optional
+        Either 'group' (the default) or 'chunked'.
+
+    chunk_size : int, optional
+        Number of cases per chunk when using the 'chunked' layout. Defaults
+        to 256.
+
+    compression : str, optional
+        HDF5 compression filter (e.g. 'gzip' or 'lzf') applied to the
+        datasets of the 'chunked' layout. Defaults to None.
+
     **driver_kwargs
         Additional keyword args to be passed to the HDF5 driver.
 
@@ -44,17 +73,48 @@ class HDF5Recorder(BaseRecorder):
         Patterns for variables to include in recording.
     options['excludes'] :  list of strings
         Patterns for variables to exclude in recording (processed after includes).
+    options['record_vectors'] :  bool(False)
+        Tells recorder whether to record each vector as a single flat array.
+        Only supported by the 'chunked' layout.
     """
 
-    def __init__(self, out, **driver_kwargs):
+    def __init__(self, out, layout='group', chunk_size=256, compression=None,
+                 **driver_kwargs):
 
         super(HDF5Recorder, self).__init__()
+
+        if layout not in ('group', 'chunked'):
+            raise ValueError("HDF5Recorder layout must be 'group' or "
+                             "'chunked', not '%s'." % layout)
+
+        self.layout = layout
+        self._supports_vectors = layout == 'chunked'
         self.out = File(out, 'w', **driver_kwargs)
 
         metadata_group = self.out.require_group('metadata')
 
         metadata_group.create_dataset('format_version', data = format_version)
 
+        if layout == 'chunked':
+            metadata_group.create_dataset('layout', data=layout)
+
+            self._chunk_size = chunk_size
+            self._compression = compression
+            self._num_cases = 0
+            self._capacity = 0
+
+            cases = self.out.create_group('cases')
+            cases.attrs['num_cases'] = 0
+            self._datasets = []
+            self._case_meta = [
+                self._create_dataset(cases, 'coord', (), _str_dtype),
+                self._create_dataset(cases, 'timestamp', (), float),
+                self._create_dataset(cases, 'success', (), np.int8),
+                self._create_dataset(cases, 'msg', (), _str_dtype),
+                self._create_dataset(cases, 'delta_ref', (), _str_dtype),
+            ]
+            self._vars = {}
+
     def record_metadata(self, group):
         """Stores the metadata of the given group in a HDF5 file using
         the variable name for the key.
@@ -122,12 +182,18 @@ class HDF5Recorder(BaseRecorder):
         iteration_coordinate = metadata['coord']
         group_name = format_iteration_coordinate(iteration_coordinate)
 
+        if self.layout == 'chunked':
+            self._append_case(group_name, params, unknowns, resids, metadata)
+            return
+
         f = self.out
 
         group = f.require_group(group_name)
         group.attrs['timestamp'] = metadata['timestamp']
         group.attrs['success'] = metadata['success']
         group.attrs['msg'] = metadata['msg']
+        if 'delta_ref' in metadata:
+            group.attrs['delta_ref'] = metadata['delta_ref']
 
         pairings = []
 
@@ -172,7 +238,10 @@ class HDF5Recorder(BaseRecorder):
         group_name = format_iteration_coordinate(iteration_coordinate)
 
         # get the group for the iteration
-        iteration_group = self.out[group_name]
+        if self.layout == 'chunked':
+            iteration_group = self.out.require_group('derivs').require_group(group_name)
+        else:
+            iteration_group = self.out[group_name]
 
         # Create a group under that called 'deriv'
         deriv_group = iteration_group.require_group('Derivs')
@@ -195,3 +264,91 @@ class HDF5Recorder(BaseRecorder):
                     g.create_dataset(k2,data=v2)
         else:
             raise ValueError("Currently can only record derivatives that are ndarrays or OrderedDicts")
+
+    def _create_dataset(self, group, name, shape, dtype):
+        """Creates a resizable dataset whose first axis is the case index
+        (chunked layout).
+        """
+        shape = tuple(shape)
+        if dtype is float:
+            fillvalue = np.nan
+        else:
+            fillvalue = None
+        dset = group.create_dataset(name, shape=(self._capacity,) + shape,
+                                    maxshape=(None,) + shape,
+                                    chunks=(self._chunk_size,) + shape,
+                                    dtype=dtype, fillvalue=fillvalue,
+                                    compression=self._compression)
+        self._datasets.append(dset)
+        return dset
+
+    def _append_case(self, coord, params, unknowns, resids, metadata):
+        """Writes one case to the next slot along the case axis of each
+        dataset (chunked layout).
+        """
+        i = self._num_cases
+
+        if i == self._capacity:
+            # grow one chunk at a time
+            self._capacity += self._chunk_size
+            for dset in self._datasets:
+                dset.resize(self._capacity, axis=0)
+
+        for dset, val in zip(self._case_meta, (coord, metadata['timestamp'],
+                                               metadata['success'],
+                                               metadata['msg'],
+                                               metadata.get('delta_ref', ''))):
+            dset[i] = val
+
+        cases = self.out['cases']
+        for (key, label, _, opt), vec in zip(_vec_labels, (params, unknowns, resids)):
+            if not self.options[opt]:
+                continue
+
+            filtered = self._filter_vector(vec, key, metadata['coord'])
+            for name, val in iteritems(filtered):
+                dset = self._vars.get((key, name))
+                if dset is None:
+                    if not isinstance(val, (np.ndarray, Number)):
+                        # TODO: Handling non-numeric data
+                        msg = "HDF5 Recorder does not support data of type '{0}'".format(type(val))
+                        raise NotImplementedError(msg)
+                    grp = cases.require_group(label)
+                    dset = self._create_dataset(grp, name, np.shape(val), float)
+                    self._vars[(key, name)] = dset
+                dset[i] = val
+
+            if self.options['record_vectors']:
+                flat = self._flat_vector(vec, key, metadata['coord'])
+                if flat is not None:
+                    pathname, val, vmap = flat
+                    dset = self._vars.get(('vec', key, pathname))
+                    if dset is None:
+                        dset = self._add_vector_dataset(key, label, pathname, vmap)
+                    dset[i] = val
+
+        self._num_cases = i + 1
+        cases.attrs['num_cases'] = self._num_cases
+
+    def _add_vector_dataset(self, key, label, pathname, vmap):
+        """Creates the dataset for the flat array of a vector (chunked
+        layout).
+        """
+        grp = self.out['cases'].require_group('vectors')
+        dset = self._create_dataset(grp, '%svec%d' % (key, len(self._vars)),
+                                    (vmap.size,), float)
+        dset.attrs['vector'] = label
+        dset.attrs['pathname'] = pathname
+        dset.attrs['map'] = json.dumps(vmap.map)
+        self._vars[('vec', key, pathname)] = dset
+        return dset
+
+    def close(self):
+        """Trims the datasets of the chunked layout to the number of
+        recorded cases, then closes `out`.
+        """
+        if self.out is not None and self.layout == 'chunked':
+            for dset in self._datasets:
+                dset.resize(self._num_cases, axis=0)
+
+        super(HDF5Recorder, self).close()
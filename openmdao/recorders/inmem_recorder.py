@@ -5,18 +5,134 @@ and using it for real problems could use up large amounts of memory.
 """
 
 import sys
+from copy import deepcopy
 
 from six import string_types, iteritems
+from six.moves import range
+
+import numpy as np
 
 from openmdao.core.mpi_wrap import MPI
-from openmdao.recorders.base_recorder import BaseRecorder
+from openmdao.recorders.base_recorder import BaseRecorder, _vec_labels
 from openmdao.util.record_util import format_iteration_coordinate
 
+class _Column(object):
+    """
+    Preallocated storage for the values of one variable. Float values of a
+    fixed shape are kept in an array whose first axis is the row; anything
+    else is kept in an object array.
+
+    Args
+    ----
+    val : object
+        The first value that will be stored.
+
+    capacity : int
+        Initial number of rows.
+    """
+
+    def __init__(self, val, capacity):
+        if isinstance(val, (float, np.floating, np.ndarray)) and \
+                np.asarray(val).dtype.kind == 'f':
+            self.shape = np.shape(val)
+            self.data = np.full((capacity,) + self.shape, np.nan)
+        else:
+            self.shape = None
+            self.data = np.empty(capacity, dtype=object)
+        self.present = np.zeros(capacity, dtype=bool)
+
+    def _to_objects(self):
+        """ Switches to object storage, e.g., when the shape changes. """
+        data = np.empty(self.data.shape[0], dtype=object)
+        for i in np.nonzero(self.present)[0]:
+            data[i] = self.get(i)
+        self.data = data
+        self.shape = None
+
+    def grow(self, capacity):
+        """ Enlarges the column to `capacity` rows. """
+        n = self.data.shape[0]
+        if self.shape is None:
+            data = np.empty(capacity, dtype=object)
+        else:
+            data = np.full((capacity,) + self.shape, np.nan)
+        data[:n] = self.data
+        self.data = data
+        present = np.zeros(capacity, dtype=bool)
+        present[:n] = self.present
+        self.present = present
+
+    def set(self, row, val):
+        """ Copies `val` into the given row. """
+        if self.shape is not None and (np.shape(val) != self.shape or
+                                       np.asarray(val).dtype.kind != 'f'):
+            self._to_objects()
+        if self.shape is None:
+            self.data[row] = deepcopy(val)
+        else:
+            self.data[row] = val
+        self.present[row] = True
+
+    def clear(self, row):
+        """ Marks the given row as not recorded. """
+        self.data[row] = np.nan if self.shape is not None else None
+        self.present[row] = False
+
+    def get(self, row):
+        """ Returns a copy of the value in the given row. """
+        val = self.data[row]
+        if self.shape is None:
+            return deepcopy(val)
+        if self.shape:
+            return val.copy()
+        return val
+
+
+class _CaseList(object):
+    """
+    Read-only sequence of the cases held by an `InMemoryRecorder`. Each case
+    is a dict that is built when it's accessed.
+    """
+
+    def __init__(self, recorder):
+        self._rec = recorder
+
+    def __len__(self):
+        return self._rec._num_cases()
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [self._rec._get_case(j) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("list index out of range")
+        return self._rec._get_case(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._rec._get_case(i)
+
+
 class InMemoryRecorder(BaseRecorder):
     """ Recorder that saves cases in memory. Note, this may take up large
     amounts of memory, so it is not recommended for large models or models
     with lots of iterations.
 
+    Values are copied into preallocated arrays, one per variable, whose
+    first axis is the case index and which grow as needed. The history of
+    one variable can be pulled out with `get_var`, and `iters` provides a
+    list-like view of the cases as dicts. If `max_cases` is given, only the
+    most recent `max_cases` cases are kept, which is useful for monitoring
+    long runs.
+
+    Args
+    ----
+    max_cases : int, optional
+        If given, the storage becomes a ring buffer that holds at most this
+        many cases, overwriting the oldest ones.
+
     Options
     -------
     options['record_metadata'] :  bool(True)
@@ -35,22 +151,88 @@ class InMemoryRecorder(BaseRecorder):
         Patterns for variables to exclude in recording (processed after includes).
     """
 
-    def __init__(self):
+    def __init__(self, max_cases=None):
         super(InMemoryRecorder, self).__init__()
         self._parallel = True
 
-        self.iters = []
-        self.deriv_iters = []
-        self.meta = {}
+        if max_cases is not None and max_cases < 1:
+            raise ValueError("max_cases must be at least 1, not %d." % max_cases)
+        self.max_cases = max_cases
+
+        self.iters = _CaseList(self)
+        self.reset()
 
     def reset(self):
         """
         Clear out old data.
         """
-        self.iters = []
         self.deriv_iters = []
         self.meta = {}
 
+        self._capacity = 16 if self.max_cases is None else min(16, self.max_cases)
+        self._count = 0  # total number of cases recorded, including overwritten ones
+        self._cols = {'params': {}, 'unknowns': {}, 'resids': {}}
+        self._timestamps = np.zeros(self._capacity)
+        self._success = np.zeros(self._capacity, dtype=np.int8)
+        self._coords = np.empty(self._capacity, dtype=object)
+        self._msgs = np.empty(self._capacity, dtype=object)
+        self._delta_refs = np.empty(self._capacity, dtype=object)
+        # which of params, unknowns and resids were recorded for each case
+        self._recorded = np.zeros((self._capacity, 3), dtype=bool)
+
+    def _grow(self):
+        """ Doubles the storage, up to `max_cases` rows. """
+        capacity = self._capacity * 2
+        if self.max_cases is not None:
+            capacity = min(capacity, self.max_cases)
+
+        n = self._capacity
+        for name in ('_timestamps', '_success', '_coords', '_msgs',
+                     '_delta_refs', '_recorded'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype) \
+                    if old.dtype != object else np.empty(capacity, dtype=object)
+            new[:n] = old
+            setattr(self, name, new)
+
+        for cols in self._cols.values():
+            for col in cols.values():
+                col.grow(capacity)
+
+        self._capacity = capacity
+
+    def _num_cases(self):
+        if self.max_cases is None:
+            return self._count
+        return min(self._count, self.max_cases)
+
+    def _rows(self):
+        """ Returns the storage rows of the held cases, oldest first. """
+        n = self._num_cases()
+        start = self._count - n
+        return (np.arange(start, self._count) % self._capacity) \
+                if self._count > self._capacity else np.arange(n)
+
+    def _get_case(self, i):
+        """ Builds the dict for the i-th held case. """
+        row = (self._count - self._num_cases() + i) % self._capacity
+
+        data = {
+            'timestamp': self._timestamps[row],
+            'iter': self._coords[row],
+            'success': int(self._success[row]),
+            'msg': self._msgs[row],
+        }
+        if self._delta_refs[row] is not None:
+            data['delta_ref'] = self._delta_refs[row]
+
+        for k, (_, _, vkey, _) in enumerate(_vec_labels):
+            if self._recorded[row, k]:
+                data[vkey] = {n: col.get(row) for n, col in
+                              iteritems(self._cols[vkey]) if col.present[row]}
+
+        return data
+
     def record_iteration(self, params, unknowns, resids, metadata):
         """Record the given run data in memory.
 
@@ -68,31 +250,80 @@ class InMemoryRecorder(BaseRecorder):
         metadata : dict
             Dictionary containing execution metadata (e.g. iteration coordinate).
         """
+        if self._count >= self._capacity and \
+                (self.max_cases is None or self._capacity < self.max_cases):
+            self._grow()
 
-        data = {}
+        row = self._count % self._capacity
         iteration_coordinate = metadata['coord']
 
-        data['timestamp'] = metadata['timestamp']
-        data['iter'] = format_iteration_coordinate(iteration_coordinate)
-        data['success'] = metadata['success']
-        data['msg'] = metadata['msg']
+        self._timestamps[row] = metadata['timestamp']
+        self._coords[row] = format_iteration_coordinate(iteration_coordinate)
+        self._success[row] = metadata['success']
+        self._msgs[row] = metadata['msg']
+        self._delta_refs[row] = metadata.get('delta_ref')
+
+        for k, ((key, _, vkey, opt), vec) in enumerate(zip(_vec_labels,
+                                                           (params, unknowns, resids))):
+            cols = self._cols[vkey]
+            self._recorded[row, k] = recorded = self.options[opt]
+
+            written = set()
+            if recorded:
+                for name, val in iteritems(self._filter_vector(vec, key,
+                                                               iteration_coordinate)):
+                    col = cols.get(name)
+                    if col is None:
+                        col = cols[name] = _Column(val, self._capacity)
+                    col.set(row, val)
+                    written.add(name)
+
+            # rows are reused, so clear anything left from an earlier case
+            for name, col in iteritems(cols):
+                if name not in written and col.present[row]:
+                    col.clear(row)
+
+        self._count += 1
 
-        if self.options['record_params']:
-            data['params'] = {p:v for p,v in
-                                 iteritems(self._filter_vector(params,'p',
-                                                        iteration_coordinate))}
+    def get_var(self, name, vector='unknowns'):
+        """
+        Returns the history of one variable.
+
+        Args
+        ----
+        name : str
+            Name of the variable.
+
+        vector : str, optional
+            One of 'unknowns' (the default), 'params' or 'resids'.
 
-        if self.options['record_unknowns']:
-            data['unknowns'] = {u:v for u,v in
-                                  iteritems(self._filter_vector(unknowns,'u',
-                                                        iteration_coordinate))}
+        Returns
+        -------
+        ndarray or list
+            For float variables, an array whose first axis is the case index,
+            with NaN for cases where the variable wasn't recorded. Unless the
+            ring buffer has wrapped around, this is a view of the storage, so
+            it should not be modified. For other variables, a list with None
+            for cases where the variable wasn't recorded.
+        """
+        try:
+            col = self._cols[vector][name]
+        except KeyError:
+            if vector not in self._cols:
+                raise ValueError("vector must be one of 'params', 'unknowns' or "
+                                 "'resids', not '%s'." % vector)
+            raise KeyError("Variable '%s' was not recorded in %s." % (name, vector))
 
-        if self.options['record_resids']:
-            data['resids'] = {r:v for r,v in
-                                  iteritems(self._filter_vector(resids,'r',
-                                                         iteration_coordinate))}
+        n = self._num_cases()
+        if self._count > self._capacity:
+            vals = col.data[self._rows()]
+        else:
+            vals = col.data[:n]
 
-        self.iters.append(data)
+        if col.shape is None:
+            return [v if p else None for v, p in
+                    zip(vals, col.present[self._rows()])]
+        return vals
 
     def record_metadata(self, group):
         """Save the metadata of the given group.
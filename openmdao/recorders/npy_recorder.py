@@ -0,0 +1,367 @@
+"""
+Class definition for NpyRecorder, a recorder that writes each recorded
+variable to its own append-only .npy file.
+"""
+
+import os
+import json
+import pickle
+import struct
+from numbers import Number
+
+from six import iteritems
+
+import numpy as np
+
+from openmdao.recorders.base_recorder import BaseRecorder, _vec_labels
+from openmdao.util.record_util import format_iteration_coordinate
+
+format_version = 4
+
+# total size in bytes of the .npy header we write. It's reserved up front so
+# the shape can be rewritten in place as cases are appended.
+_HEADER_SIZE = 128
+
+
+class _NpyColumn(object):
+    """
+    An append-only .npy file whose first axis is the case index. Appended
+    values are kept in memory until `flush`, which opens the file, writes
+    them at its end, updates the header and closes it again, so a recorder
+    can have a column for every variable without running out of file
+    handles.
+
+    Args
+    ----
+    fname : str
+        Name of the .npy file.
+
+    shape : tuple
+        Shape of the value stored for each case.
+
+    dtype : str
+        Numpy dtype string of the stored values.
+
+    num_filled : int, optional
+        Number of cases to fill with NaN (or zero, for non float columns)
+        when the file is created.
+    """
+
+    def __init__(self, fname, shape, dtype, num_filled=0):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.count = num_filled
+        self._fname = fname
+        self._pending = []
+        self._fill = np.full(self.shape, np.nan, dtype=self.dtype) \
+                        if self.dtype.kind == 'f' else np.zeros(self.shape, dtype=self.dtype)
+
+        with open(fname, 'wb') as f:
+            self._write_header(f)
+            f.seek(_HEADER_SIZE)
+            fill = self._fill.tobytes()
+            for i in range(num_filled):
+                f.write(fill)
+
+    def _write_header(self, f):
+        """Writes the .npy (version 1.0) header for the current number of
+        cases at the start of the file.
+        """
+        header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % \
+                 (self.dtype.str, (self.count,) + self.shape)
+        hlen = _HEADER_SIZE - 10
+        if len(header) >= hlen:
+            raise RuntimeError("Shape %s is too large for the .npy header." %
+                               (self.shape,))
+        header = header.ljust(hlen - 1) + '\n'
+
+        f.seek(0)
+        f.write(b'\x93NUMPY\x01\x00')
+        f.write(struct.pack('<H', hlen))
+        f.write(header.encode('latin1'))
+
+    def append(self, val=None):
+        """Adds the value for the next case. If `val` is None, the case is
+        filled with NaN.
+        """
+        if val is None:
+            val = self._fill
+        self._pending.append(np.asarray(val, dtype=self.dtype).tobytes())
+        self.count += 1
+
+    def flush(self):
+        """Writes the pending values to the file and updates its header."""
+        with open(self._fname, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            for data in self._pending:
+                f.write(data)
+            self._pending = []
+            self._write_header(f)
+
+
+class NpyRecorder(BaseRecorder):
+    """
+    Recorder that saves each recorded variable as a column in its own .npy
+    file, so that the results can be loaded with
+    ``numpy.load(fname, mmap_mode='r')`` without any parsing.
+
+    All files are written to the directory `out`. The first axis of every
+    column is the case index. 'timestamp.npy' and 'success.npy' hold the
+    timestamp and success flag of each case, and 'coord.txt' holds one
+    iteration coordinate per line. When recording deltas, 'delta_ref.npy'
+    holds the index of the snapshot each delta case refers to, or -1. The
+    'index.json' file maps each recorded variable to its file and shape,
+    and stores the number of cases and the error messages of failed cases.
+    A variable that wasn't recorded for a given case is filled with NaN.
+    Metadata and derivatives are pickled into 'metadata.pkl' and
+    'derivs.pkl'.
+
+    With the 'record_vectors' option, each recorded vector is stored as one
+    2D column instead, and 'index.json' holds the start, end and shape of
+    each variable along its second axis.
+
+    Args
+    ----
+    out : str
+        Name of the directory to write to. It will be created if it doesn't
+        exist.
+
+    flush_interval : int, optional
+        The headers and index are updated every `flush_interval` cases so
+        that the files can be read while the run is still going. Defaults
+        to 100.
+
+    Options
+    -------
+    options['record_metadata'] :  bool(True)
+        Tells recorder whether to record variable attribute metadata.
+    options['record_unknowns'] :  bool(True)
+        Tells recorder whether to record the unknowns vector.
+    options['record_params'] :  bool(False)
+        Tells recorder whether to record the params vector.
+    options['record_resids'] :  bool(False)
+        Tells recorder whether to record the ressiduals vector.
+    options['record_derivs'] :  bool(True)
+        Tells recorder whether to record derivatives that are requested by a `Driver`.
+    options['includes'] :  list of strings
+        Patterns for variables to include in recording.
+    options['excludes'] :  list of strings
+        Patterns for variables to exclude in recording (processed after includes).
+    options['record_vectors'] :  bool(False)
+        Tells recorder whether to record each vector as a single flat array.
+    """
+
+    def __init__(self, out, flush_interval=100):
+        super(NpyRecorder, self).__init__()
+        self._supports_vectors = True
+
+        if not os.path.isdir(out):
+            os.makedirs(out)
+
+        self.dirname = out
+        self._flush_interval = flush_interval
+        self._num_cases = 0
+        # (vec key, var name) or ('vec', vec key, pathname) -> _NpyColumn
+        self._columns = {}
+        self._index = {
+            'format_version': format_version,
+            'num_cases': 0,
+            'cases': {
+                'coord': 'coord.txt',
+                'timestamp': 'timestamp.npy',
+                'success': 'success.npy',
+                'delta_ref': 'delta_ref.npy',
+            },
+            'variables': {label: {} for _, label, _, _ in _vec_labels},
+            'vectors': {label: {} for _, label, _, _ in _vec_labels},
+            'msgs': {},
+        }
+
+        self._timestamps = _NpyColumn(self._path('timestamp.npy'), (), 'f8')
+        self._success = _NpyColumn(self._path('success.npy'), (), 'i1')
+        self._delta_refs = _NpyColumn(self._path('delta_ref.npy'), (), 'i8')
+        self._snapshots = {}  # coord of each delta snapshot -> case index
+        self.out = open(self._path('coord.txt'), 'w')
+        self._derivs = None
+
+        self._write_index()
+
+    def _path(self, fname):
+        return os.path.join(self.dirname, fname)
+
+    def record_metadata(self, group):
+        """Pickles the metadata of the given group.
+
+        Args
+        ----
+        group : `System`
+            `System` containing vectors
+        """
+        meta = {
+            'Parameters': dict(group.params.iteritems()),
+            'Unknowns': dict(group.unknowns.iteritems()),
+            'system_metadata': group.metadata,
+        }
+        with open(self._path('metadata.pkl'), 'wb') as f:
+            pickle.dump(meta, f, pickle.HIGHEST_PROTOCOL)
+
+    def record_iteration(self, params, unknowns, resids, metadata):
+        """Appends the given run data to the column files.
+
+        Args
+        ----
+        params : `VecWrapper`
+            `VecWrapper` containing parameters. (p)
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states. (u)
+
+        resids : `VecWrapper`
+            `VecWrapper` containing residuals. (r)
+
+        metadata : dict
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+        """
+        if self.out is None:
+            return
+
+        iteration_coordinate = metadata['coord']
+        written = set()
+
+        for (key, label, _, opt), vec in zip(_vec_labels, (params, unknowns, resids)):
+            if not self.options[opt]:
+                continue
+
+            filtered = self._filter_vector(vec, key, iteration_coordinate)
+            for name, val in iteritems(filtered):
+                col = self._columns.get((key, name))
+                if col is None:
+                    col = self._add_column(key, label, name, val)
+                col.append(val)
+                written.add(col)
+
+            if self.options['record_vectors']:
+                flat = self._flat_vector(vec, key, iteration_coordinate)
+                if flat is not None:
+                    pathname, val, vmap = flat
+                    col = self._columns.get(('vec', key, pathname))
+                    if col is None:
+                        col = self._add_vector_column(key, label, pathname, vmap)
+                    col.append(val)
+                    written.add(col)
+
+        # keep all columns the same length
+        for col in self._columns.values():
+            if col not in written:
+                col.append()
+
+        coord = format_iteration_coordinate(iteration_coordinate)
+        self.out.write(coord)
+        self.out.write('\n')
+        self._timestamps.append(metadata['timestamp'])
+        self._success.append(metadata['success'])
+        if not metadata['success']:
+            self._index['msgs'][str(self._num_cases)] = metadata['msg']
+        if 'delta_ref' in metadata:
+            self._delta_refs.append(self._snapshots[metadata['delta_ref']])
+        else:
+            self._delta_refs.append(-1)
+            if self.options['record_delta']:
+                self._snapshots[coord] = self._num_cases
+
+        self._num_cases += 1
+        if self._num_cases % self._flush_interval == 0:
+            self._flush()
+
+    def _add_column(self, key, label, name, val):
+        """Creates the column file for a newly recorded variable and fills
+        it with NaN for all previous cases.
+        """
+        if not isinstance(val, (np.ndarray, Number)) or \
+               np.asarray(val).dtype.kind not in 'biuf':
+            msg = "NpyRecorder does not support data of type '{0}'".format(type(val))
+            raise NotImplementedError(msg)
+
+        fname = '%s%d.npy' % (key, len(self._columns))
+        col = _NpyColumn(self._path(fname), np.shape(val), 'f8',
+                         self._num_cases)
+
+        self._columns[(key, name)] = col
+        self._index['variables'][label][name] = {
+            'file': fname,
+            'shape': list(col.shape),
+        }
+        return col
+
+    def _add_vector_column(self, key, label, pathname, vmap):
+        """Creates the column file for the flat array of a vector and fills
+        it with NaN for all previous cases.
+        """
+        fname = '%svec%d.npy' % (key, len(self._columns))
+        col = _NpyColumn(self._path(fname), (vmap.size,), 'f8',
+                         self._num_cases)
+
+        self._columns[('vec', key, pathname)] = col
+        self._index['vectors'][label][pathname] = {
+            'file': fname,
+            'map': {name: [start, end, list(shape)] for name, (start, end, shape)
+                    in iteritems(vmap.map)},
+        }
+        return col
+
+    def record_derivatives(self, derivs, metadata):
+        """Appends the derivatives that were calculated for the driver to
+        the pickle file.
+
+        Args
+        ----
+        derivs : dict or ndarray
+            Dictionary containing derivatives
+
+        metadata : dict, optional
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+        """
+        if self.out is None:
+            return
+
+        if self._derivs is None:
+            self._derivs = open(self._path('derivs.pkl'), 'wb')
+
+        data = {
+            'coord': format_iteration_coordinate(metadata['coord']),
+            'timestamp': metadata['timestamp'],
+            'success': metadata['success'],
+            'msg': metadata['msg'],
+            'Derivatives': derivs,
+        }
+        pickle.dump(data, self._derivs, pickle.HIGHEST_PROTOCOL)
+
+    def _write_index(self):
+        self._index['num_cases'] = self._num_cases
+        with open(self._path('index.json'), 'w') as f:
+            json.dump(self._index, f, indent=1)
+
+    def _flush(self):
+        """Makes everything recorded so far readable."""
+        for col in self._columns.values():
+            col.flush()
+        self._timestamps.flush()
+        self._success.flush()
+        self._delta_refs.flush()
+        self.out.flush()
+        if self._derivs is not None:
+            self._derivs.flush()
+        self._write_index()
+
+    def close(self):
+        """Updates the index and closes all files."""
+        if self.out is None:
+            return
+
+        self._flush()
+
+        if self._derivs is not None:
+            self._derivs.close()
+            self._derivs = None
+
+        super(NpyRecorder, self).close()
@@ -5,17 +5,118 @@ import os
 import itertools
 import time
 import traceback
+import threading
+from contextlib import contextmanager
+from copy import deepcopy
 
-from six import iteritems
+from six import iteritems, reraise
+from six.moves import queue
+
+import numpy as np
 
 from openmdao.core.mpi_wrap import MPI, debug
+from openmdao.util.options import OptionsDictionary
 
 trace = os.environ.get('OPENMDAO_TRACE')
 
+# put on the queue to tell the writer thread to exit
+_STOP = object()
+
+
+class _SnapshotBuffer(object):
+    """
+    A preallocated ring of flat float arrays used to snapshot the recorded
+    values of a System so that they can be handed off to the writer thread.
+
+    Args
+    ----
+    root : `System`
+        System whose params, unknowns and resids will be snapshotted.
+
+    names : dict
+        Dict with keys 'pnames', 'unames' and 'rnames' containing the names
+        of the variables to snapshot from each vector.
+
+    nrows : int
+        Number of snapshots that can be alive at once.
+    """
+
+    def __init__(self, root, names, nrows):
+        self._layout = []
+        size = 0
+        for vec, key in ((root.params, 'pnames'),
+                         (root.unknowns, 'unames'),
+                         (root.resids, 'rnames')):
+            entries = []
+            for name in sorted(names[key]):
+                acc = vec._dat[name]
+                if acc.pbo:
+                    # pass_by_obj values can't live in a float array
+                    entries.append((name, None, None, None))
+                else:
+                    shape = acc.meta['shape']
+                    end = size + acc.meta['size']
+                    entries.append((name, size, end, shape))
+                    size = end
+            self._layout.append(entries)
+
+        self._rows = np.empty((nrows, size))
+        self._next = 0
+
+    def snapshot(self, params, unknowns, resids):
+        """
+        Copy the values of all snapshotted variables into the next free row.
+
+        Returns
+        -------
+        tuple
+            (params, unknowns, resids) dicts whose array values are views
+            into the buffer row.
+        """
+        row = self._rows[self._next]
+        self._next = (self._next + 1) % self._rows.shape[0]
+
+        dcts = []
+        for vec, entries in zip((params, unknowns, resids), self._layout):
+            dct = {}
+            for name, start, end, shape in entries:
+                val = vec[name]
+                if start is None:
+                    dct[name] = deepcopy(val)
+                elif shape == 1:
+                    row[start] = val
+                    dct[name] = row[start]
+                else:
+                    view = row[start:end]
+                    view[:] = np.asarray(val).flat
+                    dct[name] = view.reshape(shape)
+            dcts.append(dct)
+
+        return tuple(dcts)
+
+
 class RecordingManager(object):
-    """ Object that routes function calls to all attached recorders. """
+    """ Object that routes function calls to all attached recorders.
+
+    Options
+    -------
+    options['record_async'] :  bool(False)
+        If True, values are snapshotted and handed to a background thread that
+        calls the recorders, so that writing doesn't block the solver or driver.
+    options['queue_size'] :  int(100)
+        Maximum number of snapshots waiting to be written before recording
+        blocks.
+    """
 
     def __init__(self):
+        self.options = OptionsDictionary()
+        self.options.add_option('record_async', False,
+                                desc='Set to True to call recorders from a '
+                                'background writer thread')
+        self.options.add_option('queue_size', 100, lower=1,
+                                desc='Maximum number of cases waiting to be '
+                                'written in asynchronous mode')
+
         self._vars_to_record = {
             'pnames': set(),
             'unames': set(),
@@ -23,9 +124,16 @@ class RecordingManager(object):
             }
 
         self._recorders = []
+        self._enabled = True  # see recording_disabled
         self._has_serial_recorders = False
         self._casecomm = None  # comm used to gather parallel DOE cases
 
+        # asynchronous recording support
+        self._buffer = None
+        self._queue = None
+        self._writer = None
+        self._async_error = None
+
         if MPI:
             self.rank = MPI.COMM_WORLD.rank
         else:
@@ -79,6 +187,9 @@ class RecordingManager(object):
 
         self._record_p = self._record_u = self._record_r = False
 
+        # serial recorders get the values gathered from all ranks
+        gathered = {'pnames': set(), 'unames': set(), 'rnames': set()}
+
         for recorder in self._recorders:
             recorder.startup(root)
 
@@ -96,6 +207,11 @@ class RecordingManager(object):
             if rnames:
                 self._record_r = True
 
+            if not recorder._parallel:
+                gathered['pnames'].update(pnames)
+                gathered['unames'].update(unames)
+                gathered['rnames'].update(rnames)
+
             # now localize the lists to only
             # include local vars.  We need to do this after determining
             # if any mpi procs need to record each of params, unknowns,
@@ -117,10 +233,88 @@ class RecordingManager(object):
             self._vars_to_record['unames'].update(unames)
             self._vars_to_record['rnames'].update(rnames)
 
+        if self.options['record_async'] and self._recorders:
+            self._stop_writer()
+            # The queue holds at most queue_size snapshots and the writer
+            # works on one more, so one extra row is always free to fill.
+            names = self._vars_to_record
+            if MPI and self._has_serial_recorders:
+                names = gathered
+                for key in names:
+                    names[key].update(self._vars_to_record[key])
+            self._buffer = _SnapshotBuffer(root, names,
+                                           self.options['queue_size'] + 2)
+
+    def _start_writer(self):
+        """ Start the background thread that feeds the recorders. """
+        self._queue = queue.Queue(maxsize=self.options['queue_size'])
+        self._writer = threading.Thread(target=self._write_loop)
+        self._writer.daemon = True
+        self._writer.start()
+
+    def _write_loop(self):
+        """ Pull tasks off of the queue and pass them to the recorders
+        until told to stop.
+        """
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                if self._async_error is None:
+                    func, args = task
+                    func(*args)
+            except Exception:
+                # save the error so it can be raised in the main thread
+                self._async_error = sys.exc_info()
+            finally:
+                self._queue.task_done()
+
+    def _submit(self, func, *args):
+        """ Run `func` now, or hand it to the writer thread if recording
+        asynchronously. Blocks if the queue is full.
+        """
+        self._check_async_error()
+        if self._buffer is None:
+            func(*args)
+        else:
+            if self._writer is None:
+                self._start_writer()
+            self._queue.put((func, args))
+
+    def flush(self):
+        """ Wait until all queued cases have been passed to the recorders.
+        Does nothing unless recording asynchronously.
+        """
+        if self._writer is not None:
+            self._queue.join()
+        self._check_async_error()
+
+    def _stop_writer(self):
+        """ Wait for all queued cases to be written, then stop the
+        writer thread.
+        """
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+        self._check_async_error()
+
+    def _check_async_error(self):
+        """ Raise any error that occurred in the writer thread. """
+        if self._async_error is not None:
+            exc_info, self._async_error = self._async_error, None
+            reraise(*exc_info)
+
     def close(self):
-        """ Close all recorders. """
-        for recorder in self._recorders:
-            recorder.close()
+        """ Write any queued cases, then close all recorders. """
+        try:
+            self._stop_writer()
+        finally:
+            self._buffer = None
+            for recorder in self._recorders:
+                recorder.close()
 
     def record_metadata(self, root):
         """ Record metadata for all variables of interest.
@@ -130,6 +324,12 @@ class RecordingManager(object):
         root : `System`
            System containing variables.
         """
+        if not self._enabled:
+            return
+
+        # recorders may not be thread safe, so don't call them while the
+        # writer thread is
+        self.flush()
 
         for recorder in self._recorders:
             # If the recorder does not support parallel recording
@@ -151,13 +351,32 @@ class RecordingManager(object):
 
     def record_completed_case(self, root, case):
         """Record the variables in the given case."""
-        if not self._recorders:
+        if not self._recorders or not self._enabled:
             return
 
         case['meta']['timestamp'] = time.time()
 
-        for recorder in self._recorders:
-            recorder.record_iteration(case['p'], case['u'], case['r'], case['meta'])
+        if self._buffer is not None:
+            # the caller may reuse the case dicts
+            case = deepcopy(case)
+
+        self._submit(self._record_cases,
+                     [(case['p'], case['u'], case['r'], case['meta'])], True)
+
+    def _record_cases(self, cases, all_ranks=False):
+        """ Pass each of the given cases to the recorders."""
+        # If the recorder does not support parallel recording
+        # we need to make sure we only record on rank 0.
+        for params, unknowns, resids, meta in cases:
+            if params is None: # dummy cases have None in place of params, etc.
+                continue
+            for recorder in self._recorders:
+                if all_ranks or recorder._parallel or MPI is None or self.rank == 0:
+                    if recorder.options['record_delta']:
+                        recorder.record_iteration(params, unknowns, resids,
+                                                  recorder._start_delta(meta))
+                    else:
+                        recorder.record_iteration(params, unknowns, resids, meta)
 
     def record_iteration(self, root, metadata, dummy=False):
         """ Gathers variables for non-parallel case recorders and calls
@@ -175,7 +394,7 @@ class RecordingManager(object):
             If True, this is a dummy iteration, so no data will be colllected
             from the model, but collective gather call will still be made.
         """
-        if not self._recorders:
+        if not self._recorders or not self._enabled:
             return
 
         if metadata is not None:
@@ -219,17 +438,23 @@ class RecordingManager(object):
                     if cases is None:
                         cases = []
 
-        if cases is None:
+        if self._buffer is not None:
+            # the model will keep changing while the writer thread works, so
+            # hand it copies of the values and metadata.
+            if cases is None:
+                if params is None or unknowns is None or resids is None:
+                    # values were gathered to rank 0, so nothing to record
+                    return
+                params, unknowns, resids = self._buffer.snapshot(params,
+                                                                 unknowns,
+                                                                 resids)
+                cases = [(params, unknowns, resids, _copy_meta(metadata))]
+            else:
+                cases = deepcopy(cases)
+        elif cases is None:
             cases = [(params, unknowns, resids, metadata)]
 
-        # If the recorder does not support parallel recording
-        # we need to make sure we only record on rank 0.
-        for params, unknowns, resids, meta in cases:
-            if params is None: # dummy cases have None in place of params, etc.
-                continue
-            for recorder in self._recorders:
-                if recorder._parallel or MPI is None or self.rank == 0:
-                    recorder.record_iteration(params, unknowns, resids, meta)
+        self._submit(self._record_cases, cases)
 
     def record_derivatives(self, derivs, metadata):
         """" Records derivatives if requested.
@@ -241,12 +466,64 @@ class RecordingManager(object):
         metadata : dict
             Metadata for iteration coordinate
         """
+        if not self._enabled:
+            return
 
         metadata['timestamp'] = time.time()
 
+        if self._buffer is not None:
+            derivs = deepcopy(derivs)
+            metadata = _copy_meta(metadata)
+
+        self._submit(self._record_derivatives, derivs, metadata)
+
+    def _record_derivatives(self, derivs, metadata):
+        """ Pass the derivatives to the recorders."""
         # If the recorder does not support parallel recording
         # we need to make sure we only record on rank 0.
         for recorder in self._recorders:
             if recorder.options['record_derivs']:
                 if recorder._parallel or self.rank == 0:
                     recorder.record_derivatives(derivs, metadata)
+
+
+@contextmanager
+def recording_disabled(managers):
+    """
+    Context manager that turns off the given RecordingManagers, so nothing
+    is passed to their recorders until the block exits.
+
+    Args
+    ----
+    managers : iterable of `RecordingManager`
+        The managers to turn off.
+    """
+    managers = list(managers)
+    enabled = [manager._enabled for manager in managers]
+    for manager in managers:
+        manager._enabled = False
+    try:
+        yield
+    finally:
+        for manager, was_enabled in zip(managers, enabled):
+            manager._enabled = was_enabled
+
+
+def _solver_managers(group):
+    """ Yields the RecordingManagers of the solvers of `group` and of all
+    the Groups below it.
+    """
+    for grp in group.subgroups(recurse=True, include_self=True):
+        yield grp.nl_solver.recorders
+        yield grp.ln_solver.recorders
+
+
+def _copy_meta(metadata):
+    """ Returns a copy of the given execution metadata that won't change
+    when the iteration coordinate is updated.
+    """
+    if metadata is None:
+        return None
+    meta = metadata.copy()
+    meta['coord'] = list(meta['coord'])
+    return meta
@@ -1,8 +1,18 @@
 """Class definition for SqliteRecorder, which provides dictionary backed by SQLite"""
 
+import os
+import json
+import pickle
+import sqlite3
 from collections import OrderedDict
+from numbers import Number
+
+from six import iteritems
+
+import numpy as np
+
 from sqlitedict import SqliteDict
-from openmdao.recorders.base_recorder import BaseRecorder
+from openmdao.recorders.base_recorder import BaseRecorder, _vec_labels
 from openmdao.util.record_util import format_iteration_coordinate
 
 from openmdao.devtools.partition_tree_n2 import get_model_viewer_data
@@ -12,13 +22,40 @@ from openmdao.core.mpi_wrap import MPI
 
 format_version = 4
 
+
 class SqliteRecorder(BaseRecorder):
     """ Recorder that saves cases in an SQLite dictionary.
 
+    With the default 'dict' layout, each case is pickled into a sqlitedict
+    table keyed by its iteration coordinate.  With the 'columnar' layout,
+    each case is one row of a 'cases' table, with the value of each recorded
+    variable stored as the raw float64 bytes of a BLOB column. The variable
+    name, shape and type for each column are stored in the 'variables'
+    table, and rows are committed in batches. With the 'record_vectors'
+    option, each recorded vector is stored in a single BLOB column, and the
+    start, end and shape of each variable within it are stored under
+    'vector_maps' in the metadata table.
+
+    SQLite allows at most 2000 columns in a table by default, so the
+    'columnar' layout can only record about that many variables. For larger
+    models, use the 'record_vectors' option, which needs one column per
+    vector, or the 'dict' layout.
+
     Args
     ----
+    out : str
+        Filename of the SQLite database.
+
+    layout : str, optional
+        Either 'dict' (the default) or 'columnar'.
+
+    batch_size : int, optional
+        Number of cases written between commits when using the 'columnar'
+        layout. Defaults to 100.
+
     sqlite_dict_args : dict
-        Dictionary lf any additional arguments for the SQL db.
+        Dictionary lf any additional arguments for the SQL db. Only used
+        by the 'dict' layout.
 
     Options
     -------
@@ -36,30 +73,71 @@ class SqliteRecorder(BaseRecorder):
         Patterns for variables to include in recording.
     options['excludes'] :  list of strings
         Patterns for variables to exclude in recording (processed after includes).
+    options['record_vectors'] :  bool(False)
+        Tells recorder whether to record each vector as a single flat array.
+        Only supported by the 'columnar' layout.
     """
 
-    def __init__(self, out, **sqlite_dict_args):
+    def __init__(self, out, layout='dict', batch_size=100, **sqlite_dict_args):
         super(SqliteRecorder, self).__init__()
 
+        if layout not in ('dict', 'columnar'):
+            raise ValueError("SqliteRecorder layout must be 'dict' or "
+                             "'columnar', not '%s'." % layout)
+
         self.model_viewer_data = None
+        self.layout = layout
+        self._supports_vectors = layout == 'columnar'
+
+        self._conn = None
+        self.out_metadata = None
+        self.out_iterations = None
+        self.out_derivs = None
 
         if MPI and MPI.COMM_WORLD.rank > 0 :
             self._open_close_sqlitedict = False
         else:
             self._open_close_sqlitedict = True
 
-        if self._open_close_sqlitedict:
+        if self._open_close_sqlitedict and layout == 'columnar':
+            self._batch_size = batch_size
+            self._uncommitted = 0
+            # (vec key, var name) or ('vec', vec key, pathname) -> column name
+            self._columns = {}
+            self._vector_maps = {}  # column name -> vector label, pathname and map
+            self._dtypes = {}   # column name -> 'float64' or 'pickle'
+            self._inserts = {}  # tuple of column names -> insert statement
+
+            if os.path.exists(out):
+                os.remove(out)
+
+            # with asynchronous recording, rows are written from the
+            # RecordingManager's writer thread, one call at a time
+            self._conn = conn = sqlite3.connect(out, check_same_thread=False)
+            conn.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, "
+                         "value BLOB)")
+            conn.execute("CREATE TABLE variables (col TEXT PRIMARY KEY, "
+                         "vector TEXT, name TEXT, shape TEXT, dtype TEXT)")
+            conn.execute("CREATE TABLE cases (id INTEGER PRIMARY KEY, "
+                         "coord TEXT, timestamp REAL, success INTEGER, "
+                         "msg TEXT, delta_ref TEXT)")
+            conn.execute("CREATE INDEX cases_coord ON cases(coord)")
+            conn.execute("CREATE INDEX cases_timestamp ON cases(timestamp)")
+            conn.execute("CREATE TABLE derivs (id INTEGER PRIMARY KEY, "
+                         "coord TEXT, timestamp REAL, success INTEGER, "
+                         "msg TEXT, derivs BLOB)")
+            conn.execute("CREATE INDEX derivs_coord ON derivs(coord)")
+            self._set_meta('format_version', format_version)
+            self._set_meta('layout', layout)
+            conn.commit()
+
+        elif self._open_close_sqlitedict:
             sqlite_dict_args.setdefault('autocommit', True)
             self.out_metadata = SqliteDict(filename=out, flag='n', tablename='metadata', **sqlite_dict_args)
             self.out_metadata['format_version'] = format_version
             self.out_iterations = SqliteDict(filename=out, flag='w', tablename='iterations', **sqlite_dict_args)
             self.out_derivs = SqliteDict(filename=out, flag='w', tablename='derivs', **sqlite_dict_args)
 
-        else:
-            self.out_metadata = None
-            self.out_iterations = None
-            self.out_derivs = None
-
     def startup(self, group):
         super(SqliteRecorder, self).startup(group)
 
@@ -86,6 +164,13 @@ class SqliteRecorder(BaseRecorder):
             params = group.params.iteritems()
             #resids = group.resids.iteritems()
             unknowns = group.unknowns.iteritems()
+            if self._conn is not None:
+                self._set_meta('Parameters', dict(params))
+                self._set_meta('Unknowns', dict(unknowns))
+                self._set_meta('system_metadata', group.metadata)
+                self._set_meta('model_viewer_data', self.model_viewer_data)
+                self._conn.commit()
+                return
             self.out_metadata['Parameters'] = dict(params)
             self.out_metadata['Unknowns'] = dict(unknowns)
             self.out_metadata['system_metadata'] = group.metadata
@@ -114,6 +199,10 @@ class SqliteRecorder(BaseRecorder):
         if MPI and MPI.COMM_WORLD.rank > 0 :
             raise RuntimeError("not rank 0")
 
+        if self._conn is not None:
+            self._insert_case(params, unknowns, resids, metadata)
+            return
+
         data = OrderedDict()
         iteration_coordinate = metadata['coord']
         timestamp = metadata['timestamp']
@@ -123,6 +212,8 @@ class SqliteRecorder(BaseRecorder):
         data['timestamp'] = timestamp
         data['success'] = metadata['success']
         data['msg'] = metadata['msg']
+        if 'delta_ref' in metadata:
+            data['delta_ref'] = metadata['delta_ref']
 
         if self.options['record_params']:
             data['Parameters'] = self._filter_vector(params, 'p', iteration_coordinate)
@@ -147,6 +238,15 @@ class SqliteRecorder(BaseRecorder):
             Dictionary containing execution metadata (e.g. iteration coordinate).
         """
 
+        if self._conn is not None:
+            self._conn.execute("INSERT INTO derivs (coord, timestamp, success, "
+                               "msg, derivs) VALUES (?, ?, ?, ?, ?)",
+                               (format_iteration_coordinate(metadata['coord']),
+                                metadata['timestamp'], metadata['success'],
+                                metadata['msg'], _pickle(derivs)))
+            self._record_done()
+            return
+
         data = OrderedDict()
         iteration_coordinate = metadata['coord']
         timestamp = metadata['timestamp']
@@ -160,9 +260,117 @@ class SqliteRecorder(BaseRecorder):
 
         self.out_derivs[group_name] = data
 
+    def _set_meta(self, key, value):
+        """Stores a pickled value in the metadata table (columnar layout)."""
+        self._conn.execute("INSERT OR REPLACE INTO metadata (key, value) "
+                           "VALUES (?, ?)", (key, _pickle(value)))
+
+    def _insert_case(self, params, unknowns, resids, metadata):
+        """Writes one row of the cases table (columnar layout)."""
+        iteration_coordinate = metadata['coord']
+
+        cols = ['coord', 'timestamp', 'success', 'msg', 'delta_ref']
+        row = [format_iteration_coordinate(iteration_coordinate),
+               metadata['timestamp'], metadata['success'], metadata['msg'],
+               metadata.get('delta_ref')]
+
+        for (key, label, _, opt), vec in zip(_vec_labels, (params, unknowns, resids)):
+            if not self.options[opt]:
+                continue
+            for name, val in iteritems(self._filter_vector(vec, key,
+                                                           iteration_coordinate)):
+                col = self._columns.get((key, name))
+                if col is None:
+                    col = self._add_column(key, label, name, val)
+
+                if self._dtypes[col] == 'float64':
+                    row.append(sqlite3.Binary(np.asarray(val, dtype=float).tobytes()))
+                else:
+                    row.append(_pickle(val))
+                cols.append(col)
+
+            if self.options['record_vectors']:
+                flat = self._flat_vector(vec, key, iteration_coordinate)
+                if flat is not None:
+                    pathname, val, vmap = flat
+                    col = self._columns.get(('vec', key, pathname))
+                    if col is None:
+                        col = self._add_vector_column(key, label, pathname, vmap)
+                    row.append(sqlite3.Binary(val.tobytes()))
+                    cols.append(col)
+
+        cols = tuple(cols)
+        sql = self._inserts.get(cols)
+        if sql is None:
+            sql = self._inserts[cols] = "INSERT INTO cases (%s) VALUES (%s)" % \
+                    (', '.join(cols), ', '.join(['?']*len(cols)))
+
+        self._conn.execute(sql, row)
+        self._record_done()
+
+    def _add_column(self, key, label, name, val):
+        """Adds a BLOB column to the cases table for the named variable."""
+        col = '%s%d' % (key, len(self._columns))
+
+        if isinstance(val, (Number, np.ndarray)) and \
+                np.asarray(val).dtype.kind in 'biuf':
+            dtype = 'float64'
+            shape = list(np.shape(val))
+        else:
+            dtype = 'pickle'
+            shape = None
+
+        try:
+            self._conn.execute("ALTER TABLE cases ADD COLUMN %s BLOB" % col)
+        except sqlite3.OperationalError as err:
+            if 'too many columns' not in str(err):
+                raise
+            raise RuntimeError("Can't record '%s' because the cases table "
+                               "has too many columns. Use the "
+                               "'record_vectors' option or the 'dict' layout "
+                               "to record this many variables." % name)
+        self._conn.execute("INSERT INTO variables (col, vector, name, shape, "
+                           "dtype) VALUES (?, ?, ?, ?, ?)",
+                           (col, label, name, json.dumps(shape), dtype))
+
+        # insert statements with the old set of columns are still valid
+        self._columns[(key, name)] = col
+        self._dtypes[col] = dtype
+        return col
+
+    def _add_vector_column(self, key, label, pathname, vmap):
+        """Adds a BLOB column to the cases table for the flat array of a
+        vector and stores its map in the metadata table.
+        """
+        col = '%svec%d' % (key, len(self._columns))
+        self._conn.execute("ALTER TABLE cases ADD COLUMN %s BLOB" % col)
+
+        self._vector_maps[col] = {
+            'vector': label,
+            'pathname': pathname,
+            'map': dict(vmap.map),
+        }
+        self._set_meta('vector_maps', self._vector_maps)
+
+        self._columns[('vec', key, pathname)] = col
+        self._dtypes[col] = 'float64'
+        return col
+
+    def _record_done(self):
+        """Commits the current transaction every `batch_size` records."""
+        self._uncommitted += 1
+        if self._uncommitted >= self._batch_size:
+            self._conn.commit()
+            self._uncommitted = 0
+
     def close(self):
         """Closes `out`"""
 
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
         if self._open_close_sqlitedict:
             if self.out_metadata is not None:
                 self.out_metadata.close()
@@ -173,3 +381,8 @@ class SqliteRecorder(BaseRecorder):
             if self.out_derivs is not None:
                 self.out_derivs.close()
                 self.out_derivs = None
+
+
+def _pickle(obj):
+    """Returns `obj` pickled into a form that can be stored in a BLOB."""
+    return sqlite3.Binary(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
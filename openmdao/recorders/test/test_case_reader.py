@@ -0,0 +1,318 @@
+""" Unit test for the CaseReader. """
+
+import errno
+import os
+import unittest
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import numpy as np
+
+from openmdao.api import Problem, Group, IndepVarComp, ExecComp, CaseReader, \
+     SqliteRecorder, NpyRecorder, InMemoryRecorder, NLGaussSeidel
+from openmdao.test.sellar import SellarDerivatives
+from openmdao.test.util import assert_rel_error
+
+try:
+    from openmdao.recorders.hdf5_recorder import HDF5Recorder
+except ImportError:
+    HDF5Recorder = None
+
+
+class TestCaseReader(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = mkdtemp()
+
+    def tearDown(self):
+        try:
+            rmtree(self.dir)
+        except OSError as e:
+            # If directory already deleted, keep going
+            if e.errno not in (errno.ENOENT, errno.EACCES, errno.EPERM):
+                raise e
+
+    def _run(self, recorder, delta=False):
+        """ Records the root solver and the driver of a Sellar problem,
+        along with an InMemoryRecorder for comparison.
+        """
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+
+        inmem = InMemoryRecorder()
+        for rec in (recorder, inmem):
+            rec.options['record_params'] = True
+            rec.options['record_resids'] = True
+            rec.options['excludes'] = ['obj']
+            rec.options['record_metadata'] = False
+            prob.root.nl_solver.add_recorder(rec)
+        prob.driver.add_recorder(recorder)
+
+        if delta:
+            recorder.options['record_delta'] = True
+            recorder.options['delta_full_interval'] = 3
+
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+
+        return prob, inmem
+
+    def _check(self, fname, recorder):
+        prob, inmem = self._run(recorder)
+
+        reader = CaseReader(fname, cache_size=2)
+        num_solver = len(inmem.iters)
+
+        self.assertEqual(reader.num_cases(), num_solver + 1)
+
+        solver_coords = reader.list_cases('rank0:Driver|1|root')
+        self.assertEqual(solver_coords, [data['iter'] for data in inmem.iters])
+        self.assertEqual(reader.list_cases(), solver_coords + ['rank0:Driver|1'])
+
+        # vectorized read of one variable across cases
+        y1 = reader.get_var('y1', prefix='rank0:Driver|1|root')
+        self.assertEqual(y1.shape, (num_solver,))
+        z = reader.get_var('z')
+        self.assertEqual(z.shape, (num_solver + 1, 2))
+        for i, data in enumerate(inmem.iters):
+            assert_rel_error(self, y1[i], data['unknowns']['y1'], 1e-12)
+            assert_rel_error(self, z[i], data['unknowns']['z'], 1e-12)
+
+        # excluded variables are NaN
+        self.assertTrue(np.all(np.isnan(reader.get_var('obj'))))
+
+        x = reader.get_var('d1.x', vector='Parameters', prefix='rank0:Driver|1|')
+        assert_rel_error(self, x, np.ones(num_solver), 1e-12)
+
+        case = reader.get_case(-1)
+        self.assertEqual(case['coord'], 'rank0:Driver|1')
+        self.assertEqual(case['success'], 1)
+        self.assertEqual(case['msg'], '')
+        assert_rel_error(self, case['Unknowns']['y1'], prob['y1'], 1e-12)
+        assert_rel_error(self, case['Unknowns']['z'], prob['z'], 1e-12)
+        self.assertTrue('obj' not in case['Unknowns'])
+        self.assertEqual(set(case['Residuals']), set(case['Unknowns']))
+
+        # cases come from the cache until they are evicted
+        self.assertTrue(reader.get_case('rank0:Driver|1') is case)
+        reader.get_case(0)
+        reader.get_case(1)
+        self.assertFalse(reader.get_case(-1) is case)
+
+        with self.assertRaises(KeyError) as cm:
+            reader.get_case('rank0:Driver|2')
+        self.assertEqual(str(cm.exception),
+                         "\"Case 'rank0:Driver|2' was not found in '%s'.\"" % fname)
+
+        with self.assertRaises(ValueError) as cm:
+            reader.get_var('y1', vector='Outputs')
+
+        reader.close()
+
+        # reopens lazily after close
+        self.assertEqual(reader.num_cases(), num_solver + 1)
+        reader.close()
+
+    def test_sqlite_dict(self):
+        fname = os.path.join(self.dir, 'cases.sqlite')
+        self._check(fname, SqliteRecorder(fname))
+
+    def test_sqlite_columnar(self):
+        fname = os.path.join(self.dir, 'cases.sqlite')
+        self._check(fname, SqliteRecorder(fname, layout='columnar'))
+
+    def test_hdf5_group(self):
+        if HDF5Recorder is None:
+            raise unittest.SkipTest("Could not import HDF5Recorder. Is h5py installed?")
+        fname = os.path.join(self.dir, 'cases.hdf5')
+        self._check(fname, HDF5Recorder(fname))
+
+    def test_hdf5_chunked(self):
+        if HDF5Recorder is None:
+            raise unittest.SkipTest("Could not import HDF5Recorder. Is h5py installed?")
+        fname = os.path.join(self.dir, 'cases.hdf5')
+        self._check(fname, HDF5Recorder(fname, layout='chunked', chunk_size=4))
+
+    def test_npy(self):
+        fname = os.path.join(self.dir, 'cases')
+        self._check(fname, NpyRecorder(fname))
+
+    def _check_delta(self, fname, recorder):
+        prob, inmem = self._run(recorder, delta=True)
+
+        reader = CaseReader(fname)
+        coords = reader.list_cases('rank0:Driver|1|root')
+        self.assertEqual(coords, [data['iter'] for data in inmem.iters])
+        self.assertTrue(len(coords) > 3)
+
+        # every case comes back whole
+        for i, data in enumerate(inmem.iters):
+            case = reader.get_case(data['iter'])
+            if i % 3 == 0:
+                self.assertTrue('delta_ref' not in case)
+            else:
+                self.assertEqual(case['delta_ref'], coords[i - i % 3])
+            for label, key in (('Parameters', 'params'), ('Unknowns', 'unknowns'),
+                               ('Residuals', 'resids')):
+                self.assertEqual(set(case[label]), set(data[key]))
+                for name, val in data[key].items():
+                    assert_rel_error(self, case[label][name], val, 1e-12)
+
+        # the driver records the same system, so it shares the snapshots
+        case = reader.get_case('rank0:Driver|1')
+        self.assertEqual(set(case['Unknowns']), set(inmem.iters[0]['unknowns']))
+        assert_rel_error(self, case['Unknowns']['x'], prob['x'], 1e-12)
+        assert_rel_error(self, case['Unknowns']['y2'], prob['y2'], 1e-12)
+
+        # values left out of deltas are filled in for vectorized reads too,
+        # even when the snapshot isn't in the requested range
+        reader = CaseReader(fname)
+        x = reader.get_var('x', prefix='rank0:Driver|1|root')
+        assert_rel_error(self, x, np.ones(len(coords)), 1e-12)
+        z = reader.get_var('z', prefix=coords[-1])
+        assert_rel_error(self, z[0], prob['z'], 1e-12)
+        y1 = reader.get_var('y1', prefix='rank0:Driver|1|root')
+        for i, data in enumerate(inmem.iters):
+            assert_rel_error(self, y1[i], data['unknowns']['y1'], 1e-12)
+
+        reader.close()
+
+    def test_sqlite_dict_delta(self):
+        fname = os.path.join(self.dir, 'cases.sqlite')
+        self._check_delta(fname, SqliteRecorder(fname))
+
+    def test_sqlite_columnar_delta(self):
+        fname = os.path.join(self.dir, 'cases.sqlite')
+        self._check_delta(fname, SqliteRecorder(fname, layout='columnar'))
+
+    def test_hdf5_group_delta(self):
+        if HDF5Recorder is None:
+            raise unittest.SkipTest("Could not import HDF5Recorder. Is h5py installed?")
+        fname = os.path.join(self.dir, 'cases.hdf5')
+        self._check_delta(fname, HDF5Recorder(fname))
+
+    def test_hdf5_chunked_delta(self):
+        if HDF5Recorder is None:
+            raise unittest.SkipTest("Could not import HDF5Recorder. Is h5py installed?")
+        fname = os.path.join(self.dir, 'cases.hdf5')
+        self._check_delta(fname, HDF5Recorder(fname, layout='chunked', chunk_size=4))
+
+    def test_npy_delta(self):
+        fname = os.path.join(self.dir, 'cases')
+        self._check_delta(fname, NpyRecorder(fname))
+
+    def _check_vectors(self, fname, recorder):
+        prob, inmem = self._run(recorder)
+
+        # the Sellar vectors plus the unknowns of the driver
+        reader = CaseReader(fname)
+        self.assertEqual(reader.num_cases(), len(inmem.iters) + 1)
+        for data in inmem.iters:
+            case = reader.get_case(data['iter'])
+            for label, key in (('Parameters', 'params'), ('Unknowns', 'unknowns'),
+                               ('Residuals', 'resids')):
+                self.assertEqual(set(case[label]), set(data[key]))
+                for name, val in data[key].items():
+                    assert_rel_error(self, case[label][name], val, 1e-12)
+                    self.assertEqual(np.shape(case[label][name]), np.shape(val))
+
+        z = reader.get_var('z')
+        self.assertEqual(z.shape, (len(inmem.iters) + 1, 2))
+        assert_rel_error(self, z[-1], prob['z'], 1e-12)
+        y1 = reader.get_var('y1', prefix='rank0:Driver|1|root')
+        for i, data in enumerate(inmem.iters):
+            assert_rel_error(self, y1[i], data['unknowns']['y1'], 1e-12)
+        reader.close()
+
+    def _check_vectors_units(self, fname, recorder):
+        prob = Problem(root=Group())
+        root = prob.root
+        root.add('p', IndepVarComp([('x', np.array([1.0, 2.0, 3.0]), {'units': 'm'}),
+                                    ('s', 'abc', {'pass_by_obj': True})]))
+        root.add('c', ExecComp('y = 2.0*x', x=np.zeros(3), y=np.zeros(3),
+                               units={'x': 'cm'}))
+        root.connect('p.x', 'c.x')
+
+        recorder.options['record_params'] = True
+        recorder.options['record_vectors'] = True
+        prob.driver.add_recorder(recorder)
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+
+        reader = CaseReader(fname)
+        case = reader.get_case(0)
+
+        # params are recorded after unit conversion
+        assert_rel_error(self, case['Parameters']['c.x'], [100., 200., 300.], 1e-12)
+        assert_rel_error(self, case['Unknowns']['c.y'], [200., 400., 600.], 1e-12)
+        assert_rel_error(self, reader.get_var('c.x', vector='Parameters'),
+                         [[100., 200., 300.]], 1e-12)
+        assert_rel_error(self, reader.get_var('p.x'), [[1., 2., 3.]], 1e-12)
+
+        # pass_by_obj variables are still recorded one by one
+        if isinstance(recorder, SqliteRecorder):
+            self.assertEqual(case['Unknowns']['p.s'], 'abc')
+        reader.close()
+
+    def test_sqlite_columnar_vectors(self):
+        fname = os.path.join(self.dir, 'cases.sqlite')
+        rec = SqliteRecorder(fname, layout='columnar')
+        rec.options['record_vectors'] = True
+        self._check_vectors(fname, rec)
+
+        fname = os.path.join(self.dir, 'units.sqlite')
+        self._check_vectors_units(fname, SqliteRecorder(fname, layout='columnar'))
+
+    def test_hdf5_chunked_vectors(self):
+        if HDF5Recorder is None:
+            raise unittest.SkipTest("Could not import HDF5Recorder. Is h5py installed?")
+        fname = os.path.join(self.dir, 'cases.hdf5')
+        rec = HDF5Recorder(fname, layout='chunked', chunk_size=4)
+        rec.options['record_vectors'] = True
+        self._check_vectors(fname, rec)
+
+        fname = os.path.join(self.dir, 'units.hdf5')
+        rec = HDF5Recorder(fname, layout='chunked')
+        rec.options['excludes'] = ['p.s']
+        self._check_vectors_units(fname, rec)
+
+    def test_npy_vectors(self):
+        fname = os.path.join(self.dir, 'cases')
+        rec = NpyRecorder(fname)
+        rec.options['record_vectors'] = True
+        self._check_vectors(fname, rec)
+
+        fname = os.path.join(self.dir, 'units')
+        rec = NpyRecorder(fname)
+        rec.options['excludes'] = ['p.s']
+        self._check_vectors_units(fname, rec)
+
+    def test_vectors_not_supported(self):
+        fname = os.path.join(self.dir, 'cases.sqlite')
+        rec = SqliteRecorder(fname)
+        rec.options['record_vectors'] = True
+
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.driver.add_recorder(rec)
+
+        with self.assertRaises(RuntimeError) as cm:
+            prob.setup(check=False)
+
+        self.assertEqual(str(cm.exception),
+                         "SqliteRecorder does not support the 'record_vectors' option.")
+        rec.close()
+
+    def test_missing_file(self):
+        fname = os.path.join(self.dir, 'nothere')
+        reader = CaseReader(fname)
+        with self.assertRaises(IOError) as cm:
+            reader.list_cases()
+        self.assertEqual(str(cm.exception), "'%s' does not exist." % fname)
+
+
+if __name__ == "__main__":
+    unittest.main()
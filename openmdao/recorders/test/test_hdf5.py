@@ -13,11 +13,12 @@ import numpy as np
 from six.moves import zip
 from six import iteritems
 
-from openmdao.api import ScipyOptimizer
+from openmdao.api import ScipyOptimizer, Group, IndepVarComp, NLGaussSeidel
 from openmdao.core.problem import Problem
 from openmdao.test.converge_diverge import ConvergeDiverge
 from openmdao.test.example_groups import ExampleGroup
-from openmdao.test.sellar import SellarDerivativesGrouped
+from openmdao.test.paraboloid import Paraboloid
+from openmdao.test.sellar import SellarDerivatives, SellarDerivativesGrouped
 from openmdao.test.util import assert_rel_error, set_pyoptsparse_opt
 from openmdao.util.record_util import format_iteration_coordinate
 
@@ -691,5 +692,139 @@ class TestHDF5Recorder(unittest.TestCase):
 
         hdf.close()
 
+
+class TestHDF5RecorderChunked(unittest.TestCase):
+    def setUp(self):
+        if SKIP:
+            raise unittest.SkipTest("Could not import HDF5Recorder. Is h5py installed?")
+
+        self.dir = mkdtemp()
+        self.filename = os.path.join(self.dir, "tmp.hdf5")
+        self.eps = 1e-5
+
+    def tearDown(self):
+        try:
+            rmtree(self.dir)
+        except OSError as e:
+            # If directory already deleted, keep going
+            if e.errno not in (errno.ENOENT, errno.EACCES, errno.EPERM):
+                raise e
+
+    def test_bad_layout(self):
+        with self.assertRaises(ValueError) as cm:
+            HDF5Recorder(self.filename, layout='flat')
+        self.assertEqual(str(cm.exception),
+                         "HDF5Recorder layout must be 'group' or 'chunked', "
+                         "not 'flat'.")
+
+    def test_basic(self):
+        recorder = HDF5Recorder(self.filename, layout='chunked')
+        recorder.options['record_metadata'] = False
+        recorder.options['record_params'] = True
+        recorder.options['record_resids'] = True
+
+        prob = Problem()
+        prob.root = ConvergeDiverge()
+        prob.driver.add_recorder(recorder)
+        prob.setup(check=False)
+
+        t0, t1 = run_problem(prob)
+        prob.cleanup()  # closes recorders
+
+        hdf = h5py.File(self.filename, 'r')
+        self.assertEqual(hdf['metadata']['layout'][()], 'chunked')
+
+        cases = hdf['cases']
+        self.assertEqual(cases.attrs['num_cases'], 1)
+        self.assertEqual(cases['coord'][0],
+                         format_iteration_coordinate([0, 'Driver', (1, )]))
+        self.assertTrue(t0 <= cases['timestamp'][0] <= t1)
+        self.assertEqual(cases['success'][0], 1)
+        self.assertEqual(cases['msg'][0], '')
+
+        self.assertEqual(len(cases['Parameters']), 9)
+        self.assertEqual(len(cases['Unknowns']), 10)
+        self.assertEqual(len(cases['Residuals']), 10)
+        self.assertEqual(cases['Unknowns']['comp7.y1'].shape, (1,))
+        assert_rel_error(self, cases['Unknowns']['comp7.y1'][0], -102.7, self.eps)
+        assert_rel_error(self, cases['Parameters']['comp7.x1'][0], 36.8, self.eps)
+        assert_rel_error(self, cases['Residuals']['p.x'][0], 0.0, self.eps)
+
+        hdf.close()
+
+    def test_solver_record_appends(self):
+        recorder = HDF5Recorder(self.filename, layout='chunked', chunk_size=2,
+                                compression='gzip')
+        recorder.options['record_metadata'] = False
+        recorder.options['includes'] = ['y1', 'z']
+
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+        prob.root.nl_solver.add_recorder(recorder)
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()  # closes recorders
+
+        hdf = h5py.File(self.filename, 'r')
+        cases = hdf['cases']
+        n = cases.attrs['num_cases']
+        self.assertTrue(n > 2)
+
+        y1 = cases['Unknowns']['y1']
+        z = cases['Unknowns']['z']
+        self.assertEqual(y1.shape, (n,))
+        self.assertEqual(z.shape, (n, 2))
+        self.assertEqual(z.chunks, (2, 2))
+        self.assertEqual(z.compression, 'gzip')
+        self.assertEqual(len(cases['coord']), n)
+
+        for i, coord in enumerate(cases['coord'][:]):
+            self.assertEqual(coord, format_iteration_coordinate(
+                [0, 'Driver', (1,), 'root', (i+1,)]))
+
+        assert_rel_error(self, y1[-1], prob['y1'], 1e-10)
+        assert_rel_error(self, z[:][-1], prob['z'], 1e-10)
+
+        hdf.close()
+
+    def test_record_derivs(self):
+        recorder = HDF5Recorder(self.filename, layout='chunked')
+        recorder.options['record_metadata'] = False
+        recorder.options['record_derivs'] = True
+
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p1', IndepVarComp('x', 50.0), promotes=['*'])
+        root.add('p2', IndepVarComp('y', 50.0), promotes=['*'])
+        root.add('comp', Paraboloid(), promotes=['*'])
+
+        prob.driver = ScipyOptimizer()
+        prob.driver.options['optimizer'] = 'SLSQP'
+        prob.driver.options['disp'] = False
+        prob.driver.add_desvar('x', lower=-50.0, upper=50.0)
+        prob.driver.add_desvar('y', lower=-50.0, upper=50.0)
+        prob.driver.add_objective('f_xy')
+        prob.driver.add_recorder(recorder)
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+
+        hdf = h5py.File(self.filename, 'r')
+
+        self.assertEqual(hdf['cases']['coord'][0], 'rank0:SLSQP|1')
+        assert_rel_error(self, hdf['cases']['Unknowns']['x'][-1], 6.666667, 1e-6)
+
+        deriv_group = hdf['derivs']['rank0:SLSQP|1']['Derivs']
+        self.assertEqual(deriv_group.attrs['success'], 1)
+
+        # df/dx = 2(x-3) + y, df/dy = x + 2(y+4) at x = y = 50
+        J1 = deriv_group['Derivatives']
+        assert_rel_error(self, J1[0][0], 144.0, 1e-8)
+        assert_rel_error(self, J1[0][1], 158.0, 1e-8)
+
+        hdf.close()
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,7 +5,9 @@ import unittest
 
 import numpy as np
 
-from openmdao.api import Problem, InMemoryRecorder, ScipyOptimizer
+from openmdao.api import Problem, Group, IndepVarComp, ExecComp, \
+     InMemoryRecorder, ScipyOptimizer
+from openmdao.drivers.fullfactorial_driver import FullFactorialDriver
 from openmdao.test.sellar import SellarDerivativesGrouped
 from openmdao.test.util import assert_rel_error
 
@@ -121,5 +123,109 @@ class TestInMemoryRecorder(unittest.TestCase):
         assert_rel_error(self, J1[2][1], 1.0775421, .00001)
         assert_rel_error(self, J1[2][2], 0.09692762, .00001)
 
+class TestInMemoryRecorderStorage(unittest.TestCase):
+
+    def _run_doe(self, rec, num_levels=40):
+        prob = Problem(root=Group())
+        root = prob.root
+        root.add('p', IndepVarComp([('x', 0.0), ('w', np.array([1.0, 2.0])),
+                                    ('s', 'abc', {'pass_by_obj': True})]),
+                 promotes=['*'])
+        root.add('comp', ExecComp('y = 2.0*x'), promotes=['*'])
+        root.add('comp2', ExecComp('z = 3.0*w', w=np.zeros(2), z=np.zeros(2)),
+                 promotes=['*'])
+
+        prob.driver = FullFactorialDriver(num_levels=num_levels)
+        prob.driver.add_desvar('x', lower=0.0, upper=num_levels - 1.0)
+        prob.driver.add_response(['x', 'y'])
+
+        rec.options['record_params'] = True
+        rec.options['record_resids'] = True
+        prob.driver.add_recorder(rec)
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+        return prob
+
+    def test_growth(self):
+        rec = InMemoryRecorder()
+        prob = self._run_doe(rec)
+
+        self.assertEqual(len(rec.iters), 40)
+        x = rec.get_var('x')
+        self.assertEqual(x.shape, (40,))
+        assert_rel_error(self, np.sort(x), np.arange(40.0), 1e-12)
+        assert_rel_error(self, rec.get_var('y'), 2.0*x, 1e-12)
+        assert_rel_error(self, rec.get_var('comp.x', 'params'), x, 1e-12)
+        self.assertEqual(rec.get_var('z').shape, (40, 2))
+        self.assertEqual(rec.get_var('s'), ['abc']*40)
+
+        for i, data in enumerate(rec.iters):
+            self.assertEqual(data['iter'], 'rank0:Driver|%d' % i)
+            self.assertEqual(data['success'], 1)
+            assert_rel_error(self, data['unknowns']['x'], x[i], 1e-12)
+            assert_rel_error(self, data['unknowns']['z'], [3.0, 6.0], 1e-12)
+            self.assertEqual(data['unknowns']['s'], 'abc')
+            self.assertEqual(set(data['resids']), set(data['unknowns']))
+
+        last = rec.iters[-1]
+        self.assertEqual(last['iter'], rec.iters[39]['iter'])
+        self.assertEqual(len(rec.iters[30:]), 10)
+        with self.assertRaises(IndexError):
+            rec.iters[40]
+
+        # returned values are copies
+        last['unknowns']['z'][:] = -1.0
+        assert_rel_error(self, rec.iters[-1]['unknowns']['z'], [3.0, 6.0], 1e-12)
+
+        # the DOE response recorder uses the same storage
+        responses = [dict(r[0]) for r in prob.driver.get_responses()]
+        self.assertEqual(len(responses), 40)
+        for res in responses:
+            assert_rel_error(self, res['y'], 2.0 * res['x'], 1e-12)
+
+    def test_ring_buffer(self):
+        full = InMemoryRecorder()
+        self._run_doe(full)
+
+        rec = InMemoryRecorder(max_cases=12)
+        self._run_doe(rec)
+
+        self.assertEqual(len(rec.iters), 12)
+        self.assertEqual([d['iter'] for d in rec.iters],
+                         [d['iter'] for d in full.iters[-12:]])
+        assert_rel_error(self, rec.get_var('x'), full.get_var('x')[-12:], 1e-12)
+        assert_rel_error(self, rec.get_var('z'), full.get_var('z')[-12:], 1e-12)
+        for expected, actual in zip(full.iters[-12:], rec.iters):
+            assert_rel_error(self, actual['unknowns']['y'],
+                             expected['unknowns']['y'], 1e-12)
+
+    def test_missing_values(self):
+        rec = InMemoryRecorder()
+
+        meta = {'coord': [0, 'Driver', (1,)], 'timestamp': 0.0,
+                'success': 1, 'msg': ''}
+        rec._filtered[''] = {'p': [], 'u': ['a'], 'r': []}
+        rec.record_iteration({}, {'a': 1.0}, {}, meta)
+        rec._filtered[''] = {'p': [], 'u': ['b'], 'r': []}
+        rec.record_iteration({}, {'b': np.ones(2)}, {}, meta)
+
+        assert_rel_error(self, rec.get_var('a'), [1.0, np.nan], 1e-12)
+        self.assertTrue(np.all(np.isnan(rec.get_var('b')[0])))
+        self.assertEqual(set(rec.iters[0]['unknowns']), set(['a']))
+        self.assertEqual(set(rec.iters[1]['unknowns']), set(['b']))
+
+        with self.assertRaises(KeyError) as cm:
+            rec.get_var('c')
+        self.assertEqual(str(cm.exception),
+                         '"Variable \'c\' was not recorded in unknowns."')
+
+        with self.assertRaises(ValueError) as cm:
+            rec.get_var('a', 'outputs')
+        self.assertEqual(str(cm.exception),
+                         "vector must be one of 'params', 'unknowns' or "
+                         "'resids', not 'outputs'.")
+
+
 if __name__ == "__main__":
     unittest.main()
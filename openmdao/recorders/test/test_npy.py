@@ -0,0 +1,198 @@
+""" Unit test for the NpyRecorder. """
+
+import errno
+import json
+import os
+import pickle
+import time
+import unittest
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from openmdao.api import Problem, NpyRecorder, ScipyOptimizer, Group, \
+     IndepVarComp, NLGaussSeidel
+from openmdao.test.converge_diverge import ConvergeDiverge
+from openmdao.test.paraboloid import Paraboloid
+from openmdao.test.sellar import SellarDerivatives
+from openmdao.test.util import assert_rel_error
+from openmdao.util.record_util import format_iteration_coordinate
+
+
+def run_problem(problem):
+    t0 = time.time()
+    problem.run()
+    t1 = time.time()
+
+    return t0, t1
+
+
+class TestNpyRecorder(unittest.TestCase):
+    def setUp(self):
+        self.dir = mkdtemp()
+        self.dirname = os.path.join(self.dir, "npy_test")
+        self.eps = 1e-5
+
+    def tearDown(self):
+        try:
+            rmtree(self.dir)
+        except OSError as e:
+            # If directory already deleted, keep going
+            if e.errno not in (errno.ENOENT, errno.EACCES, errno.EPERM):
+                raise e
+
+    def _load(self, label, name):
+        with open(os.path.join(self.dirname, 'index.json')) as f:
+            index = json.load(f)
+        fname = index['variables'][label][name]['file']
+        return np.load(os.path.join(self.dirname, fname), mmap_mode='r')
+
+    def test_basic(self):
+        recorder = NpyRecorder(self.dirname)
+        recorder.options['record_params'] = True
+        recorder.options['record_resids'] = True
+
+        prob = Problem()
+        prob.root = ConvergeDiverge()
+        prob.driver.add_recorder(recorder)
+        prob.setup(check=False)
+
+        t0, t1 = run_problem(prob)
+        prob.cleanup()  # closes recorders
+
+        with open(os.path.join(self.dirname, 'index.json')) as f:
+            index = json.load(f)
+
+        self.assertEqual(index['num_cases'], 1)
+        self.assertEqual(len(index['variables']['Parameters']), 9)
+        self.assertEqual(len(index['variables']['Unknowns']), 10)
+        self.assertEqual(len(index['variables']['Residuals']), 10)
+        self.assertEqual(index['msgs'], {})
+
+        y1 = self._load('Unknowns', 'comp7.y1')
+        self.assertTrue(isinstance(y1, np.memmap))
+        self.assertEqual(y1.shape, (1,))
+        assert_rel_error(self, y1[0], -102.7, self.eps)
+        assert_rel_error(self, self._load('Parameters', 'comp7.x1')[0], 36.8, self.eps)
+        assert_rel_error(self, self._load('Residuals', 'p.x')[0], 0.0, self.eps)
+
+        timestamp = np.load(os.path.join(self.dirname, 'timestamp.npy'))
+        self.assertTrue(t0 <= timestamp[0] <= t1)
+        success = np.load(os.path.join(self.dirname, 'success.npy'))
+        self.assertEqual(success[0], 1)
+
+        with open(os.path.join(self.dirname, 'coord.txt')) as f:
+            coords = f.read().splitlines()
+        self.assertEqual(coords, [format_iteration_coordinate([0, 'Driver', (1, )])])
+
+        with open(os.path.join(self.dirname, 'metadata.pkl'), 'rb') as f:
+            meta = pickle.load(f)
+        self.assertEqual(set(meta['Unknowns']), set(prob.root.unknowns))
+
+    def test_solver_record_columns(self):
+        recorder = NpyRecorder(self.dirname, flush_interval=2)
+        recorder.options['includes'] = ['y1', 'z']
+
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+        prob.root.nl_solver.add_recorder(recorder)
+        prob.setup(check=False)
+        prob.run()
+
+        # flushed cases can be read before the recorder is closed
+        z = self._load('Unknowns', 'z')
+        self.assertTrue(z.shape[0] >= 2)
+        self.assertEqual(z.shape[1:], (2,))
+        del z
+
+        prob.cleanup()  # closes recorders
+
+        y1 = self._load('Unknowns', 'y1')
+        z = self._load('Unknowns', 'z')
+        n = y1.shape[0]
+        self.assertTrue(n > 2)
+        self.assertEqual(z.shape, (n, 2))
+
+        with open(os.path.join(self.dirname, 'coord.txt')) as f:
+            coords = f.read().splitlines()
+        for i, coord in enumerate(coords):
+            self.assertEqual(coord, format_iteration_coordinate(
+                [0, 'Driver', (1,), 'root', (i+1,)]))
+        self.assertEqual(len(coords), n)
+
+        assert_rel_error(self, y1[-1], prob['y1'], 1e-10)
+        assert_rel_error(self, z[-1], prob['z'], 1e-10)
+
+    def test_many_variables(self):
+        if resource is None:
+            raise unittest.SkipTest("The resource module isn't available.")
+
+        # more columns than the process may have open files
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        limit = 256
+        if soft != resource.RLIM_INFINITY and soft < limit:
+            limit = soft
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+        try:
+            recorder = NpyRecorder(self.dirname, flush_interval=2)
+
+            prob = Problem()
+            prob.root = Group()
+            prob.root.add('p', IndepVarComp([('x%d' % i, float(i))
+                                             for i in range(2*limit)]))
+            prob.driver.add_recorder(recorder)
+            prob.setup(check=False)
+            prob.run()
+            prob.run()
+            prob.cleanup()  # closes recorders
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+        for i in (0, 2*limit - 1):
+            x = self._load('Unknowns', 'p.x%d' % i)
+            self.assertEqual(x.shape, (2,))
+            assert_rel_error(self, x[1], float(i), 1e-12)
+
+    def test_record_derivs(self):
+        recorder = NpyRecorder(self.dirname)
+        recorder.options['record_derivs'] = True
+
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p1', IndepVarComp('x', 50.0), promotes=['*'])
+        root.add('p2', IndepVarComp('y', 50.0), promotes=['*'])
+        root.add('comp', Paraboloid(), promotes=['*'])
+
+        prob.driver = ScipyOptimizer()
+        prob.driver.options['optimizer'] = 'SLSQP'
+        prob.driver.options['disp'] = False
+        prob.driver.add_desvar('x', lower=-50.0, upper=50.0)
+        prob.driver.add_desvar('y', lower=-50.0, upper=50.0)
+        prob.driver.add_objective('f_xy')
+        prob.driver.add_recorder(recorder)
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+
+        assert_rel_error(self, self._load('Unknowns', 'x')[-1], 6.666667, 1e-6)
+
+        with open(os.path.join(self.dirname, 'derivs.pkl'), 'rb') as f:
+            data = pickle.load(f)
+
+        # df/dx = 2(x-3) + y, df/dy = x + 2(y+4) at x = y = 50
+        self.assertEqual(data['coord'], 'rank0:SLSQP|1')
+        assert_rel_error(self, data['Derivatives'][0][0], 144.0, 1e-8)
+        assert_rel_error(self, data['Derivatives'][0][1], 158.0, 1e-8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+""" Unit tests for the RecordingManager. """
+
+import unittest
+
+from openmdao.api import Problem, Group, IndepVarComp, ExecComp, \
+    InMemoryRecorder, ScipyOptimizer, NLGaussSeidel, BaseRecorder
+from openmdao.recorders.recording_manager import recording_disabled, \
+                                                  _solver_managers
+from openmdao.test.paraboloid import Paraboloid
+from openmdao.test.sellar import SellarDerivatives
+from openmdao.test.util import assert_rel_error
+
+
+class _FailingRecorder(BaseRecorder):
+    """ Recorder that raises an error the second time it records. """
+
+    def record_metadata(self, group):
+        pass
+
+    def record_iteration(self, params, unknowns, resids, metadata):
+        if metadata['coord'][-1] == (2,):
+            raise RuntimeError("write failed")
+
+
+def _paraboloid_opt(rec, async_rec):
+    prob = Problem()
+    root = prob.root = Group()
+
+    root.add('p1', IndepVarComp('x', 50.0), promotes=['*'])
+    root.add('p2', IndepVarComp('y', 50.0), promotes=['*'])
+    root.add('comp', Paraboloid(), promotes=['*'])
+
+    prob.driver = ScipyOptimizer()
+    prob.driver.options['optimizer'] = 'SLSQP'
+    prob.driver.options['disp'] = False
+    prob.driver.add_desvar('x', lower=-50.0, upper=50.0)
+    prob.driver.add_desvar('y', lower=-50.0, upper=50.0)
+    prob.driver.add_objective('f_xy')
+
+    prob.driver.recorders.options['record_async'] = async_rec
+    prob.driver.recorders.options['queue_size'] = 2
+    prob.driver.add_recorder(rec)
+    rec.options['record_metadata'] = False
+    rec.options['record_params'] = True
+    rec.options['record_resids'] = True
+    rec.options['record_derivs'] = True
+
+    prob.setup(check=False)
+    prob.run()
+    prob.cleanup()
+
+    return prob
+
+
+class TestAsyncRecording(unittest.TestCase):
+
+    def _compare(self, sync_rec, async_rec):
+        self.assertEqual(len(sync_rec.iters), len(async_rec.iters))
+        self.assertTrue(len(sync_rec.iters) > 3)
+
+        for expected, actual in zip(sync_rec.iters, async_rec.iters):
+            self.assertEqual(expected['iter'], actual['iter'])
+            self.assertEqual(expected['success'], actual['success'])
+            for key in ('params', 'unknowns', 'resids'):
+                self.assertEqual(set(expected[key]), set(actual[key]))
+                for name, val in expected[key].items():
+                    assert_rel_error(self, actual[key][name], val, 1e-12)
+
+    def test_driver_async_matches_sync(self):
+        sync_rec = InMemoryRecorder()
+        _paraboloid_opt(sync_rec, False)
+
+        async_rec = InMemoryRecorder()
+        prob = _paraboloid_opt(async_rec, True)
+
+        assert_rel_error(self, prob['x'], 6.666667, 1e-6)
+        self._compare(sync_rec, async_rec)
+
+        # derivatives are written in order along with the iterations
+        self.assertEqual(len(sync_rec.deriv_iters), len(async_rec.deriv_iters))
+        for expected, actual in zip(sync_rec.deriv_iters, async_rec.deriv_iters):
+            assert_rel_error(self, actual['Derivatives'],
+                             expected['Derivatives'], 1e-12)
+
+    def test_solver_async_matches_sync(self):
+        recs = []
+        for async_rec in (False, True):
+            prob = Problem()
+            prob.root = SellarDerivatives()
+            prob.root.nl_solver = NLGaussSeidel()
+            prob.root.nl_solver.options['atol'] = 1e-9
+
+            rec = InMemoryRecorder()
+            rec.options['record_params'] = True
+            rec.options['record_resids'] = True
+            prob.root.nl_solver.recorders.options['record_async'] = async_rec
+            prob.root.nl_solver.add_recorder(rec)
+            prob.setup(check=False)
+            prob.run()
+            prob.cleanup()
+            recs.append(rec)
+
+        self._compare(*recs)
+
+        # coordinates were copied before the solver updated them
+        self.assertEqual(recs[1].iters[0]['iter'], 'rank0:Driver|1|root|1')
+
+    def test_responses_available_after_run(self):
+        from openmdao.drivers.fullfactorial_driver import FullFactorialDriver
+
+        prob = Problem(root=Group())
+        root = prob.root
+        root.add('p', IndepVarComp('x', 0.0), promotes=['*'])
+        root.add('comp', ExecComp('y = 2.0*x'), promotes=['*'])
+
+        prob.driver = FullFactorialDriver(num_levels=5)
+        prob.driver.recorders.options['record_async'] = True
+        prob.driver.recorders.options['queue_size'] = 1
+        prob.driver.add_desvar('x', lower=0.0, upper=4.0)
+        prob.driver.add_response(['x', 'y'])
+
+        prob.setup(check=False)
+        prob.run()
+
+        results = [dict(r[0]) for r in prob.driver.get_responses()]
+        self.assertEqual(len(results), 5)
+        for res in results:
+            assert_rel_error(self, res['y'], 2.0 * res['x'], 1e-12)
+
+        prob.cleanup()
+
+    def test_writer_error_raised(self):
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+        prob.root.nl_solver.recorders.options['record_async'] = True
+        prob.root.nl_solver.add_recorder(_FailingRecorder())
+        prob.setup(check=False)
+
+        with self.assertRaises(RuntimeError) as cm:
+            prob.run()
+            prob.cleanup()
+
+        self.assertEqual(str(cm.exception), "write failed")
+
+
+class TestRecordingDisabled(unittest.TestCase):
+
+    def test_recording_disabled(self):
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+        driver_rec = InMemoryRecorder()
+        solver_rec = InMemoryRecorder()
+        prob.driver.add_recorder(driver_rec)
+        prob.root.nl_solver.add_recorder(solver_rec)
+        prob.setup(check=False)
+
+        # only the given managers are turned off
+        with recording_disabled(_solver_managers(prob.root)):
+            prob.run()
+        self.assertEqual(len(driver_rec.iters), 1)
+        self.assertEqual(len(solver_rec.iters), 0)
+
+        # and they are turned back on afterwards
+        prob.run()
+        self.assertEqual(len(driver_rec.iters), 2)
+        self.assertTrue(len(solver_rec.iters) > 0)
+
+
+class TestDeltaRecording(unittest.TestCase):
+
+    def _run_sellar(self, rec, async_rec=False):
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+        prob.root.nl_solver.recorders.options['record_async'] = async_rec
+        prob.root.nl_solver.add_recorder(rec)
+        rec.options['record_params'] = True
+        rec.options['record_resids'] = True
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()
+        return prob
+
+    def test_only_changes_recorded(self):
+        for async_rec in (False, True):
+            full = InMemoryRecorder()
+            self._run_sellar(full)
+
+            rec = InMemoryRecorder()
+            rec.options['record_delta'] = True
+            rec.options['delta_full_interval'] = 4
+            self._run_sellar(rec, async_rec)
+
+            self.assertEqual(len(rec.iters), len(full.iters))
+            self.assertTrue(len(rec.iters) > 4)
+
+            for i, (expected, actual) in enumerate(zip(full.iters, rec.iters)):
+                snap = i - i % 4
+                if i == snap:
+                    self.assertTrue('delta_ref' not in actual)
+                    self.assertEqual(set(actual['unknowns']),
+                                     set(expected['unknowns']))
+                    continue
+
+                self.assertEqual(actual['delta_ref'], full.iters[snap]['iter'])
+
+                # the design variables never change inside the MDA
+                self.assertTrue('x' not in actual['unknowns'])
+                self.assertTrue('z' not in actual['unknowns'])
+                self.assertTrue('d1.z' not in actual['params'])
+
+                for key in ('params', 'unknowns', 'resids'):
+                    for name, val in expected[key].items():
+                        ref = full.iters[snap][key][name]
+                        if name in actual[key]:
+                            assert_rel_error(self, actual[key][name], val, 1e-12)
+                        else:
+                            assert_rel_error(self, ref, val, 1e-12)
+
+    def test_csv_delta_error(self):
+        from openmdao.recorders.csv_recorder import CsvRecorder
+        from six import StringIO
+
+        rec = CsvRecorder(StringIO())
+        rec.options['record_delta'] = True
+
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.driver.add_recorder(rec)
+
+        with self.assertRaises(RuntimeError) as cm:
+            prob.setup(check=False)
+
+        self.assertEqual(str(cm.exception),
+                         "CsvRecorder does not support the 'record_delta' "
+                         "option because every row must hold a value for "
+                         "every column.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
 """ Unit test for the SqliteRecorder. """
 
 import errno
+import json
 import os
+import pickle
+import sqlite3
 import unittest
 from shutil import rmtree
 from tempfile import mkdtemp
@@ -16,11 +19,13 @@ from sqlitedict import SqliteDict
 import numpy as np
 from numpy.testing import assert_allclose
 
-from openmdao.api import Problem, SqliteRecorder, ScipyOptimizer
+from openmdao.api import Problem, SqliteRecorder, ScipyOptimizer, Group, \
+     IndepVarComp, NLGaussSeidel
 from openmdao.core.vec_wrapper import _ByObjWrapper
 from openmdao.test.converge_diverge import ConvergeDiverge
 from openmdao.test.example_groups import ExampleGroup
-from openmdao.test.sellar import SellarDerivativesGrouped
+from openmdao.test.paraboloid import Paraboloid
+from openmdao.test.sellar import SellarDerivatives, SellarDerivativesGrouped
 from openmdao.test.util import assert_rel_error, set_pyoptsparse_opt
 from openmdao.util.record_util import format_iteration_coordinate
 
@@ -675,5 +680,223 @@ class TestSqliteRecorder(unittest.TestCase):
         assert_rel_error(self, J1[2][1], 1.0775421, .00001)
         assert_rel_error(self, J1[2][2], 0.09692762, .00001)
 
+
+class TestSqliteRecorderColumnar(unittest.TestCase):
+    def setUp(self):
+        self.dir = mkdtemp()
+        self.filename = os.path.join(self.dir, "sqlite_test")
+        self.recorder = SqliteRecorder(self.filename, layout='columnar',
+                                       batch_size=3)
+        self.recorder.options['record_metadata'] = False
+        self.eps = 1e-5
+
+    def tearDown(self):
+        try:
+            rmtree(self.dir)
+        except OSError as e:
+            # If directory already deleted, keep going
+            if e.errno not in (errno.ENOENT, errno.EACCES, errno.EPERM):
+                raise e
+
+    def _read_cases(self):
+        """Decode the cases table into a list of dicts."""
+        conn = sqlite3.connect(self.filename)
+        variables = {}
+        for col, vector, name, shape, dtype in conn.execute(
+                "SELECT col, vector, name, shape, dtype FROM variables"):
+            variables[col] = (vector, name, json.loads(shape), dtype)
+
+        cur = conn.execute("SELECT * FROM cases ORDER BY id")
+        cols = [d[0] for d in cur.description]
+        cases = []
+        for row in cur:
+            case = {'Parameters': {}, 'Unknowns': {}, 'Residuals': {}}
+            for col, val in zip(cols, row):
+                if col not in variables:
+                    case[col] = val
+                elif val is not None:
+                    vector, name, shape, dtype = variables[col]
+                    if dtype == 'float64':
+                        val = np.frombuffer(val, dtype=float).reshape(shape)
+                    else:
+                        val = pickle.loads(val)
+                    case[vector][name] = val
+            cases.append(case)
+        conn.close()
+        return cases
+
+    def test_bad_layout(self):
+        with self.assertRaises(ValueError) as cm:
+            SqliteRecorder(os.path.join(self.dir, "bad"), layout='rows')
+        self.assertEqual(str(cm.exception),
+                         "SqliteRecorder layout must be 'dict' or 'columnar', "
+                         "not 'rows'.")
+
+    def test_basic(self):
+        prob = Problem()
+        prob.root = ConvergeDiverge()
+        prob.driver.add_recorder(self.recorder)
+        self.recorder.options['record_params'] = True
+        self.recorder.options['record_resids'] = True
+        prob.setup(check=False)
+
+        t0, t1 = run_problem(prob)
+        prob.cleanup()  # closes recorders
+
+        cases = self._read_cases()
+        self.assertEqual(len(cases), 1)
+        case = cases[0]
+
+        self.assertEqual(case['coord'],
+                         format_iteration_coordinate([0, 'Driver', (1, )]))
+        self.assertTrue(t0 <= case['timestamp'] <= t1)
+        self.assertEqual(case['success'], 1)
+        self.assertEqual(case['msg'], '')
+
+        self.assertEqual(len(case['Parameters']), 9)
+        assert_rel_error(self, case['Parameters']['comp7.x1'], 36.8, self.eps)
+        self.assertEqual(len(case['Unknowns']), 10)
+        assert_rel_error(self, case['Unknowns']['comp7.y1'], -102.7, self.eps)
+        assert_rel_error(self, case['Unknowns']['p.x'], 2.0, self.eps)
+        self.assertEqual(len(case['Residuals']), 10)
+        assert_rel_error(self, case['Residuals']['comp4.y2'], 0.0, self.eps)
+
+    def test_solver_record_batches(self):
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+        prob.root.nl_solver.add_recorder(self.recorder)
+        self.recorder.options['includes'] = ['y1', 'y2', 'z']
+        prob.setup(check=False)
+        prob.run()
+
+        # cases are only committed every batch_size records
+        conn = sqlite3.connect(self.filename)
+        committed = conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+        conn.close()
+
+        prob.cleanup()  # closes recorders
+
+        cases = self._read_cases()
+        self.assertTrue(len(cases) > 3)
+        self.assertEqual(committed, 3*(len(cases)//3))
+
+        for i, case in enumerate(cases):
+            self.assertEqual(case['coord'],
+                             format_iteration_coordinate([0, 'Driver', (1,),
+                                                          'root', (i+1,)]))
+            self.assertEqual(set(case['Unknowns']), set(['y1', 'y2', 'z']))
+            self.assertEqual(case['Unknowns']['z'].shape, (2,))
+
+        assert_rel_error(self, cases[-1]['Unknowns']['y1'], prob['y1'], 1e-10)
+        assert_rel_error(self, cases[-1]['Unknowns']['z'], prob['z'], 1e-10)
+
+    def test_solver_record_async(self):
+        prob = Problem()
+        prob.root = SellarDerivatives()
+        prob.root.nl_solver = NLGaussSeidel()
+        prob.root.nl_solver.add_recorder(self.recorder)
+        prob.root.nl_solver.recorders.options['record_async'] = True
+        self.recorder.options['includes'] = ['y1', 'y2', 'z']
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()  # closes recorders
+
+        cases = self._read_cases()
+        self.assertTrue(len(cases) > 3)
+        for i, case in enumerate(cases):
+            self.assertEqual(case['coord'],
+                             format_iteration_coordinate([0, 'Driver', (1,),
+                                                          'root', (i+1,)]))
+
+        assert_rel_error(self, cases[-1]['Unknowns']['y1'], prob['y1'], 1e-10)
+        assert_rel_error(self, cases[-1]['Unknowns']['z'], prob['z'], 1e-10)
+
+    def test_too_many_columns(self):
+        def run(recorder):
+            prob = Problem()
+            prob.root = Group()
+            prob.root.add('p', IndepVarComp([('x%d' % i, 0.0)
+                                             for i in range(2000)]))
+            prob.driver.add_recorder(recorder)
+            prob.setup(check=False)
+            try:
+                prob.run()
+            finally:
+                prob.cleanup()
+
+        with self.assertRaises(RuntimeError) as cm:
+            run(self.recorder)
+        self.assertTrue("too many columns" in str(cm.exception))
+
+        # one column per vector is fine
+        recorder = SqliteRecorder(self.filename, layout='columnar')
+        recorder.options['record_metadata'] = False
+        recorder.options['record_vectors'] = True
+        run(recorder)
+
+        conn = sqlite3.connect(self.filename)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0], 1)
+        conn.close()
+
+    def test_indices_and_metadata(self):
+        prob = Problem()
+        prob.root = ConvergeDiverge()
+        prob.root.add_metadata('string', 'just a test')
+        prob.driver.add_recorder(self.recorder)
+        self.recorder.options['record_metadata'] = True
+        prob.setup(check=False)
+        prob.run()
+        prob.cleanup()  # closes recorders
+
+        conn = sqlite3.connect(self.filename)
+        indices = set(row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index'"))
+        self.assertTrue(set(['cases_coord', 'cases_timestamp']) <= indices)
+
+        meta = dict(conn.execute("SELECT key, value FROM metadata"))
+        conn.close()
+
+        self.assertEqual(pickle.loads(meta['format_version']), format_version)
+        self.assertEqual(pickle.loads(meta['layout']), 'columnar')
+        self.assertEqual(pickle.loads(meta['system_metadata'])['string'],
+                         'just a test')
+        self.assertEqual(set(pickle.loads(meta['Unknowns'])),
+                         set(prob.root.unknowns))
+
+    def test_root_derivs_array(self):
+        prob = Problem()
+        root = prob.root = Group()
+
+        root.add('p1', IndepVarComp('x', 50.0), promotes=['*'])
+        root.add('p2', IndepVarComp('y', 50.0), promotes=['*'])
+        root.add('comp', Paraboloid(), promotes=['*'])
+
+        prob.driver = ScipyOptimizer()
+        prob.driver.options['optimizer'] = 'SLSQP'
+        prob.driver.options['disp'] = False
+        prob.driver.add_desvar('x', lower=-50.0, upper=50.0)
+        prob.driver.add_desvar('y', lower=-50.0, upper=50.0)
+        prob.driver.add_objective('f_xy')
+
+        prob.driver.add_recorder(self.recorder)
+        self.recorder.options['record_derivs'] = True
+        prob.setup(check=False)
+
+        prob.run()
+
+        prob.cleanup()
+
+        conn = sqlite3.connect(self.filename)
+        coord, derivs = conn.execute("SELECT coord, derivs FROM derivs "
+                                     "ORDER BY id").fetchone()
+        conn.close()
+        J1 = pickle.loads(derivs)
+
+        # df/dx = 2(x-3) + y, df/dy = x + 2(y+4) at x = y = 50
+        self.assertEqual(coord, 'rank0:SLSQP|1')
+        assert_rel_error(self, J1[0][0], 144.0, 1e-8)
+        assert_rel_error(self, J1[0][1], 158.0, 1e-8)
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,12 +3,25 @@
 import numpy as np
 import scipy.linalg as linalg
 from scipy.optimize import minimize
-from six.moves import zip, range
+from six import get_unbound_function
+from six.moves import range
 
 from openmdao.surrogate_models.surrogate_model import SurrogateModel
 
 MACHINE_EPSILON = np.finfo(np.double).eps
 
+# Below this estimate of the reciprocal condition number of the correlation
+# matrix, the likelihood is calculated from its regularized pseudo-inverse.
+# The regularization changes the contribution of an eigenvalue s by a
+# relative amount of about (1e-8 * S_max / s)**2, so this is kept well above
+# 1e-8 for the two ways of calculating the likelihood to agree where they
+# meet.
+_RCOND_MIN = 1e-6
+
+# Maximum number of entries in the temporary arrays used to predict or
+# linearize for a block of points at once.
+_MAX_BLOCK_ENTRIES = 2 ** 22
+
 
 class KrigingSurrogate(SurrogateModel):
     """Surrogate Modeling method based on the simple Kriging interpolation.
@@ -24,9 +37,19 @@ class KrigingSurrogate(SurrogateModel):
     eval_rmse : bool
         Flag indicating whether the Root Mean Squared Error (RMSE) should be computed. Set to False
         by default.
+    refit_fraction : float, optional
+        When points are added by `update`, the thetas are kept until the number of training points
+        has grown by more than this fraction since they were fit. Then the model is trained again.
+        Default: 0.5
+    tied_thetas : bool, optional
+        If True, when this surrogate is trained by `train_multiple` along with other tied
+        surrogates with the same nugget (e.g. for the outputs of a MetaModel), one set of thetas
+        is fit for all of their outputs, and the correlation matrix is factored once for all of
+        them. Default: False
     """
 
-    def __init__(self, nugget=10. * MACHINE_EPSILON, eval_rmse=False):
+    def __init__(self, nugget=10. * MACHINE_EPSILON, eval_rmse=False,
+                 refit_fraction=0.5, tied_thetas=False):
         super(KrigingSurrogate, self).__init__()
 
         self.n_dims = 0       # number of independent
@@ -47,6 +70,11 @@ class KrigingSurrogate(SurrogateModel):
         self.Y_std = np.zeros(0)
 
         self.eval_rmse = eval_rmse
+        self.refit_fraction = refit_fraction
+        self.tied_thetas = tied_thetas
+
+        # number of training points when the thetas were fit
+        self._num_fit_samples = 0
 
     def train(self, x, y):
         """
@@ -64,96 +92,286 @@ class KrigingSurrogate(SurrogateModel):
         super(KrigingSurrogate, self).train(x, y)
 
         x, y = np.atleast_2d(x, y)
+        self._set_training_data(_training_inputs(x), y)
+        self._fit()
+
+    @classmethod
+    def train_multiple(cls, surrogates, x, ys):
+        """
+        Trains several KrigingSurrogates on the same inputs. The inputs are
+        normalized and the distances between the training points are
+        computed once for all of them. Tied surrogates with the same nugget
+        also share their thetas and the factorization of their correlation
+        matrix. The others are fit one at a time. Surrogates of a subclass
+        that overrides `train` are trained by calling it.
+
+        Args
+        ----
+        surrogates : list of `KrigingSurrogate`
+            The surrogates to train.
 
-        self.n_samples, self.n_dims = x.shape
+        x : array-like
+            Training input locations, the same for every surrogate.
 
-        if self.n_samples <= 1:
-            raise ValueError(
-                'KrigingSurrogate require at least 2 training points.'
-            )
+        ys : list of array-like
+            Model responses at the inputs, for each surrogate.
+        """
+        x = np.atleast_2d(x)
+        ys = [np.atleast_2d(y) for y in ys]
+        inputs = _training_inputs(x)
+
+        train = get_unbound_function(KrigingSurrogate.train)
+
+        tied = {}
+        for surrogate, y in zip(surrogates, ys):
+            if get_unbound_function(type(surrogate).train) is not train:
+                surrogate.train(x, y)
+                continue
+
+            SurrogateModel.train(surrogate, x, y)
+            surrogate._set_training_data(inputs, y)
+            if surrogate.tied_thetas:
+                key = np.asarray(surrogate.nugget, dtype=float).tobytes()
+                tied.setdefault(key, []).append((surrogate, y))
+            else:
+                surrogate._fit()
+
+        for group in tied.values():
+            if len(group) == 1:
+                group[0][0]._fit()
+                continue
+
+            # the outputs of the group are fit as a single vector output
+            fit = KrigingSurrogate(nugget=group[0][0].nugget)
+            fit._set_training_data(inputs, np.hstack([y for _, y in group]))
+            fit._fit()
+
+            start = 0
+            for surrogate, y in group:
+                cols = slice(start, start + y.shape[1])
+                start = cols.stop
+                surrogate.thetas = fit.thetas
+                surrogate._num_fit_samples = fit._num_fit_samples
+                surrogate._set_params({'alpha': fit.alpha[:, cols],
+                                       'L': fit.L, 'U': fit.U,
+                                       'S_inv': fit.S_inv, 'Vh': fit.Vh,
+                                       'sigma2': fit.sigma2[cols]})
+
+    def _set_training_data(self, inputs, y):
+        """ Sets the normalized training data from the inputs returned by
+        `_training_inputs` and the model responses `y`."""
+        X, X_mean, X_std, pairs, sq_dists = inputs
+
+        self.n_samples, self.n_dims = X.shape
 
-        # Normalize the data
-        X_mean = np.mean(x, axis=0)
-        X_std = np.std(x, axis=0)
         Y_mean = np.mean(y, axis=0)
         Y_std = np.std(y, axis=0)
-
-        X_std[X_std == 0.] = 1.
         Y_std[Y_std == 0.] = 1.
 
-        X = (x - X_mean) / X_std
-        Y = (y - Y_mean) / Y_std
-
         self.X = X
-        self.Y = Y
+        self.Y = (y - Y_mean) / Y_std
         self.X_mean, self.X_std = X_mean, X_std
         self.Y_mean, self.Y_std = Y_mean, Y_std
 
+        self._pairs = pairs
+        self._sq_dists = sq_dists
+
+    def _fit(self):
+        """ Fits the thetas to the training data and sets the trained model."""
         def _calcll(thetas):
             """ Callback function"""
-            loglike = self._calculate_reduced_likelihood_params(np.exp(thetas))[0]
-            return -loglike
+            loglike, params = self._calculate_reduced_likelihood_params(
+                np.exp(thetas), grad=True)
+            return -loglike, -params['grad']
 
         bounds = [(np.log(1e-5), np.log(1e5)) for _ in range(self.n_dims)]
 
         optResult = minimize(_calcll, 1e-1*np.ones(self.n_dims), method='slsqp',
-                             options={'eps': 1e-3},
-                             bounds=bounds)
+                             jac=True, bounds=bounds)
 
         if not optResult.success:
             raise ValueError('Kriging Hyper-parameter optimization failed: {0}'.format(optResult.message))
 
         self.thetas = np.exp(optResult.x)
-        _, params = self._calculate_reduced_likelihood_params()
+        self._num_fit_samples = self.n_samples
+        self._set_params(self._calculate_reduced_likelihood_params()[1])
+
+    def update(self, x, y):
+        """
+        Adds training points to the trained model. The thetas and the
+        normalization of the data are kept, and the Cholesky factor of the
+        correlation matrix is extended by the new points, which costs much
+        less than training again. If the extended correlation matrix is too
+        ill-conditioned for that, it is factored again. Once the number of
+        training points has grown by more than `refit_fraction` since the
+        thetas were fit, the model is trained again with all the points.
+
+        Args
+        ----
+        x : array-like
+            New training input locations.
+
+        y : array-like
+            Model responses at the new inputs.
+        """
+        if not self.trained:
+            self.train(x, y)
+            return
+
+        if np.ndim(self.nugget) > 0:
+            raise ValueError('KrigingSurrogate can only be updated if its '
+                             'nugget is a scalar.')
+
+        x, y = np.atleast_2d(x, y)
+        n_old = self.n_samples
+        n_new = x.shape[0]
+
+        X_new = (x - self.X_mean) / self.X_std
+        Y_new = (y - self.Y_mean) / self.Y_std
+        X = np.vstack((self.X, X_new))
+        Y = np.vstack((self.Y, Y_new))
+
+        if n_old + n_new > (1. + self.refit_fraction) * self._num_fit_samples:
+            self.train(X * self.X_std + self.X_mean, Y * self.Y_std + self.Y_mean)
+            return
+
+        # pairs between the old and the new points, and among the new points
+        old_idx, new_idx = np.divmod(np.arange(n_old * n_new), n_new)
+        new_pairs = np.triu_indices(n_new, 1)
+        self._pairs = (np.concatenate((self._pairs[0], old_idx,
+                                       new_pairs[0] + n_old)),
+                       np.concatenate((self._pairs[1], new_idx + n_old,
+                                       new_pairs[1] + n_old)))
+        self._sq_dists = np.vstack((self._sq_dists,
+                                    np.square(self.X[old_idx] - X_new[new_idx]),
+                                    np.square(X_new[new_pairs[0]] -
+                                              X_new[new_pairs[1]])))
+
+        L_old = self.L
+        self.X, self.Y = X, Y
+        self.n_samples = n = n_old + n_new
+
+        L = None
+        if L_old is not None:
+            R = self._correlation_matrix(self.thetas)[1]
+
+            # R = [[R11, R12], [R21, R22]] with R11 = L11 L11^T, so
+            # L21 = R21 L11^-T and L22 L22^T = R22 - L21 L21^T
+            L21 = linalg.solve_triangular(L_old, R[:n_old, n_old:], lower=True).T
+            L22 = _cholesky(R[n_old:, n_old:] - L21.dot(L21.T))
+            if L22 is not None:
+                L = np.zeros((n, n))
+                L[:n_old, :n_old] = L_old
+                L[n_old:, :n_old] = L21
+                L[n_old:, n_old:] = L22
+                if not _well_conditioned(L, R):
+                    L = None
+
+        if L is None:
+            self._set_params(self._calculate_reduced_likelihood_params()[1])
+            return
+
+        alpha = linalg.cho_solve((L, True), Y)
+        sigma2 = np.einsum('ij,ij->j', Y, alpha) / n
+        self._set_params({'alpha': alpha, 'L': L,
+                          'U': None, 'S_inv': None, 'Vh': None,
+                          'sigma2': sigma2 * np.square(self.Y_std)})
+
+    def _set_params(self, params):
+        """ Sets the trained model from the params returned by
+        `_calculate_reduced_likelihood_params`."""
         self.alpha = params['alpha']
+        self.L = params['L']
         self.U = params['U']
         self.S_inv = params['S_inv']
         self.Vh = params['Vh']
         self.sigma2 = params['sigma2']
 
-    def _calculate_reduced_likelihood_params(self, thetas=None):
+    def _correlation_matrix(self, thetas):
+        """ Returns the correlations for the pairs of training points and the
+        correlation matrix R of the training points."""
+        n = self.n_samples
+        r = np.exp(-self._sq_dists.dot(thetas))
+        R = np.zeros((n, n))
+        R[self._pairs] = r
+        R += R.T
+        R[np.diag_indices_from(R)] = 1. + self.nugget
+        return r, R
+
+    def _calculate_reduced_likelihood_params(self, thetas=None, grad=False):
         """
         Calculates a quantity with the same maximum location as the log-likelihood for a given theta.
 
+        R is factored by Cholesky decomposition. If it is too ill-conditioned
+        for that, a regularized pseudo-inverse from its eigen decomposition is
+        used instead.
+
         Args
         ----
         thetas : ndarray, optional
             Given input correlation coefficients. If none given, uses self.thetas from training.
+
+        grad : bool, optional
+            If True, params['grad'] is the gradient of the reduced likelihood
+            with respect to log(thetas).
         """
         if thetas is None:
             thetas = self.thetas
 
-        X, Y = self.X, self.Y
+        Y = self.Y
+        n = self.n_samples
         params = {}
 
         # Correlation Matrix
-        distances = np.zeros((self.n_samples, self.n_dims, self.n_samples))
-        for i in range(self.n_samples):
-            distances[i, :, i+1:] = np.abs(X[i, ...] - X[i+1:, ...]).T
-            distances[i+1:, :, i] = distances[i, :, i+1:].T
-
-        R = np.exp(-thetas.dot(np.square(distances)))
-        R[np.diag_indices_from(R)] = 1. + self.nugget
-
-        [U,S,Vh] = linalg.svd(R)
-
-        # Penrose-Moore Pseudo-Inverse:
-        # Given A = USV^* and Ax=b, the least-squares solution is
-        # x = V S^-1 U^* b.
-        # Tikhonov regularization is used to make the solution significantly more robust.
-        h = 1e-8 * S[0]
-        inv_factors = S / (S ** 2. + h ** 2.)
-
-        alpha = Vh.T.dot(np.einsum('j,kj,kl->jl', inv_factors, U, Y))
-        logdet = -np.sum(np.log(inv_factors))
-        sigma2 = np.dot(Y.T, alpha).sum(axis=0) / self.n_samples
-        reduced_likelihood = -(np.log(np.sum(sigma2)) + logdet / self.n_samples)
+        r, R = self._correlation_matrix(thetas)
+
+        L = _cholesky(R)
+
+        if L is not None:
+            alpha = linalg.cho_solve((L, True), Y)
+            logdet = 2. * np.sum(np.log(np.diag(L)))
+            params['L'] = L
+            params['U'] = params['S_inv'] = params['Vh'] = None
+        else:
+            # R is symmetric, so R = USV^* with V = U comes from its eigen
+            # decomposition, which is cheaper than the SVD.
+            S, U = linalg.eigh(R)
+
+            # Penrose-Moore Pseudo-Inverse:
+            # Given A = USV^* and Ax=b, the least-squares solution is
+            # x = V S^-1 U^* b.
+            # Tikhonov regularization is used to make the solution significantly more robust.
+            h = 1e-8 * S[-1]
+            inv_factors = S / (S ** 2. + h ** 2.)
+
+            UtY = U.T.dot(Y)
+            alpha = U.dot(inv_factors[:, np.newaxis] * UtY)
+            logdet = -np.sum(np.log(np.abs(inv_factors)))
+            params['L'] = None
+            params['S_inv'] = inv_factors
+            params['U'] = U
+            params['Vh'] = U.T
+
+        sigma2 = np.einsum('ij,ij->j', Y, alpha) / n
+        sum_sigma2 = np.sum(sigma2)
+        reduced_likelihood = -(np.log(sum_sigma2) + logdet / n)
+
+        if grad:
+            # For dR, the reduced likelihood changes by sum(W * dR) / n. With
+            # dR/dlog(theta_k) = -theta_k * D_k * R, its gradient is a sum
+            # over the pairs of points.
+            i, j = self._pairs
+            if L is not None:
+                # W = alpha alpha^T / sum(sigma2) - R^-1
+                R_inv, _ = linalg.lapack.dpotri(L, lower=1)
+                w = np.einsum('ij,ij->i', alpha[i], alpha[j]) / sum_sigma2
+                w -= R_inv[j, i]
+            else:
+                w = _pinv_likelihood_sensitivity(S, U, h, UtY, sum_sigma2)[i, j]
+            params['grad'] = -2. * thetas * (w * r).dot(self._sq_dists) / n
 
         params['alpha'] = alpha
         params['sigma2'] = sigma2 * np.square(self.Y_std)
-        params['S_inv'] = inv_factors
-        params['U'] = U
-        params['Vh'] = Vh
 
         return reduced_likelihood, params
 
@@ -165,34 +383,40 @@ class KrigingSurrogate(SurrogateModel):
         Args
         ----
         x : array-like
-            Point at which the surrogate is evaluated.
+            Point at which the surrogate is evaluated, or an
+            (n_eval, n_dims) array of points.
         """
 
         super(KrigingSurrogate, self).predict(x)
 
-        X, Y = self.X, self.Y
-        thetas = self.thetas
-        if isinstance(x, list):
-            x = np.array(x)
-        x = np.atleast_2d(x)
-        n_eval = x.shape[0]
+        x_n = self._normalize(x)
+        n_eval = x_n.shape[0]
+        n_out = self.alpha.shape[1]
 
-        # Normalize input
-        x_n = (x - self.X_mean) / self.X_std
+        y = np.empty((n_eval, n_out), dtype=np.result_type(x_n, self.alpha))
+        if self.eval_rmse:
+            mse = np.empty((n_eval, n_out), dtype=y.dtype)
 
-        r = np.zeros((n_eval, self.n_samples), dtype=x.dtype)
-        for r_i, x_i in zip(r, x_n):
-            r_i[:] = np.exp(-thetas.dot(np.square((x_i - X).T)))
+        for block in self._blocks(n_eval):
+            r = self._correlation(x_n[block])[0]
 
-        # Scaled Predictor
-        y_t = np.dot(r, self.alpha)
+            # Scaled Predictor
+            y_t = np.dot(r, self.alpha)
 
-        # Predictor
-        y = self.Y_mean + self.Y_std * y_t
+            # Predictor
+            y[block] = self.Y_mean + self.Y_std * y_t
 
-        if self.eval_rmse:
-            mse = (1. - np.dot(np.dot(r, self.Vh.T), np.einsum('j,kj,lk->jl', self.S_inv, self.U, r))) * self.sigma2
+            if self.eval_rmse:
+                if self.L is not None:
+                    v = linalg.solve_triangular(self.L, r.T, lower=True)
+                    r_Rinv_r = np.einsum('ij,ij->j', v, v)
+                else:
+                    # Vh is U^T, so r R^-1 r^T = (r U) S^-1 (r U)^T
+                    rU = r.dot(self.U)
+                    r_Rinv_r = np.einsum('ij,j,ij->i', rU, self.S_inv, rU)
+                mse[block] = np.outer(1. - r_Rinv_r, self.sigma2)
 
+        if self.eval_rmse:
             # Forcing negative RMSE to zero if negative due to machine precision
             mse[mse < 0.] = 0.
             return y, np.sqrt(mse)
@@ -206,23 +430,147 @@ class KrigingSurrogate(SurrogateModel):
         Args
         ----
         x : array-like
-            Point at which the surrogate Jacobian is evaluated.
+            Point at which the surrogate Jacobian is evaluated, or an
+            (n_eval, n_dims) array of points.
+
+        Returns
+        -------
+        ndarray
+            The (n_outputs, n_dims) Jacobian at a single point, or the
+            (n_eval, n_outputs, n_dims) Jacobians at each of several points.
         """
 
         thetas = self.thetas
 
-        # Normalize Input
-        x_n = (x - self.X_mean) / self.X_std
+        x_n = self._normalize(x)
+        n_eval = x_n.shape[0]
+        n_out = self.alpha.shape[1]
+
+        jac = np.empty((n_eval, n_out, self.n_dims),
+                       dtype=np.result_type(x_n, self.alpha))
+        scale = np.outer(self.Y_std, -2. * thetas / self.X_std)
 
-        r = np.exp(-thetas.dot(np.square((x_n - self.X).T)))
+        for block in self._blocks(n_eval):
+            r, diff = self._correlation(x_n[block])
 
-        # Z = einsum('i,ij->ij', X, Y) is equivalent to, but much faster and
-        # memory efficient than, diag(X).dot(Y) for vector X and 2D array Y.
-        # I.e. Z[i,j] = X[i]*Y[i,j]
-        gradr = r * -2 * np.einsum('i,ij->ij', thetas, (x_n - self.X).T)
-        jac = np.einsum('i,j,ij->ij', self.Y_std, 1./self.X_std, gradr.dot(self.alpha).T)
+            # d r_ij / d x_ik = -2 theta_k (x_ik - X_jk) r_ij
+            jac[block] = np.einsum('ij,ijk,jl->ilk', r, diff, self.alpha) * scale
+
+        if n_eval == 1:
+            return jac[0]
         return jac
 
+    def _normalize(self, x):
+        """ Returns the normalized (n_eval, n_dims) array of points `x`."""
+        x = np.atleast_2d(np.asarray(x))
+        return (x - self.X_mean) / self.X_std
+
+    def _blocks(self, n_eval, point_entries=None):
+        """ Yields slices of the evaluation points, small enough that the
+        temporary arrays for a block of points take at most
+        _MAX_BLOCK_ENTRIES entries. By default, each point takes one entry
+        per training point and dimension, for its differences from the
+        training points.
+        """
+        if point_entries is None:
+            point_entries = self.n_samples * self.n_dims
+        size = max(1, _MAX_BLOCK_ENTRIES // point_entries)
+        for start in range(0, n_eval, size):
+            yield slice(start, start + size)
+
+    def _correlation(self, x_n):
+        """ Returns the (n_eval, n_samples) correlations between the
+        normalized points `x_n` and the training points, and the
+        (n_eval, n_samples, n_dims) differences between them.
+        """
+        diff = x_n[:, np.newaxis, :] - self.X
+        r = np.exp(-np.einsum('ijk,k->ij', np.square(diff), self.thetas))
+        return r, diff
+
+
+def _training_inputs(x):
+    """
+    Normalizes the training inputs and computes the squared distances
+    between each pair of training points, for the upper triangle of the
+    correlation matrix. They don't depend on the thetas or the outputs, so
+    they are computed once.
+
+    Returns
+    -------
+    tuple
+        The normalized inputs, their mean and standard deviation, the pairs
+        of point indices and the squared distances of each pair.
+    """
+    if x.shape[0] <= 1:
+        raise ValueError(
+            'KrigingSurrogate require at least 2 training points.'
+        )
+
+    X_mean = np.mean(x, axis=0)
+    X_std = np.std(x, axis=0)
+    X_std[X_std == 0.] = 1.
+    X = (x - X_mean) / X_std
+
+    pairs = np.triu_indices(X.shape[0], 1)
+    sq_dists = np.square(X[pairs[0]] - X[pairs[1]])
+
+    return X, X_mean, X_std, pairs, sq_dists
+
+
+def _cholesky(R):
+    """ Returns the lower Cholesky factor of the correlation matrix R, or
+    None if R isn't well enough conditioned for the Cholesky factor to give
+    the same likelihood as the regularized pseudo-inverse.
+    """
+    try:
+        L = linalg.cholesky(R, lower=True)
+    except linalg.LinAlgError:
+        return None
+
+    if not _well_conditioned(L, R):
+        return None
+
+    return L
+
+
+def _well_conditioned(L, R):
+    """ Returns True if the estimated reciprocal condition number of R,
+    from its lower Cholesky factor L, is at least _RCOND_MIN."""
+    rcond, info = linalg.lapack.dpocon(L, np.max(np.sum(np.abs(R), axis=0)),
+                                       uplo='L')
+    return info == 0 and rcond >= _RCOND_MIN
+
+
+def _pinv_likelihood_sensitivity(S, U, h, UtY, sum_sigma2):
+    """ Returns the matrix W for which the reduced likelihood calculated with
+    the regularized pseudo-inverse of R = U diag(S) U^T changes by
+    sum(W * dR) / n.
+    """
+    S2h2 = S ** 2. + h ** 2.
+    g = S / S2h2
+    dg = (h ** 2. - S ** 2.) / S2h2 ** 2.
+    dg_dh = -2. * h * S / S2h2 ** 2.
+
+    # derivatives of g(R) = U g(S) U^T (Daleckii-Krein), with the limit
+    # g'(S) where eigenvalues are equal
+    diff = S[:, np.newaxis] - S
+    same = np.abs(diff) <= 1e-12 * np.abs(S[-1])
+    diff[same] = 1.
+    gamma = (g[:, np.newaxis] - g) / diff
+    gamma[same] = 0.5 * (dg[:, np.newaxis] + dg)[same]
+
+    # sensitivity of sum(Y^T g(R) Y) / sum(sigma2), and of log det
+    B = UtY.dot(UtY.T)
+    W_sigma = U.dot(gamma * B).dot(U.T) / sum_sigma2
+    W_logdet = (U * (-dg / g)).dot(U.T)
+
+    # h = 1e-8 * S[-1] also depends on R through the largest eigenvalue
+    dh = 1e-8 * (np.sum(dg_dh * np.diag(B)) / sum_sigma2 -
+                 np.sum(dg_dh / g))
+    W_sigma += dh * np.outer(U[:, -1], U[:, -1])
+
+    return -(W_sigma + W_logdet)
+
 
 class FloatKrigingSurrogate(KrigingSurrogate):
     """Surrogate model based on the simple Kriging interpolation. Predictions are returned as floats,
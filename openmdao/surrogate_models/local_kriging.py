@@ -0,0 +1,265 @@
+""" Surrogate model based on Kriging over the nearest training points, for
+large training sets. """
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from openmdao.surrogate_models.kriging import KrigingSurrogate, MACHINE_EPSILON
+from openmdao.surrogate_models.surrogate_model import SurrogateModel
+
+
+class LocalKrigingSurrogate(KrigingSurrogate):
+    """Surrogate model based on local Kriging interpolation. Each prediction
+    is made by a Kriging model of the `num_neighbors` training points that
+    are most correlated with the point being evaluated, so training and
+    prediction don't need the dense correlation matrix of all the training
+    points. The correlation coefficients (thetas) are shared by all the local
+    models and are fit to a random subset of at most `num_fit_points`
+    training points. Predictions are returned as a tuple of mean and RMSE if
+    `eval_rmse` is True.
+
+    Args
+    ----
+    num_neighbors : int, optional
+        Number of training points in the Kriging model for each prediction.
+        Default: 50
+
+    num_fit_points : int, optional
+        Maximum number of training points used to fit the thetas.
+        Default: 1000
+
+    nugget : double or ndarray, optional
+        Nugget smoothing parameter for smoothing noisy data. Represents the variance of the input values.
+        If nugget is an ndarray, it must be of the same length as the number of training points.
+        Default: 10. * Machine Epsilon
+
+    eval_rmse : bool
+        Flag indicating whether the Root Mean Squared Error (RMSE) should be computed. Set to False
+        by default.
+
+    refit_fraction : float, optional
+        When points are added by `update`, the thetas are kept until the number of training points
+        has grown by more than this fraction since they were fit. Then the model is trained again.
+        Default: 0.5
+    """
+
+    def __init__(self, num_neighbors=50, num_fit_points=1000,
+                 nugget=10. * MACHINE_EPSILON, eval_rmse=False,
+                 refit_fraction=0.5):
+        super(LocalKrigingSurrogate, self).__init__(nugget=nugget,
+                                                    eval_rmse=eval_rmse,
+                                                    refit_fraction=refit_fraction)
+        self.num_neighbors = num_neighbors
+        self.num_fit_points = num_fit_points
+        self._tree = None
+
+    def train(self, x, y):
+        """
+        Train the surrogate model with the given set of inputs and outputs.
+
+        Args
+        ----
+        x : array-like
+            Training input locations
+
+        y : array-like
+            Model responses at given inputs.
+        """
+        x, y = np.atleast_2d(x, y)
+        n_samples = x.shape[0]
+
+        # The thetas, normalization and variance come from a Kriging model
+        # of a subset of the training points.
+        fit = np.arange(n_samples)
+        if n_samples > self.num_fit_points:
+            fit = np.sort(np.random.RandomState(0).choice(
+                n_samples, self.num_fit_points, replace=False))
+
+        nugget = self.nugget
+        if np.ndim(nugget) > 0:
+            self.nugget = np.asarray(nugget)[fit]
+        try:
+            super(LocalKrigingSurrogate, self).train(x[fit], y[fit])
+        finally:
+            self.nugget = nugget
+
+        # the global model of the subset isn't needed for predictions
+        self.alpha = self.L = self.U = self.S_inv = self.Vh = None
+        self._pairs = self._sq_dists = None
+
+        self.n_samples = self._num_fit_samples = n_samples
+        self.X = (x - self.X_mean) / self.X_std
+        self.Y = (y - self.Y_mean) / self.Y_std
+
+        # In these coordinates, the nearest training points are the most
+        # correlated ones.
+        self._tree_scale = np.sqrt(self.thetas)
+        self._tree = cKDTree(self.X * self._tree_scale)
+
+    def update(self, x, y):
+        """
+        Adds training points to the trained model. The thetas and the
+        normalization of the data are kept, so only the tree of training
+        points is built again. Once the number of training points has grown
+        by more than `refit_fraction` since the thetas were fit, the model
+        is trained again with all the points.
+
+        Args
+        ----
+        x : array-like
+            New training input locations.
+
+        y : array-like
+            Model responses at the new inputs.
+        """
+        if not self.trained:
+            self.train(x, y)
+            return
+
+        if np.ndim(self.nugget) > 0:
+            raise ValueError('LocalKrigingSurrogate can only be updated if '
+                             'its nugget is a scalar.')
+
+        x, y = np.atleast_2d(x, y)
+        X = np.vstack((self.X, (x - self.X_mean) / self.X_std))
+        Y = np.vstack((self.Y, (y - self.Y_mean) / self.Y_std))
+
+        if X.shape[0] > (1. + self.refit_fraction) * self._num_fit_samples:
+            self.train(X * self.X_std + self.X_mean, Y * self.Y_std + self.Y_mean)
+            return
+
+        self.X, self.Y = X, Y
+        self.n_samples = X.shape[0]
+        self._tree = cKDTree(self.X * self._tree_scale)
+
+    def predict(self, x):
+        """
+        Calculates a predicted value of the response based on the current
+        trained model for the supplied list of inputs.
+
+        Args
+        ----
+        x : array-like
+            Point at which the surrogate is evaluated, or an
+            (n_eval, n_dims) array of points.
+        """
+        SurrogateModel.predict(self, x)
+
+        x_n = self._normalize(x)
+        n_eval = x_n.shape[0]
+        n_out = self.Y.shape[1]
+
+        y = np.empty((n_eval, n_out), dtype=np.result_type(x_n, self.Y))
+        if self.eval_rmse:
+            mse = np.empty((n_eval, n_out), dtype=y.dtype)
+
+        for block in self._blocks(n_eval, self._point_entries()):
+            r, _, alpha, r_Rinv_r = self._local_models(x_n[block])
+
+            # Scaled Predictor
+            y_t = np.einsum('ij,ijk->ik', r, alpha)
+
+            # Predictor
+            y[block] = self.Y_mean + self.Y_std * y_t
+
+            if self.eval_rmse:
+                mse[block] = np.outer(1. - r_Rinv_r, self.sigma2)
+
+        if self.eval_rmse:
+            # Forcing negative RMSE to zero if negative due to machine precision
+            mse[mse < 0.] = 0.
+            return y, np.sqrt(mse)
+
+        return y
+
+    def linearize(self, x):
+        """
+        Calculates the jacobian of the local Kriging model at the requested
+        point.
+
+        Args
+        ----
+        x : array-like
+            Point at which the surrogate Jacobian is evaluated, or an
+            (n_eval, n_dims) array of points.
+
+        Returns
+        -------
+        ndarray
+            The (n_outputs, n_dims) Jacobian at a single point, or the
+            (n_eval, n_outputs, n_dims) Jacobians at each of several points.
+        """
+        x_n = self._normalize(x)
+        n_eval = x_n.shape[0]
+        n_out = self.Y.shape[1]
+
+        jac = np.empty((n_eval, n_out, self.n_dims),
+                       dtype=np.result_type(x_n, self.Y))
+        scale = np.outer(self.Y_std, -2. * self.thetas / self.X_std)
+
+        for block in self._blocks(n_eval, self._point_entries()):
+            r, diff, alpha, _ = self._local_models(x_n[block])
+
+            # d r_ij / d x_ik = -2 theta_k (x_ik - X_jk) r_ij
+            jac[block] = np.einsum('ij,ijk,ijl->ilk', r, diff, alpha) * scale
+
+        if n_eval == 1:
+            return jac[0]
+        return jac
+
+    def _point_entries(self):
+        """ Returns the number of entries in the temporary arrays for each
+        evaluation point, for the differences between its neighbors."""
+        return min(self.num_neighbors, self.n_samples) ** 2 * self.n_dims
+
+    def _local_models(self, x_n):
+        """ Returns the (n_eval, k) correlations between the normalized
+        points `x_n` and their k neighbors, the (n_eval, k, n_dims)
+        differences between them, the (n_eval, k, n_outputs) weights of the
+        neighbors in the local models and, if eval_rmse is True, the
+        (n_eval,) products r R^-1 r^T for the local correlation matrices R.
+        """
+        thetas = self.thetas
+        k = min(self.num_neighbors, self.n_samples)
+
+        _, idx = self._tree.query(x_n.real * self._tree_scale, k=k)
+        idx = idx.reshape(x_n.shape[0], k)
+        X = self.X[idx]
+
+        diff = x_n[:, np.newaxis, :] - X
+        r = np.exp(-np.einsum('ijk,k->ij', np.square(diff), thetas))
+
+        # Correlation Matrices of the neighbors
+        R = np.exp(-np.einsum('ijkl,l->ijk',
+                              np.square(X[:, :, np.newaxis, :] - X[:, np.newaxis, :, :]),
+                              thetas))
+        diag = np.arange(k)
+        if np.ndim(self.nugget) > 0:
+            R[:, diag, diag] = 1. + np.asarray(self.nugget)[idx]
+        else:
+            R[:, diag, diag] = 1. + self.nugget
+
+        # Tikhonov regularized pseudo-inverse, as in KrigingSurrogate. The
+        # local matrices are small, so it is always used.
+        S, U = np.linalg.eigh(R)
+        h = 1e-8 * S[:, -1:]
+        inv_factors = S / (S ** 2. + h ** 2.)
+
+        UtY = np.einsum('ijk,ijl->ikl', U, self.Y[idx])
+        alpha = np.einsum('ijk,ik,ikl->ijl', U, inv_factors, UtY)
+
+        r_Rinv_r = None
+        if self.eval_rmse:
+            rU = np.einsum('ij,ijk->ik', r, U)
+            r_Rinv_r = np.einsum('ij,ij,ij->i', rU, inv_factors, rU)
+
+        return r, diff, alpha, r_Rinv_r
+
+
+class FloatLocalKrigingSurrogate(LocalKrigingSurrogate):
+    """Surrogate model based on local Kriging interpolation. Predictions are
+    returned as floats, which are the mean of the model's prediction."""
+
+    def predict(self, x):
+        dist = super(FloatLocalKrigingSurrogate, self).predict(x)
+        return dist[0]  # mean value
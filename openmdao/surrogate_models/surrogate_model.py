@@ -2,6 +2,15 @@
 Class definition for SurrogateModel, the base class for all surrogate models.
 """
 
+import pickle
+import struct
+import zipfile
+from io import BytesIO
+
+import numpy as np
+from numpy.lib import format as npformat
+
+
 class SurrogateModel(object):
     """
     Base class for surrogate models.
@@ -25,6 +34,164 @@ class SurrogateModel(object):
             .format(type(self).__name__)
         raise RuntimeError(msg)
 
+    def update(self, x, y):
+        """Adds training points to the trained model, without training it
+        again on all of its points. Surrogates that can do this override
+        this method.
+
+        x : array-like
+            New training input locations.
+        y : array-like
+            Model responses at the new inputs.
+        """
+        msg = "{0} has not defined an update method." \
+            .format(type(self).__name__)
+        raise RuntimeError(msg)
+
+    @classmethod
+    def train_multiple(cls, surrogates, x, ys):
+        """Trains several surrogates of this type on the same inputs.
+        Surrogates that can share work between them override this method.
+
+        Args
+        ----
+        surrogates : list of `SurrogateModel`
+            The surrogates to train.
+
+        x : array-like
+            Training input locations, the same for every surrogate.
+
+        ys : list of array-like
+            Model responses at the inputs, for each surrogate.
+        """
+        for surrogate, y in zip(surrogates, ys):
+            surrogate.train(x, y)
+
+    def save(self, filename):
+        """Writes the surrogate to an uncompressed .npz file. Every numeric
+        array it holds is stored as a separate member of the file, so `load`
+        can memory map them. Everything else is pickled.
+
+        Args
+        ----
+        filename : str
+            Name of the file. '.npz' is appended if it's missing.
+        """
+        buf = BytesIO()
+        pickler = _ArrayPickler(buf)
+        pickler.dump(self)
+
+        members = dict(('arr_%d' % i, arr) for i, arr in enumerate(pickler.arrays))
+        members['state'] = np.frombuffer(buf.getvalue(), dtype=np.uint8)
+        np.savez(filename, **members)
+
+    @classmethod
+    def load(cls, filename, mmap_mode='r'):
+        """Reads a surrogate written by `save`. It is ready to predict without
+        being trained again. Only load files from a trusted source, since
+        the surrogate is unpickled.
+
+        Args
+        ----
+        filename : str
+            Name of the .npz file.
+
+        mmap_mode : str or None, optional
+            Mode used to memory map the arrays of the surrogate, as in
+            `numpy.memmap`. With the default 'r', processes that load the
+            same file share one copy of the arrays through the page cache.
+            If None, the arrays are read into memory.
+
+        Returns
+        -------
+        `SurrogateModel`
+            The surrogate that was saved.
+        """
+        if mmap_mode is None:
+            with np.load(filename) as npz:
+                arrays = dict((name, npz[name]) for name in npz.files)
+        else:
+            arrays = _map_npz(filename, mmap_mode)
+
+        state = arrays.pop('state')
+        surrogate = _ArrayUnpickler(BytesIO(state.tobytes()), arrays).load()
+
+        if not isinstance(surrogate, cls):
+            msg = "'{0}' contains a {1}, not a {2}." \
+                .format(filename, type(surrogate).__name__, cls.__name__)
+            raise TypeError(msg)
+        return surrogate
+
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickler that collects numeric arrays in `arrays` instead of pickling
+    them."""
+
+    def __init__(self, f):
+        pickle.Pickler.__init__(self, f, 2)
+        self.arrays = []
+        self._ids = {}
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray or obj.dtype.hasobject or obj.size == 0 \
+           or obj.ndim == 0:
+            return None
+
+        key = self._ids.get(id(obj))
+        if key is None:
+            key = self._ids[id(obj)] = 'arr_%d' % len(self.arrays)
+            self.arrays.append(obj)
+        return key
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    """Unpickler that takes the arrays collected by `_ArrayPickler` from
+    `arrays`."""
+
+    def __init__(self, f, arrays):
+        pickle.Unpickler.__init__(self, f)
+        self._arrays = arrays
+
+    def persistent_load(self, pid):
+        return self._arrays[pid]
+
+
+def _map_npz(filename, mode):
+    """Memory maps the members of an uncompressed .npz file.
+
+    Returns
+    -------
+    dict
+        The array for each member name.
+    """
+    arrays = {}
+    with zipfile.ZipFile(filename) as zf, open(filename, 'rb') as f:
+        for info in zf.infolist():
+            name = info.filename[:-4]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = npformat.read_array(zf.open(info))
+                continue
+
+            # the member data follows its local file header
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = npformat.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = npformat.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = npformat.read_array_header_2_0(f)
+
+            if dtype.hasobject or not shape or not all(shape):
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                arrays[name] = npformat.read_array(f)
+            else:
+                arr = np.memmap(filename, dtype=dtype, mode=mode, offset=f.tell(),
+                                shape=shape, order='F' if fortran else 'C')
+                arrays[name] = arr.view(np.ndarray)
+    return arrays
+
 
 class MultiFiSurrogateModel(SurrogateModel):
     """
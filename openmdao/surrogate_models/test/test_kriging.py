@@ -1,11 +1,15 @@
 
 # pylint: disable-msg=C0111,C0103
 
+import os
+import shutil
+import tempfile
 import unittest
 import itertools
 import numpy as np
 
-from openmdao.api import KrigingSurrogate
+from openmdao.api import KrigingSurrogate, ResponseSurface
+from openmdao.surrogate_models import kriging
 from openmdao.test.util import assert_rel_error
 from six.moves import zip
 
@@ -20,6 +24,11 @@ def branin_1d(x):
     return branin(np.array([x[0], 2.275]))
 
 
+def _factor(surrogate):
+    """ The factor of the correlation matrix held by a trained surrogate."""
+    return surrogate.L if surrogate.L is not None else surrogate.U
+
+
 class TestKrigingSurrogate(unittest.TestCase):
 
     def test_1d_training(self):
@@ -148,5 +157,285 @@ class TestKrigingSurrogate(unittest.TestCase):
         jac = surrogate.linearize(np.array([[0.5, 0.5]]))
         assert_rel_error(self, jac, np.array([[1, 1], [1, -1], [1, 2]]), 5e-4)
 
+    def _train_3d(self):
+        rng = np.random.RandomState(0)
+        x = rng.rand(30, 3) * 10.
+        y = np.array([[branin(case), case[2]**2] for case in x])
+
+        surrogate = KrigingSurrogate(eval_rmse=True)
+        surrogate.train(x, y)
+        return surrogate
+
+    def _force_pinv(self, force=True):
+        rcond_min = kriging._RCOND_MIN
+        kriging._RCOND_MIN = 2. if force else 0.
+        self.addCleanup(setattr, kriging, '_RCOND_MIN', rcond_min)
+
+    def _check_likelihood_gradient(self, surrogate, pinv):
+        log_thetas = np.array([-2., -1., 0.5])
+        _, params = surrogate._calculate_reduced_likelihood_params(
+            np.exp(log_thetas), grad=True)
+        self.assertEqual(params['L'] is None, pinv)
+
+        step = 1e-6
+        fd = np.zeros(3)
+        for i in range(3):
+            delta = np.zeros(3)
+            delta[i] = step
+            fwd = surrogate._calculate_reduced_likelihood_params(
+                np.exp(log_thetas + delta))[0]
+            bwd = surrogate._calculate_reduced_likelihood_params(
+                np.exp(log_thetas - delta))[0]
+            fd[i] = (fwd - bwd) / (2. * step)
+
+        assert_rel_error(self, params['grad'], fd, 1e-6)
+
+    def test_likelihood_gradient(self):
+        surrogate = self._train_3d()
+        self._check_likelihood_gradient(surrogate, pinv=False)
+
+    def test_likelihood_gradient_pinv(self):
+        surrogate = self._train_3d()
+        self._force_pinv()
+        self._check_likelihood_gradient(surrogate, pinv=True)
+
+    def test_likelihood_continuous(self):
+        x = np.linspace(0., 1., 40).reshape(40, 1)
+        surrogate = KrigingSurrogate()
+        surrogate.train(x, np.sin(6. * x))
+
+        # where R is well enough conditioned to be factored, the likelihood
+        # matches the one from the pseudo-inverse used below that
+        rcond_min = kriging._RCOND_MIN
+        num_cholesky = 0
+        for log_theta in np.linspace(2., 4., 41):
+            thetas = np.exp([log_theta])
+            lkh, params = surrogate._calculate_reduced_likelihood_params(thetas)
+            if params['L'] is None:
+                continue
+            num_cholesky += 1
+
+            kriging._RCOND_MIN = 2.
+            try:
+                lkh_pinv = surrogate._calculate_reduced_likelihood_params(thetas)[0]
+            finally:
+                kriging._RCOND_MIN = rcond_min
+            assert_rel_error(self, lkh_pinv, lkh, 1e-5)
+
+        self.assertTrue(0 < num_cholesky < 41)
+
+    def test_cholesky_matches_pinv(self):
+        self._force_pinv(False)
+        surrogate = self._train_3d()
+        self.assertTrue(surrogate.L is not None)
+        mu, sigma = surrogate.predict([5., 5., 5.])
+
+        self._force_pinv()
+        pinv = self._train_3d()
+        self.assertTrue(pinv.L is None)
+        mu_pinv, sigma_pinv = pinv.predict([5., 5., 5.])
+
+        assert_rel_error(self, pinv.thetas, surrogate.thetas, 1e-2)
+        assert_rel_error(self, mu_pinv, mu, 1e-3)
+        assert_rel_error(self, sigma_pinv, sigma, 1e-2)
+
+    def test_batch_predict(self):
+        surrogate = self._train_3d()
+        x = np.random.RandomState(1).rand(25, 3) * 10.
+
+        # small blocks, so the points are predicted in several of them
+        max_entries = kriging._MAX_BLOCK_ENTRIES
+        kriging._MAX_BLOCK_ENTRIES = 7 * 30 * 3
+        self.addCleanup(setattr, kriging, '_MAX_BLOCK_ENTRIES', max_entries)
+
+        for force_pinv in (False, True):
+            if force_pinv:
+                self._force_pinv()
+                surrogate = self._train_3d()
+
+            mu, sigma = surrogate.predict(x)
+            self.assertEqual(mu.shape, (25, 2))
+            self.assertEqual(sigma.shape, (25, 2))
+
+            for i, x0 in enumerate(x):
+                mu0, sigma0 = surrogate.predict(x0)
+                assert_rel_error(self, mu[i], mu0[0], 1e-10)
+                assert_rel_error(self, sigma[i], sigma0[0], 1e-8)
+
+    def test_batch_derivs(self):
+        surrogate = self._train_3d()
+        x = np.random.RandomState(1).rand(5, 3) * 10.
+
+        kriging._MAX_BLOCK_ENTRIES, max_entries = 2 * 30 * 3, \
+                                                  kriging._MAX_BLOCK_ENTRIES
+        self.addCleanup(setattr, kriging, '_MAX_BLOCK_ENTRIES', max_entries)
+
+        jac = surrogate.linearize(x)
+        self.assertEqual(jac.shape, (5, 2, 3))
+
+        step = 1e-6
+        for i, x0 in enumerate(x):
+            assert_rel_error(self, surrogate.linearize(x0), jac[i], 1e-10)
+
+            fd = np.zeros((2, 3))
+            for j in range(3):
+                delta = np.zeros(3)
+                delta[j] = step
+                fd[:, j] = (surrogate.predict(x0 + delta)[0] -
+                            surrogate.predict(x0 - delta)[0])[0] / (2. * step)
+            assert_rel_error(self, jac[i], fd, 1e-5)
+
+    def _check_update(self):
+        rng = np.random.RandomState(0)
+        x = rng.rand(40, 3) * 10.
+        y = np.array([[branin(case), case[2]**2] for case in x])
+
+        surrogate = KrigingSurrogate(eval_rmse=True, refit_fraction=0.5)
+        surrogate.train(x[:30], y[:30])
+        thetas = surrogate.thetas.copy()
+
+        surrogate.update(x[30:35], y[30:35])
+        surrogate.update(x[35:40], y[35:40])
+        self.assertEqual(surrogate.n_samples, 40)
+        assert_rel_error(self, surrogate.thetas, thetas, 0.)
+
+        # the same as factoring the correlation matrix of all the points
+        _, params = surrogate._calculate_reduced_likelihood_params()
+        assert_rel_error(self, surrogate.alpha, params['alpha'], 1e-8)
+        assert_rel_error(self, surrogate.sigma2, params['sigma2'], 1e-8)
+
+        mu, sigma = surrogate.predict(x[35:])
+        assert_rel_error(self, mu, y[35:], 1e-3)
+
+        # more than 50% more points than the thetas were fit with
+        surrogate.update(x[:6] + 0.5, y[:6])
+        self.assertEqual(surrogate._num_fit_samples, 46)
+        expected = KrigingSurrogate()
+        expected.train(np.vstack((x, x[:6] + 0.5)), np.vstack((y, y[:6])))
+        assert_rel_error(self, surrogate.thetas, expected.thetas, 1e-3)
+
+        return surrogate
+
+    def test_update(self):
+        surrogate = self._check_update()
+        self.assertTrue(surrogate.L is not None)
+
+    def test_update_pinv(self):
+        self._force_pinv()
+        surrogate = self._check_update()
+        self.assertTrue(surrogate.L is None)
+
+    def test_train_multiple(self):
+        rng = np.random.RandomState(0)
+        x = rng.rand(30, 3) * 10.
+        ys = [np.array([[branin(case)] for case in x]),
+              np.array([[case[2]**2, case[0]] for case in x]),
+              np.array([[np.sin(case[1])] for case in x])]
+        new_x = rng.rand(5, 3) * 10.
+
+        # untied surrogates are fit as if they were trained one at a time
+        surrogates = [KrigingSurrogate() for _ in ys]
+        KrigingSurrogate.train_multiple(surrogates, x, ys)
+        for surrogate, y in zip(surrogates, ys):
+            self.assertTrue(surrogate.trained)
+            self.assertTrue(surrogate._sq_dists is surrogates[0]._sq_dists)
+
+            expected = KrigingSurrogate()
+            expected.train(x, y)
+            assert_rel_error(self, surrogate.thetas, expected.thetas, 1e-10)
+            assert_rel_error(self, surrogate.predict(new_x),
+                             expected.predict(new_x), 1e-10)
+
+        # tied surrogates are fit as a single vector output
+        surrogates = [KrigingSurrogate(eval_rmse=True, tied_thetas=True)
+                      for _ in ys]
+        KrigingSurrogate.train_multiple(surrogates, x, ys)
+
+        expected = KrigingSurrogate(eval_rmse=True)
+        expected.train(x, np.hstack(ys))
+        mu, sigma = expected.predict(new_x)
+
+        start = 0
+        for surrogate, y in zip(surrogates, ys):
+            cols = slice(start, start + y.shape[1])
+            start = cols.stop
+            self.assertTrue(_factor(surrogate) is _factor(surrogates[0]))
+            assert_rel_error(self, surrogate.thetas, expected.thetas, 1e-10)
+
+            mu1, sigma1 = surrogate.predict(new_x)
+            assert_rel_error(self, mu1, mu[:, cols], 1e-10)
+            assert_rel_error(self, sigma1, sigma[:, cols], 1e-10)
+            assert_rel_error(self, surrogate.predict(x)[0], y, 1e-6)
+
+        # tied surrogates with a different nugget are fit separately
+        surrogates[2].nugget = 1e-6
+        KrigingSurrogate.train_multiple(surrogates, x, ys)
+        self.assertTrue(_factor(surrogates[0]) is _factor(surrogates[1]))
+        self.assertFalse(_factor(surrogates[2]) is _factor(surrogates[0]))
+
+    def test_train_multiple_subclass(self):
+        class LoggingKriging(KrigingSurrogate):
+            def __init__(self):
+                super(LoggingKriging, self).__init__()
+                self.num_trains = 0
+
+            def train(self, x, y):
+                self.num_trains += 1
+                super(LoggingKriging, self).train(x, y)
+
+        x = np.linspace(0., 1., 10).reshape(10, 1)
+        ys = [np.sin(x), np.cos(x)]
+
+        # a subclass that overrides train is trained through it
+        surrogates = [LoggingKriging(), KrigingSurrogate()]
+        KrigingSurrogate.train_multiple(surrogates, x, ys)
+        self.assertEqual(surrogates[0].num_trains, 1)
+        for surrogate, y in zip(surrogates, ys):
+            self.assertTrue(surrogate.trained)
+            assert_rel_error(self, surrogate.predict(x), y, 1e-3)
+
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        fname = os.path.join(tmpdir, 'kriging.npz')
+
+        x = np.array(list(itertools.product(np.linspace(-5., 10., 6),
+                                            np.linspace(0., 15., 6))))
+        y = np.array([[branin(case)] for case in x])
+        surrogate = KrigingSurrogate(eval_rmse=True)
+        surrogate.train(x, y)
+        surrogate.save(fname)
+
+        loaded = KrigingSurrogate.load(fname)
+        self.assertTrue(loaded.trained)
+        assert_rel_error(self, loaded.thetas, surrogate.thetas, 0.)
+
+        # the arrays are read-only views of the file
+        self.assertTrue(isinstance(loaded.alpha.base, np.memmap))
+        self.assertFalse(loaded.alpha.flags.writeable)
+
+        new_x = np.array([[0.5, 2.], [-3., 7.], [8., 12.5]])
+        mu, sigma = surrogate.predict(new_x)
+        mu1, sigma1 = loaded.predict(new_x)
+        assert_rel_error(self, mu1, mu, 1e-10)
+        assert_rel_error(self, sigma1, sigma, 1e-10)
+        assert_rel_error(self, loaded.linearize(new_x),
+                         surrogate.linearize(new_x), 1e-10)
+
+        # the loaded surrogate can still be updated
+        loaded.update(np.array([[2., 3.]]), np.array([[branin([2., 3.])]]))
+        self.assertEqual(loaded.n_samples, 37)
+
+        loaded = KrigingSurrogate.load(fname, mmap_mode=None)
+        self.assertTrue(loaded.alpha.flags.writeable)
+        assert_rel_error(self, loaded.predict(new_x[0])[0], mu[0], 1e-10)
+
+        with self.assertRaises(TypeError) as cm:
+            ResponseSurface.load(fname)
+
+        self.assertEqual(str(cm.exception), "'{0}' contains a KrigingSurrogate,"
+                         " not a ResponseSurface.".format(fname))
+
+
 if __name__ == "__main__":
     unittest.main()
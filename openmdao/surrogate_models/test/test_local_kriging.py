@@ -0,0 +1,136 @@
+
+# pylint: disable-msg=C0111,C0103
+
+import unittest
+import numpy as np
+
+from openmdao.api import LocalKrigingSurrogate, FloatLocalKrigingSurrogate, \
+    KrigingSurrogate, Group, Problem, MetaModel, IndepVarComp
+from openmdao.surrogate_models.test.test_kriging import branin
+from openmdao.test.util import assert_rel_error
+
+
+def _sample(n, seed=0):
+    x = np.random.RandomState(seed).rand(n, 2) * np.array([15., 15.]) - \
+        np.array([5., 0.])
+    y = np.array([[branin(case), case[0] * case[1]] for case in x])
+    return x, y
+
+
+class TestLocalKrigingSurrogate(unittest.TestCase):
+
+    def test_training_points(self):
+        x, y = _sample(200)
+        surrogate = LocalKrigingSurrogate(num_neighbors=20, nugget=0.,
+                                          eval_rmse=True)
+        surrogate.train(x, y)
+
+        mu, sigma = surrogate.predict(x)
+        assert_rel_error(self, mu, y, 1e-4)
+        self.assertTrue(np.all(sigma < 1e-3 * np.std(y, axis=0)))
+
+    def test_all_neighbors(self):
+        # with all the points in each local model, it is the global model
+        x, y = _sample(30)
+        surrogate = LocalKrigingSurrogate(num_neighbors=30, eval_rmse=True)
+        surrogate.train(x, y)
+
+        expected = KrigingSurrogate(eval_rmse=True)
+        expected.train(x, y)
+        assert_rel_error(self, surrogate.thetas, expected.thetas, 1e-12)
+
+        x_new, _ = _sample(10, seed=1)
+        mu, sigma = surrogate.predict(x_new)
+        mu0, sigma0 = expected.predict(x_new)
+        assert_rel_error(self, mu, mu0, 1e-6)
+        assert_rel_error(self, sigma, sigma0, 1e-4)
+
+        assert_rel_error(self, surrogate.linearize(x_new),
+                         expected.linearize(x_new), 1e-6)
+
+    def test_large(self):
+        x, y = _sample(5000)
+        surrogate = LocalKrigingSurrogate(num_neighbors=30, num_fit_points=200)
+        surrogate.train(x, y)
+        self.assertEqual(surrogate.n_samples, 5000)
+
+        x_new, y_new = _sample(100, seed=1)
+        mu = surrogate.predict(x_new)
+        self.assertEqual(mu.shape, (100, 2))
+        assert_rel_error(self, mu, y_new, 1e-3)
+
+    def test_derivs(self):
+        x, y = _sample(300)
+        surrogate = LocalKrigingSurrogate(num_neighbors=25)
+        surrogate.train(x, y)
+
+        x_new, _ = _sample(4, seed=1)
+        jac = surrogate.linearize(x_new)
+        self.assertEqual(jac.shape, (4, 2, 2))
+
+        step = 1e-6
+        for i, x0 in enumerate(x_new):
+            assert_rel_error(self, surrogate.linearize(x0), jac[i], 1e-10)
+
+            fd = np.zeros((2, 2))
+            for j in range(2):
+                delta = np.zeros(2)
+                delta[j] = step
+                fd[:, j] = (surrogate.predict(x0 + delta) -
+                            surrogate.predict(x0 - delta))[0] / (2. * step)
+            assert_rel_error(self, jac[i], fd, 1e-5)
+
+    def test_nugget_array(self):
+        x, y = _sample(100)
+        surrogate = LocalKrigingSurrogate(num_neighbors=20, num_fit_points=50,
+                                          nugget=np.full(100, 1e-8))
+        surrogate.train(x, y)
+        assert_rel_error(self, surrogate.predict(x), y, 1e-3)
+
+    def test_update(self):
+        x, y = _sample(300)
+        surrogate = LocalKrigingSurrogate(num_neighbors=20, nugget=0.,
+                                          num_fit_points=100)
+        surrogate.train(x[:200], y[:200])
+        thetas = surrogate.thetas.copy()
+
+        surrogate.update(x[200:], y[200:])
+        self.assertEqual(surrogate.n_samples, 300)
+        assert_rel_error(self, surrogate.thetas, thetas, 0.)
+        assert_rel_error(self, surrogate.predict(x), y, 1e-4)
+
+        surrogate.update(x[:1] + 1., y[:1])
+        self.assertEqual(surrogate._num_fit_samples, 301)
+
+    def test_no_training_data(self):
+        surrogate = LocalKrigingSurrogate()
+
+        with self.assertRaises(RuntimeError) as cm:
+            surrogate.predict([0., 1.])
+
+        self.assertEqual(str(cm.exception),
+                         "LocalKrigingSurrogate has not been trained, "
+                         "so no prediction can be made.")
+
+    def test_metamodel(self):
+        sin_mm = MetaModel()
+        sin_mm.add_param('x', 0., training_data=np.linspace(0, 10, 200))
+        sin_mm.add_output('f_x', 0.,
+                          training_data=.5*np.sin(np.linspace(0, 10, 200)))
+        sin_mm.default_surrogate = FloatLocalKrigingSurrogate(num_neighbors=10)
+
+        prob = Problem(Group())
+        prob.root.add('p', IndepVarComp('x', 2.22))
+        prob.root.add('sin_mm', sin_mm)
+        prob.root.connect('p.x', 'sin_mm.x')
+        prob.setup(check=False)
+        prob.run()
+
+        assert_rel_error(self, prob['sin_mm.f_x'], .5*np.sin(2.22), 1e-4)
+
+        J = prob.calc_gradient(['p.x'], ['sin_mm.f_x'], mode='fwd')
+        assert_rel_error(self, J[0][0], .5*np.cos(2.22), 1e-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 from numpy import array, sin, cos, pi, ones
 from openmdao.api import MultiFiCoKrigingSurrogate
@@ -171,6 +174,33 @@ class CoKrigingSurrogateTest(unittest.TestCase):
         else:
             self.fail("ValueError Expected")
 
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        fname = os.path.join(tmpdir, 'cokriging.npz')
+
+        def f_expensive(x):
+            return ((x*6-2)**2)*sin((x*6-2)*2)
+        def f_cheap(x):
+            return 0.5*((x*6-2)**2)*sin((x*6-2)*2)+(x-0.5)*10. - 5
+
+        x = [[[0.0], [0.4], [0.6], [1.0]],
+             [[0.1], [0.2], [0.3], [0.5], [0.7],
+              [0.8], [0.9], [0.0], [0.4], [0.6], [1.0]]]
+        y = [[f_expensive(v) for v in array(x[0]).ravel()],
+             [f_cheap(v) for v in array(x[1]).ravel()]]
+
+        cokrig = MultiFiCoKrigingSurrogate()
+        cokrig.train_multifi(x, y)
+        cokrig.save(fname)
+
+        loaded = MultiFiCoKrigingSurrogate.load(fname)
+        for new_x in ([0.25], [0.75]):
+            mu, sigma = cokrig.predict(new_x)
+            mu1, sigma1 = loaded.predict(new_x)
+            assert_rel_error(self, mu1, mu, 1e-10)
+            assert_rel_error(self, sigma1, sigma, 1e-10)
+
 
 if __name__ == "__main__":
     unittest.main()
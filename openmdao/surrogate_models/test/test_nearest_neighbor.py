@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import numpy as np
 import unittest
 
@@ -17,6 +20,28 @@ class TestNearestNeighbor(unittest.TestCase):
 
         self.assertEqual(expected_msg, str(cm.exception))
 
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        fname = os.path.join(tmpdir, 'nn.npz')
+
+        x = np.array([[0., 0.], [1., 0.], [0., 1.], [1., 1.], [.5, .5],
+                      [.2, .7], [.8, .3]])
+        y = np.column_stack((x[:, 0] + x[:, 1], x[:, 0]*x[:, 1]))
+        new_x = np.array([[.3, .4], [.6, .9]])
+
+        for interpolant_type in ('linear', 'weighted', 'rbf'):
+            surrogate = NearestNeighbor(interpolant_type=interpolant_type)
+            surrogate.train(x, y)
+            surrogate.save(fname)
+
+            loaded = NearestNeighbor.load(fname)
+            self.assertEqual(loaded.interpolant_type, interpolant_type)
+            assert_rel_error(self, loaded.predict(new_x),
+                             surrogate.predict(new_x), 1e-10)
+            assert_rel_error(self, loaded.linearize(new_x[:1]),
+                             surrogate.linearize(new_x[:1]), 1e-10)
+
 
 class TestLinearInterpolator1D(unittest.TestCase):
     def setUp(self):
@@ -1,6 +1,6 @@
 # pylint: disable-msg=C0111,C0103
 
-import unittest, itertools
+import os, shutil, tempfile, unittest, itertools
 
 
 from numpy import array, linspace, sin, cos, pi
@@ -137,6 +137,27 @@ class TestResponseSurfaceSurrogate(unittest.TestCase):
         jac = surrogate.linearize(array([[0.5, 0.5]]))
         assert_rel_error(self, jac, array([[1, 1], [1, -1]]), 1e-5)
 
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        fname = os.path.join(tmpdir, 'surface')
+
+        x = array([[a, b] for a, b in
+                   itertools.product(linspace(0, 1, 5), repeat=2)])
+        y = array([[a*b + a, a - b*b] for a, b in x])
+        surrogate = ResponseSurface()
+        surrogate.train(x, y)
+
+        # .npz is appended to the name
+        surrogate.save(fname)
+        loaded = ResponseSurface.load(fname + '.npz')
+
+        assert_rel_error(self, loaded.betas, surrogate.betas, 0.)
+        assert_rel_error(self, loaded.predict(array([0.3, 0.6])),
+                         surrogate.predict(array([0.3, 0.6])), 1e-10)
+        assert_rel_error(self, loaded.linearize(array([[0.3, 0.6]])),
+                         surrogate.linearize(array([[0.3, 0.6]])), 1e-10)
+
 
 if __name__ == "__main__":
     unittest.main()